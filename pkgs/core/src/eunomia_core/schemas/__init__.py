@@ -1,15 +1,28 @@
 from .check import (
     CheckRequest,
     CheckResponse,
+    CheckStreamRequest,
+    CheckStreamResponse,
+    ConditionExplanation,
     EntityCheck,
+    ExplainedCheckResponse,
+    MatrixCheckRequest,
+    MatrixCheckResponse,
+    PartialCheckRequest,
+    PartialCheckResponse,
+    PolicyExplanation,
     PrincipalCheck,
+    ResidualRule,
     ResourceCheck,
+    ResourcesCheckRequest,
+    RuleExplanation,
 )
 from .entity import (
     Attribute,
     AttributeInDb,
     EntityCreate,
     EntityInDb,
+    EntitySearch,
     EntityUpdate,
 )
 from .passport import (
@@ -17,18 +30,38 @@ from .passport import (
     PassportIssueResponse,
     PassportJWT,
 )
-from .policy import Condition, Policy, PolicyEvaluationResult, Rule
+from .policy import (
+    Condition,
+    Policy,
+    PolicyEvaluationResult,
+    PolicyStats,
+    Rule,
+    RuleStats,
+)
 
 __all__ = [
     "CheckRequest",
     "CheckResponse",
+    "CheckStreamRequest",
+    "CheckStreamResponse",
+    "ConditionExplanation",
     "EntityCheck",
+    "ExplainedCheckResponse",
+    "MatrixCheckRequest",
+    "MatrixCheckResponse",
+    "PartialCheckRequest",
+    "PartialCheckResponse",
+    "PolicyExplanation",
     "PrincipalCheck",
+    "ResidualRule",
     "ResourceCheck",
+    "ResourcesCheckRequest",
+    "RuleExplanation",
     "Attribute",
     "AttributeInDb",
     "EntityCreate",
     "EntityInDb",
+    "EntitySearch",
     "EntityUpdate",
     "PassportIssueRequest",
     "PassportIssueResponse",
@@ -36,5 +69,7 @@ __all__ = [
     "Condition",
     "Policy",
     "PolicyEvaluationResult",
+    "PolicyStats",
     "Rule",
+    "RuleStats",
 ]
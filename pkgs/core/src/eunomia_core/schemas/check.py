@@ -1,9 +1,12 @@
+import base64
 from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
 from eunomia_core.enums.entity import EntityType
+from eunomia_core.enums.policy import PolicyEffect
 from eunomia_core.schemas.entity import Attribute
+from eunomia_core.schemas.policy import Condition
 
 
 class EntityCheck(BaseModel):
@@ -52,3 +55,145 @@ class CheckRequest(BaseModel):
 class CheckResponse(BaseModel):
     allowed: bool = Field(..., description="Whether the action is allowed")
     reason: Optional[str] = Field(None, description="The reason for the decision")
+
+
+class ConditionExplanation(BaseModel):
+    condition: Condition = Field(..., description="The evaluated condition")
+    attribute_value: Any = Field(
+        None, description="The value of the attribute resolved from the condition path"
+    )
+    matched: bool = Field(..., description="Whether the condition matched")
+    duration_ns: int = Field(
+        ..., description="The time spent evaluating the condition, in nanoseconds"
+    )
+
+
+class RuleExplanation(BaseModel):
+    name: str = Field(..., description="The name of the rule")
+    effect: PolicyEffect = Field(..., description="The effect of the rule")
+    matched: bool = Field(..., description="Whether the rule matched")
+    short_circuit: Optional[str] = Field(
+        None,
+        description="What stopped the evaluation of the rule, if it did not match: "
+        "'action' or the failed condition, e.g. 'principal_conditions[1]'",
+    )
+    principal_conditions: list[ConditionExplanation] = Field(
+        default_factory=list,
+        description="The principal conditions evaluated, in order",
+    )
+    resource_conditions: list[ConditionExplanation] = Field(
+        default_factory=list,
+        description="The resource conditions evaluated, in order",
+    )
+    duration_ns: int = Field(
+        ..., description="The time spent evaluating the rule, in nanoseconds"
+    )
+
+
+class PolicyExplanation(BaseModel):
+    name: str = Field(..., description="The name of the policy")
+    effect: PolicyEffect = Field(..., description="The resulting effect")
+    matched_rule: Optional[str] = Field(
+        None, description="The name of the rule that determined the effect, if any"
+    )
+    rules: list[RuleExplanation] = Field(
+        default_factory=list,
+        description="The rules evaluated, in order, up to the matching one",
+    )
+    duration_ns: int = Field(
+        ..., description="The time spent evaluating the policy, in nanoseconds"
+    )
+
+
+class ExplainedCheckResponse(CheckResponse):
+    policies: list[PolicyExplanation] = Field(
+        default_factory=list, description="The evaluation of each policy"
+    )
+    duration_ns: int = Field(
+        ..., description="The time spent evaluating the policies, in nanoseconds"
+    )
+
+
+class CheckStreamRequest(BaseModel):
+    id: str = Field(..., description="Correlation identifier of the check")
+    request: CheckRequest = Field(..., description="The check request")
+
+
+class CheckStreamResponse(BaseModel):
+    id: str = Field(..., description="Correlation identifier of the check")
+    response: Optional[CheckResponse] = Field(
+        None, description="The check response, if the check succeeded"
+    )
+    error: Optional[str] = Field(None, description="The error, if the check failed")
+
+
+class ResourcesCheckRequest(BaseModel):
+    principal: PrincipalCheck = Field(
+        ..., description="The principal performing the action"
+    )
+    resources: list[ResourceCheck] = Field(
+        ..., description="The resources being acted on"
+    )
+    action: str = Field(
+        default="access", description="The action being performed on the resources"
+    )
+
+
+class MatrixCheckRequest(BaseModel):
+    principals: list[PrincipalCheck] = Field(
+        ..., description="The principals performing the actions"
+    )
+    resources: list[ResourceCheck] = Field(
+        ..., description="The resources being acted on"
+    )
+    actions: list[str] = Field(
+        default_factory=lambda: ["access"],
+        description="The actions being performed on the resources",
+    )
+
+
+class MatrixCheckResponse(BaseModel):
+    allowed: list[list[str]] = Field(
+        ...,
+        description="For each principal and action, the base64-encoded bitmap of "
+        "the allowed resources: bit i % 8 of byte i // 8 is set if resource i is allowed",
+    )
+
+    def is_allowed(self, principal: int, resource: int, action: int = 0) -> bool:
+        """Whether the principal is allowed the action on the resource, by position."""
+        bitmap = base64.b64decode(self.allowed[principal][action])
+        return bool(bitmap[resource // 8] >> (resource % 8) & 1)
+
+
+class PartialCheckRequest(BaseModel):
+    principal: PrincipalCheck = Field(
+        ..., description="The principal performing the action"
+    )
+    action: str = Field(
+        default="access", description="The action being performed on the resources"
+    )
+
+
+class ResidualRule(BaseModel):
+    policy_name: str = Field(..., description="The name of the policy of the rule")
+    rule_name: str = Field(..., description="The name of the rule")
+    conditions: list[Condition] = Field(
+        default_factory=list,
+        description="Resource conditions that must all match (AND logic)",
+    )
+    unless: list[list[Condition]] = Field(
+        default_factory=list,
+        description="Conditions of preceding rules of the same policy, "
+        "the rule does not apply if any of them fully matches",
+    )
+
+
+class PartialCheckResponse(BaseModel):
+    allow_if: list[ResidualRule] = Field(
+        default_factory=list,
+        description="Rules allowing the action, a resource is allowed if any of them matches",
+    )
+    deny_if: list[ResidualRule] = Field(
+        default_factory=list,
+        description="Rules denying the action, they take precedence over the allow rules",
+    )
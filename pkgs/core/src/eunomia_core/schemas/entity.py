@@ -5,6 +5,7 @@ from typing import Any, Optional
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from eunomia_core.enums.entity import EntityType
+from eunomia_core.schemas.policy import Condition
 from eunomia_core.utils import generate_uri
 
 
@@ -100,3 +101,12 @@ class EntityInDb(EntityBase):
     @property
     def attributes_dict(self) -> dict[str, Any]:
         return {attr.key: attr.value for attr in self.attributes}
+
+
+class EntitySearch(BaseModel):
+    conditions: list[Condition] = Field(
+        ..., description="Conditions the entities must match (AND logic)"
+    )
+    type: Optional[EntityType] = Field(
+        None, description="Type of entity, if not provided all types are searched"
+    )
@@ -90,3 +90,22 @@ class PolicyEvaluationResult(BaseModel):
     policy_name: str = Field(
         ..., description="The name of the policy that was evaluated"
     )
+
+
+class RuleStats(BaseModel):
+    name: str = Field(..., description="The name of the rule")
+    evaluated: int = Field(..., description="Number of checks evaluating the rule")
+    matched: int = Field(..., description="Number of checks matching the rule")
+    applied: int = Field(
+        ..., description="Number of checks whose decision was the effect of the rule"
+    )
+    total_time_ns: int = Field(
+        ..., description="Cumulative time spent evaluating the rule, in nanoseconds"
+    )
+
+
+class PolicyStats(BaseModel):
+    name: str = Field(..., description="The name of the policy")
+    rules: list[RuleStats] = Field(
+        ..., description="The statistics of the rules, in the order of the policy"
+    )
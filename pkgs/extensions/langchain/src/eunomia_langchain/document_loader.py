@@ -1,8 +1,14 @@
 import asyncio
-from typing import AsyncIterator, Iterator, List
+import hashlib
+import json
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator, List
 
-from eunomia_core import enums
-from eunomia_sdk import EunomiaClient
+from eunomia_core import enums, schemas
+from eunomia_sdk import AsyncEunomiaClient, EunomiaClient
 from langchain.schema import Document
 from langchain_core.document_loaders.base import BaseLoader
 
@@ -24,6 +30,18 @@ class EunomiaLoader:
         The base URL endpoint of the Eunomia server.
     api_key : str, optional
         The API key to use for the Eunomia server, only required when the server is hosted on cloud.
+    batch_size : int, optional
+        The number of documents registered with a single bulk request. Defaults to 100.
+    max_concurrency : int, optional
+        The maximum number of bulk registrations running concurrently. Defaults to 4.
+    idempotent : bool, optional
+        If True, each document is registered under a stable identifier derived from its
+        source and content hash, and re-registering it only updates its attributes
+        if they changed. Defaults to False, registering every document with a new identifier.
+    manifest_path : str | Path, optional
+        The path of a local JSON manifest with the fingerprints of the registered documents.
+        When provided, documents whose attributes are unchanged since the last run are not
+        sent to the Eunomia server at all. Requires idempotent to be True.
 
     Notes
     -----
@@ -36,45 +54,143 @@ class EunomiaLoader:
         loader: BaseLoader,
         endpoint: str | None = None,
         api_key: str | None = None,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        idempotent: bool = False,
+        manifest_path: str | Path | None = None,
     ):
+        if manifest_path is not None and not idempotent:
+            raise ValueError("A manifest can only be used with idempotent registration")
+
         self._loader = loader
         self._client = EunomiaClient(endpoint=endpoint, api_key=api_key)
+        self._async_client = AsyncEunomiaClient(
+            endpoint=endpoint, api_key=api_key, max_connections=max_concurrency
+        )
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
+        self._idempotent = idempotent
+        self._manifest_path = Path(manifest_path) if manifest_path else None
+        self._manifest: dict[str, str] = {}
+        if self._manifest_path is not None and self._manifest_path.exists():
+            self._manifest = json.loads(self._manifest_path.read_text())
 
-    def _process_document_sync(
-        self, doc: Document, additional_metadata: dict | None = None
-    ) -> Document:
-        if additional_metadata is None:
-            additional_metadata = {}
-            
-        if not hasattr(doc, "metadata") or doc.metadata is None:
-            doc.metadata = {}
-        doc.metadata.update(additional_metadata)
+    def _document_uri(self, doc: Document) -> str:
+        content_hash = hashlib.sha256(doc.page_content.encode()).hexdigest()
+        source = str(doc.metadata.get("source", ""))
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{content_hash}"))
 
-        response_data = self._client.register_entity(
-            type=enums.EntityType.resource, attributes=doc.metadata
-        )
-        doc.metadata["eunomia_uri"] = response_data.uri
-        return doc
+    @staticmethod
+    def _attributes(doc: Document) -> dict:
+        return {k: v for k, v in doc.metadata.items() if k != "eunomia_uri"}
 
-    async def _process_document_async(
-        self, doc: Document, additional_metadata: dict | None = None
-    ) -> Document:
-        if additional_metadata is None:
-            additional_metadata = {}
-            
+    @staticmethod
+    def _fingerprint(attributes: dict) -> str:
+        data = json.dumps(attributes, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _save_manifest(self) -> None:
+        if self._manifest_path is None:
+            return
+        tmp_path = self._manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._manifest, sort_keys=True))
+        tmp_path.replace(self._manifest_path)
+
+    def _prepare_document(self, doc: Document, additional_metadata: dict) -> Document:
         if not hasattr(doc, "metadata") or doc.metadata is None:
             doc.metadata = {}
         doc.metadata.update(additional_metadata)
+        return doc
+
+    def _batches(
+        self, docs: Iterable[Document], additional_metadata: dict
+    ) -> Iterator[list[Document]]:
+        batch = []
+        for doc in docs:
+            batch.append(self._prepare_document(doc, additional_metadata))
+            if len(batch) >= self._batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _abatches(
+        self, docs: AsyncIterator[Document], additional_metadata: dict
+    ) -> AsyncIterator[list[Document]]:
+        batch = []
+        async for doc in docs:
+            batch.append(self._prepare_document(doc, additional_metadata))
+            if len(batch) >= self._batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _changed_entities(
+        self, docs: list[Document]
+    ) -> dict[str, tuple[schemas.EntityCreate, str]]:
+        # assign the stable uris and collect the entities changed since the last run
+        changed = {}
+        for doc in docs:
+            uri = self._document_uri(doc)
+            attributes = self._attributes(doc)
+            fingerprint = self._fingerprint(attributes)
+            if self._manifest.get(uri) != fingerprint:
+                entity = schemas.EntityCreate(
+                    uri=uri, type=enums.EntityType.resource, attributes=attributes
+                )
+                changed[uri] = (entity, fingerprint)
+            doc.metadata["eunomia_uri"] = uri
+        return changed
 
-        loop = asyncio.get_running_loop()
-        response_data = await loop.run_in_executor(
-            None,
-            lambda: self._client.register_entity(
+    def _update_manifest(
+        self, changed: dict[str, tuple[schemas.EntityCreate, str]]
+    ) -> None:
+        if self._manifest_path is not None:
+            self._manifest.update(
+                {uri: fingerprint for uri, (_, fingerprint) in changed.items()}
+            )
+
+    def _new_entities(self, docs: list[Document]) -> list[schemas.EntityCreate]:
+        return [
+            schemas.EntityCreate(
                 type=enums.EntityType.resource, attributes=doc.metadata
-            ),
-        )
-        doc.metadata["eunomia_uri"] = response_data.uri
-        return doc
+            )
+            for doc in docs
+        ]
+
+    def _register_batch_sync(self, docs: list[Document]) -> list[Document]:
+        if self._idempotent:
+            changed = self._changed_entities(docs)
+            if changed:
+                self._client.upsert_entities([e for e, _ in changed.values()])
+                self._update_manifest(changed)
+            return docs
+
+        entities = self._client.register_entities(self._new_entities(docs))
+        for doc, entity in zip(docs, entities):
+            doc.metadata["eunomia_uri"] = entity.uri
+        return docs
+
+    async def _register_batch_async(
+        self, docs: list[Document], semaphore: asyncio.Semaphore
+    ) -> list[Document]:
+        async with semaphore:
+            if self._idempotent:
+                changed = self._changed_entities(docs)
+                if changed:
+                    await self._async_client.upsert_entities(
+                        [e for e, _ in changed.values()]
+                    )
+                    self._update_manifest(changed)
+                return docs
+
+            entities = await self._async_client.register_entities(
+                self._new_entities(docs)
+            )
+            for doc, entity in zip(docs, entities):
+                doc.metadata["eunomia_uri"] = entity.uri
+            return docs
 
     async def alazy_load(
         self, additional_metadata: dict | None = None
@@ -108,9 +224,27 @@ class EunomiaLoader:
         if additional_metadata is None:
             additional_metadata = {}
             
-        async for doc in self._loader.alazy_load():
-            processed_doc = await self._process_document_async(doc, additional_metadata)
-            yield processed_doc
+        # register up to max_concurrency batches while the next ones are loaded,
+        # yielding the documents in order as soon as their batch is registered
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        pending: deque[asyncio.Task] = deque()
+        try:
+            async for batch in self._abatches(
+                self._loader.alazy_load(), additional_metadata
+            ):
+                pending.append(
+                    asyncio.create_task(self._register_batch_async(batch, semaphore))
+                )
+                while len(pending) > self._max_concurrency:
+                    for processed_doc in await pending.popleft():
+                        yield processed_doc
+            while pending:
+                for processed_doc in await pending.popleft():
+                    yield processed_doc
+        finally:
+            for task in pending:
+                task.cancel()
+            self._save_manifest()
 
     async def aload(self, additional_metadata: dict | None = None) -> List[Document]:
         """Load documents asynchronously and register them with the Eunomia server.
@@ -137,12 +271,22 @@ class EunomiaLoader:
         if additional_metadata is None:
             additional_metadata = {}
             
-        documents = await self._loader.aload()
-        processed_docs = [
-            await self._process_document_async(doc, additional_metadata)
-            for doc in documents
-        ]
-        return processed_docs
+        # batches are registered concurrently while the next ones are loaded
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        tasks = []
+        try:
+            async for batch in self._abatches(
+                self._loader.alazy_load(), additional_metadata
+            ):
+                tasks.append(
+                    asyncio.create_task(self._register_batch_async(batch, semaphore))
+                )
+            batches = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._save_manifest()
+        return [doc for batch in batches for doc in batch]
 
     def lazy_load(self, additional_metadata: dict | None = None) -> Iterator[Document]:
         """Load documents lazily and synchronously, registering them with the Eunomia server.
@@ -169,9 +313,20 @@ class EunomiaLoader:
         if additional_metadata is None:
             additional_metadata = {}
             
-        for doc in self._loader.lazy_load():
-            processed_doc = self._process_document_sync(doc, additional_metadata)
-            yield processed_doc
+        # register each batch in background while the next one is loaded
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                pending: Future | None = None
+                for batch in self._batches(
+                    self._loader.lazy_load(), additional_metadata
+                ):
+                    if pending is not None:
+                        yield from pending.result()
+                    pending = executor.submit(self._register_batch_sync, batch)
+                if pending is not None:
+                    yield from pending.result()
+        finally:
+            self._save_manifest()
 
     def load(self, additional_metadata: dict | None = None) -> List[Document]:
         """Load documents synchronously and register them with the Eunomia server.
@@ -198,10 +353,15 @@ class EunomiaLoader:
             additional_metadata = {}
             
         documents = self._loader.load()
-        processed_docs = [
-            self._process_document_sync(doc, additional_metadata) for doc in documents
-        ]
-        return processed_docs
+        batches = list(self._batches(documents, additional_metadata))
+        try:
+            with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+                processed_batches = list(
+                    executor.map(self._register_batch_sync, batches)
+                )
+        finally:
+            self._save_manifest()
+        return [doc for batch in processed_batches for doc in batch]
 
     def __getattr__(self, name):
         # Delegate any attribute or method lookup to the underlying loader
@@ -0,0 +1,294 @@
+from typing import Any, Callable
+
+from eunomia_core import enums, schemas
+from langchain_core.documents import Document
+from langchain_core.structured_query import (
+    Comparator,
+    Comparison,
+    FilterDirective,
+    Operation,
+    Operator,
+    StructuredQuery,
+    Visitor,
+)
+
+# the condition value is the left operand of the numeric operators,
+# while LangChain comparisons have the metadata attribute on the left
+_COMPARATORS = {
+    enums.ConditionOperator.EQUALS: Comparator.EQ,
+    enums.ConditionOperator.NOT_EQUALS: Comparator.NE,
+    enums.ConditionOperator.CONTAINS: Comparator.LIKE,
+    enums.ConditionOperator.GREATER: Comparator.LT,
+    enums.ConditionOperator.GREATER_OR_EQUAL: Comparator.LTE,
+    enums.ConditionOperator.LESS: Comparator.GT,
+    enums.ConditionOperator.LESS_OR_EQUAL: Comparator.GTE,
+    enums.ConditionOperator.IN: Comparator.IN,
+    enums.ConditionOperator.NOT_IN: Comparator.NIN,
+}
+
+_NEGATED_COMPARATORS = {
+    Comparator.EQ: Comparator.NE,
+    Comparator.NE: Comparator.EQ,
+    Comparator.GT: Comparator.LTE,
+    Comparator.GTE: Comparator.LT,
+    Comparator.LT: Comparator.GTE,
+    Comparator.LTE: Comparator.GT,
+    Comparator.IN: Comparator.NIN,
+    Comparator.NIN: Comparator.IN,
+}
+
+
+def _exists(attribute: str) -> Comparison:
+    # a comparison to None tests if the metadata key exists, and its negation
+    # if it is missing, see the `visit_comparison` of the translators
+    return Comparison(comparator=Comparator.NE, attribute=attribute, value=None)
+
+
+def _comparison(condition: schemas.Condition) -> FilterDirective:
+    if condition.path == "uri":
+        attribute = "eunomia_uri"
+    else:
+        prefix, _, attribute = condition.path.partition(".")
+        if prefix != "attributes" or not attribute or "." in attribute:
+            raise ValueError(f"Path '{condition.path}' cannot be used as a filter")
+    if condition.value is None:
+        raise ValueError("A condition without value cannot be used as a filter")
+
+    if condition.operator == enums.ConditionOperator.NOT_CONTAINS:
+        if not isinstance(condition.value, str):
+            raise ValueError(
+                f"Operator '{condition.operator.value}' cannot be used as a filter "
+                "with a non-string value"
+            )
+        # like the server, only string attributes not containing the value match:
+        # an empty LIKE matches any string, excluding documents missing the key
+        return Operation(
+            operator=Operator.AND,
+            arguments=[
+                Comparison(comparator=Comparator.LIKE, attribute=attribute, value=""),
+                Operation(
+                    operator=Operator.NOT,
+                    arguments=[
+                        Comparison(
+                            comparator=Comparator.LIKE,
+                            attribute=attribute,
+                            value=condition.value,
+                        )
+                    ],
+                ),
+            ],
+        )
+    if condition.operator not in _COMPARATORS:
+        raise ValueError(
+            f"Operator '{condition.operator.value}' cannot be used as a filter"
+        )
+    comparison = Comparison(
+        comparator=_COMPARATORS[condition.operator],
+        attribute=attribute,
+        value=condition.value,
+    )
+    if condition.operator in (
+        enums.ConditionOperator.NOT_EQUALS,
+        enums.ConditionOperator.NOT_IN,
+    ):
+        # like the server, documents missing the key do not match,
+        # while vector stores usually match them with `$ne` and `$nin`
+        return Operation(
+            operator=Operator.AND, arguments=[_exists(attribute), comparison]
+        )
+    return comparison
+
+
+def _negate(directive: FilterDirective) -> FilterDirective:
+    """Negate a directive, pushing the negation down to the comparisons."""
+    if isinstance(directive, Comparison):
+        if directive.comparator in _NEGATED_COMPARATORS:
+            return Comparison(
+                comparator=_NEGATED_COMPARATORS[directive.comparator],
+                attribute=directive.attribute,
+                value=directive.value,
+            )
+        return Operation(operator=Operator.NOT, arguments=[directive])
+
+    if directive.operator == Operator.NOT:
+        return directive.arguments[0]
+    operator = Operator.OR if directive.operator == Operator.AND else Operator.AND
+    return Operation(
+        operator=operator, arguments=[_negate(arg) for arg in directive.arguments]
+    )
+
+
+def _combine(operator: Operator, directives: list[FilterDirective]) -> FilterDirective:
+    if len(directives) == 1:
+        return directives[0]
+    return Operation(operator=operator, arguments=directives)
+
+
+def residual_to_filter(
+    partial: schemas.PartialCheckResponse,
+) -> FilterDirective | None:
+    """
+    Translate the residual rules of a partial evaluation into a metadata filter.
+
+    The filter is expressed with the LangChain structured query language, so that
+    any `Visitor` translator can convert it to the format of a specific vector store.
+    Resource attributes are mapped to metadata keys, and the resource uri
+    to the 'eunomia_uri' metadata key set by the `EunomiaLoader`. Like on the server,
+    the conditions of the allowing rules never match documents missing the metadata
+    key. Negated conditions are pushed down to the comparisons, so documents missing
+    a metadata key of a denying rule may be denied, depending on the vector store.
+
+    Parameters
+    ----------
+    partial : schemas.PartialCheckResponse
+        The residual rules, as returned by the Eunomia server.
+
+    Returns
+    -------
+    FilterDirective | None
+        The filter matching the allowed documents, or None if every document is allowed.
+
+    Raises
+    ------
+    ValueError
+        If the residual rules cannot be expressed as a metadata filter.
+    """
+    if not partial.allow_if:
+        raise ValueError("No document can be allowed")
+
+    allowed = []
+    for rule in partial.allow_if:
+        if not rule.conditions:
+            # the rule allows every document
+            allowed = []
+            break
+        allowed.append(
+            _combine(Operator.AND, [_comparison(c) for c in rule.conditions])
+        )
+
+    not_denied = []
+    for rule in partial.deny_if:
+        # a denying rule does not apply if any of its conditions does not match
+        # or if any of the preceding rules it is voided by matches
+        alternatives = [_negate(_comparison(c)) for c in rule.conditions]
+        alternatives.extend(
+            _combine(Operator.AND, [_comparison(c) for c in conditions])
+            for conditions in rule.unless
+        )
+        if not alternatives:
+            raise ValueError("No document can be allowed")
+        not_denied.append(_combine(Operator.OR, alternatives))
+
+    directives = []
+    if allowed:
+        directives.append(_combine(Operator.OR, allowed))
+    directives.extend(not_denied)
+    if not directives:
+        return None
+    return _combine(Operator.AND, directives)
+
+
+class DictFilterTranslator(Visitor):
+    """
+    Translate filters to the MongoDB-like syntax used by many vector stores.
+
+    The output has the form `{"$and": [{"key": {"$eq": "value"}}, ...]}`,
+    which is accepted by Chroma, Pinecone and MongoDB Atlas among others.
+    The not_equals and not_in operators also test if the key exists with
+    `$exists`, which the vector store must support.
+    """
+
+    allowed_comparators = [
+        Comparator.EQ,
+        Comparator.NE,
+        Comparator.GT,
+        Comparator.GTE,
+        Comparator.LT,
+        Comparator.LTE,
+        Comparator.IN,
+        Comparator.NIN,
+    ]
+    allowed_operators = [Operator.AND, Operator.OR]
+
+    def visit_operation(self, operation: Operation) -> dict:
+        self._validate_func(operation.operator)
+        return {
+            f"${operation.operator.value}": [
+                arg.accept(self) for arg in operation.arguments
+            ]
+        }
+
+    def visit_comparison(self, comparison: Comparison) -> dict:
+        self._validate_func(comparison.comparator)
+        if comparison.value is None:
+            exists = comparison.comparator == Comparator.NE
+            return {comparison.attribute: {"$exists": exists}}
+        return {
+            comparison.attribute: {f"${comparison.comparator.value}": comparison.value}
+        }
+
+    def visit_structured_query(
+        self, structured_query: StructuredQuery
+    ) -> tuple[str, dict]:
+        if structured_query.filter is None:
+            return structured_query.query, {}
+        return structured_query.query, {"filter": structured_query.filter.accept(self)}
+
+
+class CallableFilterTranslator(Visitor):
+    """
+    Translate filters to a predicate over the documents.
+
+    The output is a `Callable[[Document], bool]`, as accepted by the
+    `InMemoryVectorStore`. Missing metadata never matches a comparison,
+    except the ones to None testing if the metadata key is missing.
+    """
+
+    def visit_operation(self, operation: Operation) -> Callable[[Document], bool]:
+        predicates = [arg.accept(self) for arg in operation.arguments]
+        if operation.operator == Operator.AND:
+            return lambda doc: all(p(doc) for p in predicates)
+        elif operation.operator == Operator.OR:
+            return lambda doc: any(p(doc) for p in predicates)
+        return lambda doc: not predicates[0](doc)
+
+    def visit_comparison(self, comparison: Comparison) -> Callable[[Document], bool]:
+        def compare(target: Any) -> bool:
+            value, comparator = comparison.value, comparison.comparator
+            if comparator == Comparator.EQ:
+                return target == value
+            elif comparator == Comparator.NE:
+                return target != value
+            elif comparator == Comparator.IN:
+                return isinstance(value, list) and target in value
+            elif comparator == Comparator.NIN:
+                return isinstance(value, list) and target not in value
+            elif comparator in (Comparator.LIKE, Comparator.CONTAIN):
+                return isinstance(target, str) and str(value) in target
+
+            if not isinstance(value, (int, float)) or not isinstance(
+                target, (int, float)
+            ):
+                return False
+            elif comparator == Comparator.GT:
+                return target > value
+            elif comparator == Comparator.GTE:
+                return target >= value
+            elif comparator == Comparator.LT:
+                return target < value
+            return target <= value
+
+        def predicate(doc: Document) -> bool:
+            target = (doc.metadata or {}).get(comparison.attribute)
+            if comparison.value is None:
+                return (target is None) is (comparison.comparator == Comparator.EQ)
+            return target is not None and compare(target)
+
+        return predicate
+
+    def visit_structured_query(
+        self, structured_query: StructuredQuery
+    ) -> tuple[str, dict]:
+        if structured_query.filter is None:
+            return structured_query.query, {}
+        return structured_query.query, {"filter": structured_query.filter.accept(self)}
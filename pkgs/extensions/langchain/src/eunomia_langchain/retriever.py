@@ -1,9 +1,15 @@
-import asyncio
+import logging
+from typing import Any
 
 from eunomia_core import schemas
-from eunomia_sdk import EunomiaClient
+from eunomia_sdk import AsyncEunomiaClient, EunomiaClient
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
+from langchain_core.structured_query import Visitor
+
+from eunomia_langchain.filters import residual_to_filter
+
+logger = logging.getLogger(__name__)
 
 
 class EunomiaRetriever(BaseRetriever):
@@ -23,6 +29,20 @@ class EunomiaRetriever(BaseRetriever):
         The base URL endpoint of the Eunomia server.
     api_key : str, optional
         The API key to use for the Eunomia server, only required when the server is hosted on cloud.
+    filter_translator : Visitor, optional
+        A LangChain structured query translator for the metadata filters of the wrapped retriever.
+        When provided, the authorization policies are pushed down to the retriever as a metadata
+        filter, computed with a single partial evaluation per query, instead of checking each
+        retrieved document. This requires the document metadata to mirror the resource attributes.
+        If the policies cannot be expressed as a filter, the retrieved documents are checked instead.
+    filter_kwarg : str, optional
+        The name of the keyword argument used to pass the filter to the wrapped retriever.
+        Defaults to "filter".
+    bulk_size : int, optional
+        The maximum number of documents checked in a single request.
+        Shall not exceed the BULK_CHECK_MAX_REQUESTS setting of the server. Defaults to 100.
+    max_concurrency : int, optional
+        The maximum number of check requests running concurrently. Defaults to 4.
 
     Examples
     --------
@@ -42,6 +62,15 @@ class EunomiaRetriever(BaseRetriever):
     ...     principal=schemas.PrincipalCheck(uri="test-uri"),
     ... )
     >>> docs = wrapped_retriever.invoke("foo")
+
+    With a vector store supporting metadata filters, the policies can be pushed down:
+
+    >>> from eunomia_langchain.filters import DictFilterTranslator
+    >>> wrapped_retriever = EunomiaRetriever(
+    ...     retriever=vector_store.as_retriever(),
+    ...     principal=schemas.PrincipalCheck(uri="test-uri"),
+    ...     filter_translator=DictFilterTranslator(),
+    ... )
     """
 
     def __init__(
@@ -50,46 +79,104 @@ class EunomiaRetriever(BaseRetriever):
         principal: schemas.PrincipalCheck,
         endpoint: str | None = None,
         api_key: str | None = None,
+        filter_translator: Visitor | None = None,
+        filter_kwarg: str = "filter",
+        bulk_size: int = 100,
+        max_concurrency: int = 4,
     ):
         super().__init__()
+        if filter_translator is not None and not retriever._expects_other_args:
+            raise ValueError(
+                "The wrapped retriever does not accept a filter, "
+                "filter_translator cannot be used"
+            )
         self._retriever = retriever
         self._principal = principal
-        self._client = EunomiaClient(endpoint=endpoint, api_key=api_key)
+        self._client = EunomiaClient(
+            endpoint=endpoint,
+            api_key=api_key,
+            bulk_max_size=bulk_size,
+            bulk_max_concurrency=max_concurrency,
+        )
+        self._async_client = AsyncEunomiaClient(
+            endpoint=endpoint,
+            api_key=api_key,
+            max_connections=max_concurrency,
+            bulk_max_size=bulk_size,
+            bulk_max_concurrency=max_concurrency,
+        )
+        self._filter_translator = filter_translator
+        self._filter_kwarg = filter_kwarg
 
-    def _check_docs_access(self, docs: list[Document]) -> list[Document]:
+    def _filter_kwargs(
+        self, partial: schemas.PartialCheckResponse
+    ) -> dict[str, Any] | None:
+        try:
+            directive = residual_to_filter(partial)
+            if directive is None:
+                return {}
+            return {self._filter_kwarg: directive.accept(self._filter_translator)}
+        except ValueError as e:
+            logger.warning(f"Cannot push down the policies as a filter: {e}")
+            return None
+
+    def _build_resources(self, docs: list[Document]) -> list[schemas.ResourceCheck]:
         return [
-            doc
+            schemas.ResourceCheck(
+                uri=doc.metadata.get("eunomia_uri"),
+                attributes={
+                    k: v for k, v in doc.metadata.items() if k != "eunomia_uri"
+                },
+            )
             for doc in docs
-            if self._client.check(
-                resource_uri=doc.metadata.pop("eunomia_uri", None),
-                resource_attributes=doc.metadata,
-                principal_uri=self._principal.uri,
-                principal_attributes=self._principal.attributes,
-            ).allowed
         ]
 
-    def _get_relevant_documents(self, query: str) -> list[Document]:
-        docs = self._retriever.invoke(query)
-        return self._check_docs_access(docs)
+    def _check_docs_access(self, docs: list[Document]) -> list[Document]:
+        if not docs:
+            return []
+        responses = self._client.check_resources(
+            self._build_resources(docs),
+            principal_uri=self._principal.uri,
+            principal_attributes=self._principal.attributes,
+        )
+        return [doc for doc, response in zip(docs, responses) if response.allowed]
 
-    async def _acheck_doc_access(
-        self, doc: Document
-    ) -> tuple[Document, schemas.CheckResponse]:
-        return (
-            doc,
-            await asyncio.to_thread(
-                self._client.check,
-                resource_uri=doc.metadata.pop("eunomia_uri", None),
-                resource_attributes=doc.metadata,
+    def _get_relevant_documents(self, query: str) -> list[Document]:
+        if self._filter_translator is not None:
+            partial = self._client.partial_check(
                 principal_uri=self._principal.uri,
                 principal_attributes=self._principal.attributes,
-            ),
-        )
+            )
+            if not partial.allow_if:
+                return []
+            filter_kwargs = self._filter_kwargs(partial)
+            if filter_kwargs is not None:
+                return self._retriever.invoke(query, **filter_kwargs)
+
+        docs = self._retriever.invoke(query)
+        return self._check_docs_access(docs)
 
     async def _acheck_docs_access(self, docs: list[Document]) -> list[Document]:
-        results = await asyncio.gather(*[self._acheck_doc_access(doc) for doc in docs])
-        return [doc for doc, response in results if response.allowed]
+        if not docs:
+            return []
+        responses = await self._async_client.check_resources(
+            self._build_resources(docs),
+            principal_uri=self._principal.uri,
+            principal_attributes=self._principal.attributes,
+        )
+        return [doc for doc, response in zip(docs, responses) if response.allowed]
 
     async def _aget_relevant_documents(self, query: str) -> list[Document]:
+        if self._filter_translator is not None:
+            partial = await self._async_client.partial_check(
+                principal_uri=self._principal.uri,
+                principal_attributes=self._principal.attributes,
+            )
+            if not partial.allow_if:
+                return []
+            filter_kwargs = self._filter_kwargs(partial)
+            if filter_kwargs is not None:
+                return await self._retriever.ainvoke(query, **filter_kwargs)
+
         docs = await self._retriever.ainvoke(query)
         return await self._acheck_docs_access(docs)
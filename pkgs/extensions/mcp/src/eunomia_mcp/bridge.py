@@ -1,8 +1,9 @@
+import asyncio
 import logging
 from enum import Enum
 
 from eunomia_core import schemas
-from eunomia_sdk import EunomiaClient
+from eunomia_sdk import AsyncEunomiaClient, EunomiaClient
 
 from eunomia.server import EunomiaServer
 
@@ -15,26 +16,35 @@ class EunomiaMode(Enum):
 
 
 class EunomiaBridge:
-    _client: EunomiaClient | None = None
+    _client: AsyncEunomiaClient | EunomiaClient | None = None
     _server: EunomiaServer | None = None
 
     def __init__(
         self,
         mode: EunomiaMode,
-        client: EunomiaClient | None = None,
+        client: AsyncEunomiaClient | EunomiaClient | None = None,
         server: EunomiaServer | None = None,
     ):
         self.mode = mode
         if mode == EunomiaMode.CLIENT:
-            self._client = client or EunomiaClient()
+            self._client = client or AsyncEunomiaClient()
         elif mode == EunomiaMode.SERVER:
             self._server = server or EunomiaServer()
         else:
             raise ValueError(f"Invalid mode: {mode}")
 
+    async def _call_client(self, method: str, *args, **kwargs):
+        # a synchronous client is supported too, without blocking the event loop
+        if isinstance(self._client, EunomiaClient):
+            return await asyncio.to_thread(
+                getattr(self._client, method), *args, **kwargs
+            )
+        return await getattr(self._client, method)(*args, **kwargs)
+
     async def check(self, request: schemas.CheckRequest) -> schemas.CheckResponse:
         if self.mode == EunomiaMode.CLIENT:
-            return self._client.check(
+            return await self._call_client(
+                "check",
                 principal_uri=request.principal.uri,
                 principal_attributes=request.principal.attributes,
                 resource_uri=request.resource.uri,
@@ -48,6 +58,20 @@ class EunomiaBridge:
         self, requests: list[schemas.CheckRequest]
     ) -> list[schemas.CheckResponse]:
         if self.mode == EunomiaMode.CLIENT:
-            return self._client.bulk_check(requests)
+            return await self._call_client("bulk_check", requests)
         else:
             return await self._server.bulk_check(requests)
+
+    async def check_resources(
+        self, request: schemas.ResourcesCheckRequest
+    ) -> list[schemas.CheckResponse]:
+        if self.mode == EunomiaMode.CLIENT:
+            return await self._call_client(
+                "check_resources",
+                request.resources,
+                principal_uri=request.principal.uri,
+                principal_attributes=request.principal.attributes,
+                action=request.action,
+            )
+        else:
+            return await self._server.check_resources(request)
@@ -1,7 +1,8 @@
 import logging
 
 from eunomia_core import schemas
-from eunomia_sdk import EunomiaClient
+from eunomia_sdk import AsyncEunomiaClient, EunomiaClient
+from eunomia_sdk.tracing import traced
 from fastmcp.exceptions import ToolError
 from fastmcp.prompts.prompt import Prompt
 from fastmcp.resources.resource import Resource
@@ -26,7 +27,7 @@ class EunomiaMcpMiddleware(Middleware):
     def __init__(
         self,
         mode: EunomiaMode = EunomiaMode.SERVER,
-        eunomia_client: EunomiaClient | None = None,
+        eunomia_client: AsyncEunomiaClient | EunomiaClient | None = None,
         eunomia_server: EunomiaServer | None = None,
         enable_audit_logging: bool = True,
     ):
@@ -70,6 +71,7 @@ class EunomiaMcpMiddleware(Middleware):
             uri=uri, attributes=mcp_attributes.model_dump(exclude_none=True)
         )
 
+    @traced("eunomia_mcp.authorize_execution")
     async def _authorize_execution(
         self, context: MiddlewareContext, component: FastMCPComponent
     ) -> None:
@@ -96,6 +98,7 @@ class EunomiaMcpMiddleware(Middleware):
         if not result.allowed:
             raise ToolError(f"Access denied: {result.reason}")
 
+    @traced("eunomia_mcp.authorize_listing")
     async def _authorize_listing(
         self, context: MiddlewareContext, components: list[FastMCPComponent]
     ) -> list[FastMCPComponent]:
@@ -103,15 +106,13 @@ class EunomiaMcpMiddleware(Middleware):
             action = "list"
             principal = self._extract_principal()
 
-            # Construct requests for bulk check
             resources = [self._extract_resource(context, c) for c in components]
 
-            # Perform all checks in bulk
-            results = await self._eunomia.bulk_check(
-                [
-                    schemas.CheckRequest(principal=principal, resource=r, action=action)
-                    for r in resources
-                ]
+            # Check all components at once, sending the principal a single time
+            results = await self._eunomia.check_resources(
+                schemas.ResourcesCheckRequest(
+                    principal=principal, resources=resources, action=action
+                )
             )
 
             # Filter components based on authorization results
@@ -3,7 +3,7 @@ from pathlib import Path
 from typing import Optional
 
 from eunomia_core import schemas
-from eunomia_sdk import EunomiaClient
+from eunomia_sdk import AsyncEunomiaClient
 
 from eunomia.config import settings
 from eunomia.server import EunomiaServer
@@ -130,7 +130,7 @@ def create_eunomia_middleware(
                 "policy_file is not supported when using a remote Eunomia server, use the CLI to push the policy to the server"
             )
 
-        client = EunomiaClient(endpoint=eunomia_endpoint)
+        client = AsyncEunomiaClient(endpoint=eunomia_endpoint)
 
     else:
         mode = EunomiaMode.SERVER
@@ -1,3 +1,5 @@
+from .async_client import AsyncEunomiaClient
 from .client import EunomiaClient
+from .stream_client import AsyncEunomiaStreamClient
 
-__all__ = ["EunomiaClient"]
+__all__ = ["AsyncEunomiaClient", "AsyncEunomiaStreamClient", "EunomiaClient"]
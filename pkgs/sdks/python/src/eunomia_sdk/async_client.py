@@ -0,0 +1,679 @@
+import asyncio
+import itertools
+import logging
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+import httpx
+from eunomia_core import enums, schemas
+
+from eunomia_sdk.batching import AsyncCheckBatcher
+from eunomia_sdk.cache import DecisionCache
+from eunomia_sdk.client import (
+    DEFAULT_BULK_MAX_SIZE,
+    REVISION_POLL_TIMEOUT,
+    REVISION_RETRY_DELAY,
+)
+from eunomia_sdk.local import LocalEvaluator
+from eunomia_sdk.serialization import (
+    NDJSON_MEDIA_TYPE,
+    check_msgpack_available,
+    decode_body,
+    encode_body,
+    encode_ndjson,
+)
+from eunomia_sdk.tracing import ainject_context, traced
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEunomiaClient:
+    """
+    An asynchronous client for interacting with the Eunomia server.
+
+    This client provides the same methods as the `EunomiaClient`, as coroutines
+    sharing a pool of keep-alive connections. Every method accepts an optional
+    `timeout` in seconds, overriding the client default for that call.
+
+    Parameters
+    ----------
+    endpoint : str, optional
+        The base URL endpoint of the Eunomia server.
+        Defaults to "http://localhost:8421" if not provided.
+    api_key : str, optional
+        The API key for authenticating with the server.
+        Defaults to the environment variable "WAY_API_KEY" if not provided.
+    timeout : float, optional
+        The default timeout of the requests in seconds. Defaults to 60.
+    max_connections : int, optional
+        The maximum number of concurrent connections. Defaults to 100.
+    max_keepalive_connections : int, optional
+        The maximum number of idle connections kept alive in the pool. Defaults to 20.
+    keepalive_expiry : float, optional
+        The time in seconds after which idle connections are closed. Defaults to 5.
+    http2 : bool, optional
+        Whether to enable HTTP/2, which requires the `h2` package,
+        installed with `pip install eunomia-sdk[http2]`. Defaults to False.
+    batch_checks : bool, optional
+        If True, the `check` calls issued concurrently by different tasks are
+        coalesced into bulk checks, trading a bounded delay for fewer requests.
+        Defaults to False.
+    batch_max_size : int, optional
+        The maximum number of checks in a batch. Shall not exceed the
+        BULK_CHECK_MAX_REQUESTS setting of the server. Defaults to 100.
+    batch_max_delay : float, optional
+        The maximum time in seconds a check waits for its batch to be sent.
+        Defaults to 0.005.
+    bulk_max_size : int, optional
+        The maximum number of checks sent with a single bulk request. Longer lists
+        passed to `bulk_check` are split into chunks of this size.
+        Defaults to the limit exposed by the server, discovered on first use.
+    bulk_max_concurrency : int, optional
+        The maximum number of chunks of a bulk check sent concurrently. Defaults to 4.
+    cache_ttl : float, optional
+        If provided, the decisions of `check` are cached for this time in seconds,
+        so that repeated identical checks are answered locally. The cache is cleared
+        as soon as the server reports a change to its policies or registered entities.
+        Defaults to None, disabling the cache.
+    cache_max_size : int, optional
+        The maximum number of cached decisions. Defaults to 10000.
+    local_evaluation : bool, optional
+        If True, the policies are downloaded from the server, which may require
+        the admin API key, and the checks carrying all their attributes inline are
+        evaluated in-process. Checks with uris are still sent to the server, which
+        fetches the registered attributes. The policies are downloaded again as soon
+        as the server reports a change. Defaults to False.
+    msgpack : bool, optional
+        If True, the checks are sent and received as MessagePack instead of JSON,
+        which requires the `ormsgpack` package, installed with
+        `pip install eunomia-sdk[msgpack]`. Defaults to False.
+    compression : bool, optional
+        If True, large bulk check requests are compressed with gzip. Responses are
+        decompressed regardless. Defaults to False.
+
+    Examples
+    --------
+    >>> async with AsyncEunomiaClient() as client:
+    ...     response = await client.check(
+    ...         principal_attributes={"role": "admin"},
+    ...         resource_attributes={"type": "confidential"},
+    ...         timeout=1.0,
+    ...     )
+    """
+
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        api_key: str | None = None,
+        timeout: float = 60,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5,
+        http2: bool = False,
+        batch_checks: bool = False,
+        batch_max_size: int = 100,
+        batch_max_delay: float = 0.005,
+        bulk_max_size: int | None = None,
+        bulk_max_concurrency: int = 4,
+        cache_ttl: float | None = None,
+        cache_max_size: int = 10000,
+        local_evaluation: bool = False,
+        msgpack: bool = False,
+        compression: bool = False,
+    ) -> None:
+        self._endpoint = endpoint if endpoint is not None else "http://localhost:8421"
+        self._api_key = (
+            api_key if api_key is not None else os.getenv("WAY_API_KEY", None)
+        )
+
+        headers = {}
+        if self._api_key is not None:
+            headers["WAY-API-KEY"] = self._api_key
+
+        self.client = httpx.AsyncClient(
+            base_url=self._endpoint,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            event_hooks={"request": [ainject_context]},
+        )
+        self._batcher = (
+            AsyncCheckBatcher(self.bulk_check, batch_max_size, batch_max_delay)
+            if batch_checks
+            else None
+        )
+        self._bulk_max_size = bulk_max_size
+        self._bulk_max_concurrency = bulk_max_concurrency
+        self._cache = (
+            DecisionCache(cache_ttl, cache_max_size) if cache_ttl is not None else None
+        )
+        self._evaluator = LocalEvaluator() if local_evaluation else None
+        self._watcher: asyncio.Task | None = None
+        if msgpack:
+            check_msgpack_available()
+        self._msgpack = msgpack
+        self._compression = compression
+
+    async def __aenter__(self) -> "AsyncEunomiaClient":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Send the batched checks and close the pooled connections of the client."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        if self._batcher is not None:
+            await self._batcher.aclose()
+        await self.client.aclose()
+
+    def _handle_response(self, response: httpx.Response) -> None:
+        try:
+            response.raise_for_status()
+            return
+        except httpx.HTTPStatusError as e:
+            raise httpx.HTTPStatusError(
+                f"{e}\nResponse: {e.response.text}",
+                request=e.request,
+                response=e.response,
+            ) from None
+
+    async def _request(
+        self, method: str, url: str, timeout: float | None, **kwargs: Any
+    ) -> Any:
+        response = await self.client.request(
+            method,
+            url,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            **kwargs,
+        )
+        self._handle_response(response)
+        return decode_body(response)
+
+    @traced("eunomia.check")
+    async def check(
+        self,
+        principal_uri: str | None = None,
+        resource_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        resource_attributes: dict | None = None,
+        action: str = "access",
+        timeout: float | None = None,
+    ) -> schemas.CheckResponse:
+        """
+        Asynchronous version of `EunomiaClient.check`.
+
+        When checks are batched, the client default timeout applies instead.
+        """
+        request = schemas.CheckRequest(
+            principal=schemas.PrincipalCheck(
+                uri=principal_uri, attributes=principal_attributes or {}
+            ),
+            resource=schemas.ResourceCheck(
+                uri=resource_uri, attributes=resource_attributes or {}
+            ),
+            action=action,
+        )
+        if self._evaluator is not None and LocalEvaluator.supports(request):
+            result = await self._evaluate_locally(request, timeout)
+            if result is not None:
+                return result
+
+        # the watcher disables the cache if it stops unexpectedly
+        cache = self._cache
+        if cache is None:
+            return await self._send_check(request, timeout)
+
+        self._start_revision_watcher()
+        key = cache.key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = cache.generation
+        result = await self._send_check(request, timeout)
+        cache.set(key, result, generation)
+        return result
+
+    async def _evaluate_locally(
+        self, request: schemas.CheckRequest, timeout: float | None
+    ) -> schemas.CheckResponse | None:
+        evaluator = self._evaluator
+        if evaluator is None:
+            return None
+
+        self._start_revision_watcher()
+        if not evaluator.synced:
+            if evaluator.failed:
+                # the download is retried once the revision changes
+                return None
+            generation = evaluator.generation
+            try:
+                policies = await self.get_policies(timeout=timeout)
+            except httpx.HTTPError:
+                logger.warning(
+                    "Failed to download the policies, evaluating remotely "
+                    "until the next revision",
+                    exc_info=True,
+                )
+                evaluator.fail(generation)
+                return None
+            evaluator.load(policies, generation)
+        return evaluator.evaluate(request)
+
+    async def _send_check(
+        self, request: schemas.CheckRequest, timeout: float | None
+    ) -> schemas.CheckResponse:
+        if self._batcher is not None:
+            return await self._batcher.submit(request)
+
+        data = await self._request(
+            "POST",
+            "/check",
+            timeout,
+            **encode_body(
+                request.model_dump(mode="json"), self._msgpack, self._compression
+            ),
+        )
+        return schemas.CheckResponse.model_validate(data)
+
+    def _start_revision_watcher(self) -> None:
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch_revisions())
+
+    def _invalidate(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
+        if self._evaluator is not None:
+            self._evaluator.clear()
+
+    def _disable_local_state(self) -> None:
+        # without the watcher, changes would never invalidate the local state
+        cache, self._cache = self._cache, None
+        evaluator, self._evaluator = self._evaluator, None
+        if cache is not None:
+            cache.clear()
+        if evaluator is not None:
+            evaluator.clear()
+
+    async def _watch_revisions(self) -> None:
+        try:
+            await self._poll_revisions()
+        except Exception:
+            logger.exception(
+                "Revision watcher stopped, disabling the decision cache "
+                "and the local evaluation"
+            )
+            self._disable_local_state()
+
+    async def _poll_revisions(self) -> None:
+        # long-poll the server revision, invalidating the local state on changes
+        revision = None
+        while True:
+            params = {"timeout": REVISION_POLL_TIMEOUT}
+            if revision is not None:
+                params["after"] = revision
+            try:
+                latest = await self._request(
+                    "GET",
+                    "/check/revision",
+                    REVISION_POLL_TIMEOUT * 2,
+                    params=params,
+                )
+            except httpx.HTTPError as e:
+                if (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and e.response.status_code == 404
+                ):
+                    # the server does not expose its revision: rely on the cache ttl
+                    # only, and evaluate remotely since policy changes are not notified
+                    self._evaluator = None
+                    return
+                # changes may be missed while the server is unreachable
+                self._invalidate()
+                revision = None
+                await asyncio.sleep(REVISION_RETRY_DELAY)
+                continue
+
+            if latest != revision:
+                self._invalidate()
+                revision = latest
+
+    async def _get_bulk_max_size(self, timeout: float | None) -> int:
+        if self._bulk_max_size is None:
+            try:
+                data = await self._request("GET", "/check/bulk/limit", timeout)
+                self._bulk_max_size = int(data)
+            except httpx.HTTPStatusError:
+                self._bulk_max_size = DEFAULT_BULK_MAX_SIZE
+        return self._bulk_max_size
+
+    async def _map_chunks(
+        self,
+        items: list,
+        send: Callable[[list], Awaitable[list[schemas.CheckResponse]]],
+        timeout: float | None,
+    ) -> list[schemas.CheckResponse]:
+        # chunks within the bulk size limit are sent concurrently, results in order
+        size = await self._get_bulk_max_size(timeout)
+        if len(items) <= size:
+            return await send(items)
+
+        semaphore = asyncio.Semaphore(self._bulk_max_concurrency)
+
+        async def bounded_send(chunk: list) -> list[schemas.CheckResponse]:
+            async with semaphore:
+                return await send(chunk)
+
+        results = await asyncio.gather(
+            *(bounded_send(items[i : i + size]) for i in range(0, len(items), size))
+        )
+        return [result for chunk in results for result in chunk]
+
+    async def _bulk_check_chunk(
+        self, check_requests: list[schemas.CheckRequest], timeout: float | None
+    ) -> list[schemas.CheckResponse]:
+        data = await self._request(
+            "POST",
+            "/check/bulk",
+            timeout,
+            **encode_body(
+                [
+                    schemas.CheckRequest.model_validate(request).model_dump(mode="json")
+                    for request in check_requests
+                ],
+                self._msgpack,
+                self._compression,
+            ),
+        )
+        return [schemas.CheckResponse.model_validate(result) for result in data]
+
+    @traced("eunomia.bulk_check")
+    async def bulk_check(
+        self, check_requests: list[schemas.CheckRequest], timeout: float | None = None
+    ) -> list[schemas.CheckResponse]:
+        """Asynchronous version of `EunomiaClient.bulk_check`."""
+        return await self._map_chunks(
+            check_requests,
+            lambda chunk: self._bulk_check_chunk(chunk, timeout),
+            timeout,
+        )
+
+    async def _check_resources_chunk(
+        self,
+        principal: schemas.PrincipalCheck,
+        action: str,
+        resources: list[schemas.ResourceCheck],
+        timeout: float | None,
+    ) -> list[schemas.CheckResponse]:
+        request = schemas.ResourcesCheckRequest(
+            principal=principal, resources=resources, action=action
+        )
+        data = await self._request(
+            "POST",
+            "/check/resources",
+            timeout,
+            **encode_body(
+                request.model_dump(mode="json"), self._msgpack, self._compression
+            ),
+        )
+        return [schemas.CheckResponse.model_validate(result) for result in data]
+
+    @traced("eunomia.check_resources")
+    async def check_resources(
+        self,
+        resources: list[schemas.ResourceCheck],
+        principal_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        action: str = "access",
+        timeout: float | None = None,
+    ) -> list[schemas.CheckResponse]:
+        """Asynchronous version of `EunomiaClient.check_resources`."""
+        if not resources:
+            return []
+
+        principal = schemas.PrincipalCheck(
+            uri=principal_uri, attributes=principal_attributes or {}
+        )
+        return await self._map_chunks(
+            resources,
+            lambda chunk: self._check_resources_chunk(
+                principal, action, chunk, timeout
+            ),
+            timeout,
+        )
+
+    @traced("eunomia.check_matrix")
+    async def check_matrix(
+        self,
+        principals: list[schemas.PrincipalCheck],
+        resources: list[schemas.ResourceCheck],
+        actions: list[str] | None = None,
+        timeout: float | None = None,
+    ) -> schemas.MatrixCheckResponse:
+        """Asynchronous version of `EunomiaClient.check_matrix`."""
+        request = schemas.MatrixCheckRequest(
+            principals=principals, resources=resources, actions=actions or ["access"]
+        )
+        data = await self._request(
+            "POST",
+            "/check/matrix",
+            timeout,
+            **encode_body(
+                request.model_dump(mode="json"), self._msgpack, self._compression
+            ),
+        )
+        return schemas.MatrixCheckResponse.model_validate(data)
+
+    async def stream_bulk_check(
+        self,
+        check_requests: Iterable[schemas.CheckRequest],
+        chunk_size: int = 1000,
+        timeout: float | None = None,
+    ) -> AsyncIterator[schemas.CheckStreamResponse]:
+        """Asynchronous version of `EunomiaClient.stream_bulk_check`."""
+        requests = iter(check_requests)
+        offset = 0
+        while chunk := list(itertools.islice(requests, chunk_size)):
+            async with self.client.stream(
+                "POST",
+                "/check/bulk/stream",
+                content=encode_ndjson(chunk),
+                headers={"Content-Type": NDJSON_MEDIA_TYPE},
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                self._handle_response(response)
+                async for line in response.aiter_lines():
+                    if line:
+                        result = schemas.CheckStreamResponse.model_validate_json(line)
+                        result.id = str(offset + int(result.id))
+                        yield result
+            offset += len(chunk)
+
+    async def partial_check(
+        self,
+        principal_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        action: str = "access",
+        timeout: float | None = None,
+    ) -> schemas.PartialCheckResponse:
+        """Asynchronous version of `EunomiaClient.partial_check`."""
+        request = schemas.PartialCheckRequest(
+            principal=schemas.PrincipalCheck(
+                uri=principal_uri, attributes=principal_attributes or {}
+            ),
+            action=action,
+        )
+        data = await self._request(
+            "POST", "/check/partial", timeout, json=request.model_dump()
+        )
+        return schemas.PartialCheckResponse.model_validate(data)
+
+    async def list_allowed_resources(
+        self,
+        principal_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        action: str = "access",
+        offset: int = 0,
+        limit: int = 100,
+        timeout: float | None = None,
+    ) -> list[str]:
+        """Asynchronous version of `EunomiaClient.list_allowed_resources`."""
+        request = schemas.PartialCheckRequest(
+            principal=schemas.PrincipalCheck(
+                uri=principal_uri, attributes=principal_attributes or {}
+            ),
+            action=action,
+        )
+        return await self._request(
+            "POST",
+            "/check/allowed-resources",
+            timeout,
+            json=request.model_dump(),
+            params={"offset": offset, "limit": limit},
+        )
+
+    async def register_entity(
+        self,
+        type: enums.EntityType,
+        attributes: dict,
+        uri: str | None = None,
+        timeout: float | None = None,
+    ) -> schemas.EntityInDb:
+        """Asynchronous version of `EunomiaClient.register_entity`."""
+        entity = schemas.EntityCreate(type=type, attributes=attributes, uri=uri)
+        data = await self._request(
+            "POST",
+            "/admin/fetchers/registry/entities",
+            timeout,
+            json=entity.model_dump(),
+        )
+        return schemas.EntityInDb.model_validate(data)
+
+    async def register_entities(
+        self, entities: list[schemas.EntityCreate], timeout: float | None = None
+    ) -> list[schemas.EntityInDb]:
+        """Asynchronous version of `EunomiaClient.register_entities`."""
+        data = await self._request(
+            "POST",
+            "/admin/fetchers/registry/entities/$bulk",
+            timeout,
+            json=[
+                schemas.EntityCreate.model_validate(entity).model_dump()
+                for entity in entities
+            ],
+        )
+        return [schemas.EntityInDb.model_validate(entity) for entity in data]
+
+    async def upsert_entities(
+        self, entities: list[schemas.EntityCreate], timeout: float | None = None
+    ) -> list[schemas.EntityInDb]:
+        """Asynchronous version of `EunomiaClient.upsert_entities`."""
+        data = await self._request(
+            "PUT",
+            "/admin/fetchers/registry/entities/$bulk",
+            timeout,
+            json=[
+                schemas.EntityCreate.model_validate(entity).model_dump()
+                for entity in entities
+            ],
+        )
+        return [schemas.EntityInDb.model_validate(entity) for entity in data]
+
+    async def update_entity(
+        self,
+        uri: str,
+        attributes: dict,
+        override: bool = False,
+        timeout: float | None = None,
+    ) -> schemas.EntityInDb:
+        """Asynchronous version of `EunomiaClient.update_entity`."""
+        entity = schemas.EntityUpdate(uri=uri, attributes=attributes)
+        data = await self._request(
+            "PUT",
+            f"/admin/fetchers/registry/entities/{uri}",
+            timeout,
+            json=entity.model_dump(),
+            params={"override": override},
+        )
+        return schemas.EntityInDb.model_validate(data)
+
+    async def find_entities(
+        self,
+        conditions: list[schemas.Condition],
+        type: enums.EntityType | None = None,
+        offset: int = 0,
+        limit: int = 100,
+        timeout: float | None = None,
+    ) -> list[str]:
+        """Asynchronous version of `EunomiaClient.find_entities`."""
+        request = schemas.EntitySearch(conditions=conditions, type=type)
+        return await self._request(
+            "POST",
+            "/admin/fetchers/registry/entities/$search",
+            timeout,
+            json=request.model_dump(),
+            params={"offset": offset, "limit": limit},
+        )
+
+    async def delete_entity(self, uri: str, timeout: float | None = None) -> bool:
+        """Asynchronous version of `EunomiaClient.delete_entity`."""
+        return await self._request(
+            "DELETE", f"/admin/fetchers/registry/entities/{uri}", timeout
+        )
+
+    async def create_policy(
+        self, request: schemas.Policy, timeout: float | None = None
+    ) -> schemas.Policy:
+        """Asynchronous version of `EunomiaClient.create_policy`."""
+        data = await self._request(
+            "POST", "/admin/policies", timeout, json=request.model_dump()
+        )
+        return schemas.Policy.model_validate(data)
+
+    async def create_simple_policy(
+        self, request: schemas.CheckRequest, name: str, timeout: float | None = None
+    ) -> schemas.Policy:
+        """Asynchronous version of `EunomiaClient.create_simple_policy`."""
+        data = await self._request(
+            "POST",
+            "/admin/policies/simple",
+            timeout,
+            json=request.model_dump(),
+            params={"name": name},
+        )
+        return schemas.Policy.model_validate(data)
+
+    async def get_policies(self, timeout: float | None = None) -> list[schemas.Policy]:
+        """Asynchronous version of `EunomiaClient.get_policies`."""
+        data = await self._request("GET", "/admin/policies", timeout)
+        return [schemas.Policy.model_validate(policy) for policy in data]
+
+    async def delete_policy(self, name: str, timeout: float | None = None) -> bool:
+        """Asynchronous version of `EunomiaClient.delete_policy`."""
+        return await self._request("DELETE", f"/admin/policies/{name}", timeout)
+
+    async def issue_passport(
+        self,
+        uri: str,
+        attributes: dict | None = None,
+        ttl: int | None = None,
+        timeout: float | None = None,
+    ) -> schemas.PassportIssueResponse:
+        """Asynchronous version of `EunomiaClient.issue_passport`."""
+        request = schemas.PassportIssueRequest(
+            uri=uri, attributes=attributes or {}, ttl=ttl
+        )
+        data = await self._request(
+            "POST", "/admin/fetchers/passport/issue", timeout, json=request.model_dump()
+        )
+        return schemas.PassportIssueResponse.model_validate(data)
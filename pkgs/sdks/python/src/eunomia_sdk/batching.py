@@ -0,0 +1,210 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable
+
+import httpx
+from eunomia_core import schemas
+
+# the status codes of a bulk check rejected because of some of its requests
+_REJECTED_STATUS_CODES = {400, 413, 422}
+
+
+def _is_rejected(error: Exception) -> bool:
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code in _REJECTED_STATUS_CODES
+    )
+
+
+class CheckBatcher:
+    """
+    Coalesce the check requests issued by concurrent threads into bulk checks.
+
+    Requests are collected until `max_size` of them are pending or `max_delay`
+    seconds passed since the first one, then sent with a single bulk check while
+    the next batch is collected. Each caller receives its own result.
+
+    The server rejects a whole bulk check when any of its requests is invalid, so a
+    rejected batch is split in halves, sent one after the other, until each caller
+    receives its own result or error. Other errors, such as an unreachable server,
+    fail the whole batch.
+
+    Parameters
+    ----------
+    bulk_check : Callable[[list[schemas.CheckRequest]], list[schemas.CheckResponse]]
+        The function performing the bulk check.
+    max_size : int
+        The maximum number of requests in a batch.
+    max_delay : float
+        The maximum time in seconds a request waits for its batch to be sent.
+    max_concurrency : int, optional
+        The maximum number of bulk checks in flight. Defaults to 4.
+    """
+
+    def __init__(
+        self,
+        bulk_check: Callable[[list[schemas.CheckRequest]], list[schemas.CheckResponse]],
+        max_size: int,
+        max_delay: float,
+        max_concurrency: int = 4,
+    ) -> None:
+        self._bulk_check = bulk_check
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._queue: queue.Queue[tuple[schemas.CheckRequest, Future]] = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._closed = False
+
+    def submit(self, request: schemas.CheckRequest) -> schemas.CheckResponse:
+        """Add a request to the next batch and wait for its result."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The check batcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._collect, daemon=True)
+                self._worker.start()
+            self._queue.put((request, future))
+        return future.result()
+
+    def close(self) -> None:
+        """Send the pending requests, wait for their results and stop the batcher."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            # the worker stops at the None sentinel, after the pending requests
+            self._queue.put(None)
+        if worker is not None:
+            worker.join()
+        self._executor.shutdown(wait=True)
+
+    def _collect(self) -> None:
+        stopped = False
+        while not stopped:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self._max_delay
+            while len(batch) < self._max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopped = True
+                    break
+                batch.append(item)
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch: list[tuple[schemas.CheckRequest, Future]]) -> None:
+        try:
+            results = self._bulk_check([request for request, _ in batch])
+        except Exception as e:
+            if len(batch) == 1 or not _is_rejected(e):
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                middle = len(batch) // 2
+                self._send(batch[:middle])
+                self._send(batch[middle:])
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+class AsyncCheckBatcher:
+    """
+    Coalesce the check requests issued by concurrent tasks into bulk checks.
+
+    Requests are collected until `max_size` of them are pending or `max_delay`
+    seconds passed since the first one, then sent with a single bulk check while
+    the next batch is collected. Each caller receives its own result.
+
+    The server rejects a whole bulk check when any of its requests is invalid, so a
+    rejected batch is split in halves, sent one after the other, until each caller
+    receives its own result or error. Other errors, such as an unreachable server,
+    fail the whole batch.
+
+    Parameters
+    ----------
+    bulk_check : Callable[[list[schemas.CheckRequest]], Awaitable[list[schemas.CheckResponse]]]
+        The coroutine function performing the bulk check.
+    max_size : int
+        The maximum number of requests in a batch.
+    max_delay : float
+        The maximum time in seconds a request waits for its batch to be sent.
+    """
+
+    def __init__(
+        self,
+        bulk_check: Callable[
+            [list[schemas.CheckRequest]], Awaitable[list[schemas.CheckResponse]]
+        ],
+        max_size: int,
+        max_delay: float,
+    ) -> None:
+        self._bulk_check = bulk_check
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._pending: list[tuple[schemas.CheckRequest, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, request: schemas.CheckRequest) -> schemas.CheckResponse:
+        """Add a request to the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            # keep a reference to the task until it completes
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def aclose(self) -> None:
+        """Send the pending requests and wait for their results."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _send(
+        self, batch: list[tuple[schemas.CheckRequest, asyncio.Future]]
+    ) -> None:
+        try:
+            results = await self._bulk_check([request for request, _ in batch])
+        except Exception as e:
+            if len(batch) == 1 or not _is_rejected(e):
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                middle = len(batch) // 2
+                await self._send(batch[:middle])
+                await self._send(batch[middle:])
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from eunomia_core import schemas
+
+
+class DecisionCache:
+    """
+    Thread-safe LRU cache of check decisions with a time-to-live.
+
+    Every `clear` starts a new generation: a decision computed before the cache
+    was cleared is not stored, since it may be stale.
+
+    Parameters
+    ----------
+    ttl : float
+        The time in seconds after which a cached decision expires.
+    max_size : int
+        The maximum number of cached decisions, the least recently used
+        ones being evicted first.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, schemas.CheckResponse]] = (
+            OrderedDict()
+        )
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @staticmethod
+    def key(request: schemas.CheckRequest) -> str:
+        """Return the canonical key of a check request."""
+        return json.dumps(request.model_dump(mode="json"), sort_keys=True)
+
+    def get(self, key: str) -> schemas.CheckResponse | None:
+        """Return a copy of the cached decision, if any and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response.model_copy()
+
+    def set(self, key: str, response: schemas.CheckResponse, generation: int) -> None:
+        """Cache a decision computed during the given generation."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self._ttl, response.model_copy())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all the cached decisions."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
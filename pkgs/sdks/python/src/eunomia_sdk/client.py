@@ -1,8 +1,36 @@
+import contextvars
+import functools
+import itertools
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
 
 import httpx
 from eunomia_core import enums, schemas
 
+from eunomia_sdk.batching import CheckBatcher
+from eunomia_sdk.cache import DecisionCache
+from eunomia_sdk.local import LocalEvaluator
+from eunomia_sdk.serialization import (
+    NDJSON_MEDIA_TYPE,
+    check_msgpack_available,
+    decode_body,
+    encode_body,
+    encode_ndjson,
+)
+from eunomia_sdk.tracing import inject_context, traced
+
+logger = logging.getLogger(__name__)
+
+# bulk size used when the server does not expose its limit
+DEFAULT_BULK_MAX_SIZE = 100
+
+# long-poll timeout and retry delay of the revision watcher, in seconds
+REVISION_POLL_TIMEOUT = 30
+REVISION_RETRY_DELAY = 1
+
 
 class EunomiaClient:
     """
@@ -19,9 +47,59 @@ class EunomiaClient:
     api_key : str, optional
         The API key for authenticating with the server.
         Defaults to the environment variable "WAY_API_KEY" if not provided.
+    batch_checks : bool, optional
+        If True, the `check` calls issued concurrently by different threads are
+        coalesced into bulk checks, trading a bounded delay for fewer requests.
+        Defaults to False.
+    batch_max_size : int, optional
+        The maximum number of checks in a batch. Shall not exceed the
+        BULK_CHECK_MAX_REQUESTS setting of the server. Defaults to 100.
+    batch_max_delay : float, optional
+        The maximum time in seconds a check waits for its batch to be sent.
+        Defaults to 0.005.
+    bulk_max_size : int, optional
+        The maximum number of checks sent with a single bulk request. Longer lists
+        passed to `bulk_check` are split into chunks of this size.
+        Defaults to the limit exposed by the server, discovered on first use.
+    bulk_max_concurrency : int, optional
+        The maximum number of chunks of a bulk check sent concurrently. Defaults to 4.
+    cache_ttl : float, optional
+        If provided, the decisions of `check` are cached for this time in seconds,
+        so that repeated identical checks are answered locally. The cache is cleared
+        as soon as the server reports a change to its policies or registered entities.
+        Defaults to None, disabling the cache.
+    cache_max_size : int, optional
+        The maximum number of cached decisions. Defaults to 10000.
+    local_evaluation : bool, optional
+        If True, the policies are downloaded from the server, which may require
+        the admin API key, and the checks carrying all their attributes inline are
+        evaluated in-process. Checks with uris are still sent to the server, which
+        fetches the registered attributes. The policies are downloaded again as soon
+        as the server reports a change. Defaults to False.
+    msgpack : bool, optional
+        If True, the checks are sent and received as MessagePack instead of JSON,
+        which requires the `ormsgpack` package, installed with
+        `pip install eunomia-sdk[msgpack]`. Defaults to False.
+    compression : bool, optional
+        If True, large bulk check requests are compressed with gzip. Responses are
+        decompressed regardless. Defaults to False.
     """
 
-    def __init__(self, endpoint: str | None = None, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        api_key: str | None = None,
+        batch_checks: bool = False,
+        batch_max_size: int = 100,
+        batch_max_delay: float = 0.005,
+        bulk_max_size: int | None = None,
+        bulk_max_concurrency: int = 4,
+        cache_ttl: float | None = None,
+        cache_max_size: int = 10000,
+        local_evaluation: bool = False,
+        msgpack: bool = False,
+        compression: bool = False,
+    ) -> None:
         self._endpoint = endpoint if endpoint is not None else "http://localhost:8421"
         self._api_key = (
             api_key if api_key is not None else os.getenv("WAY_API_KEY", None)
@@ -31,7 +109,43 @@ class EunomiaClient:
         if self._api_key is not None:
             headers["WAY-API-KEY"] = self._api_key
 
-        self.client = httpx.Client(base_url=self._endpoint, headers=headers, timeout=60)
+        self.client = httpx.Client(
+            base_url=self._endpoint,
+            headers=headers,
+            timeout=60,
+            event_hooks={"request": [inject_context]},
+        )
+        self._batcher = (
+            CheckBatcher(self.bulk_check, batch_max_size, batch_max_delay)
+            if batch_checks
+            else None
+        )
+        self._bulk_max_size = bulk_max_size
+        self._bulk_max_concurrency = bulk_max_concurrency
+        self._cache = (
+            DecisionCache(cache_ttl, cache_max_size) if cache_ttl is not None else None
+        )
+        self._evaluator = LocalEvaluator() if local_evaluation else None
+        self._watcher: threading.Thread | None = None
+        self._watcher_stop = threading.Event()
+        if msgpack:
+            check_msgpack_available()
+        self._msgpack = msgpack
+        self._compression = compression
+        self._watcher_lock = threading.Lock()
+
+    def __enter__(self) -> "EunomiaClient":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the watcher and the batcher, and close the pooled connections."""
+        self._watcher_stop.set()
+        if self._batcher is not None:
+            self._batcher.close()
+        self.client.close()
 
     def _handle_response(self, response: httpx.Response) -> None:
         try:
@@ -44,6 +158,7 @@ class EunomiaClient:
                 response=e.response,
             ) from None
 
+    @traced("eunomia.check")
     def check(
         self,
         principal_uri: str | None = None,
@@ -92,15 +207,191 @@ class EunomiaClient:
             ),
             action=action,
         )
-        response = self.client.post("/check", json=request.model_dump())
+        if self._evaluator is not None and LocalEvaluator.supports(request):
+            result = self._evaluate_locally(request)
+            if result is not None:
+                return result
+
+        # the watcher disables the cache if it stops unexpectedly
+        cache = self._cache
+        if cache is None:
+            return self._send_check(request)
+
+        self._start_revision_watcher()
+        key = cache.key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = cache.generation
+        result = self._send_check(request)
+        cache.set(key, result, generation)
+        return result
+
+    def _evaluate_locally(
+        self, request: schemas.CheckRequest
+    ) -> schemas.CheckResponse | None:
+        evaluator = self._evaluator
+        if evaluator is None:
+            return None
+
+        self._start_revision_watcher()
+        if not evaluator.synced:
+            if evaluator.failed:
+                # the download is retried once the revision changes
+                return None
+            generation = evaluator.generation
+            try:
+                policies = self.get_policies()
+            except httpx.HTTPError:
+                logger.warning(
+                    "Failed to download the policies, evaluating remotely "
+                    "until the next revision",
+                    exc_info=True,
+                )
+                evaluator.fail(generation)
+                return None
+            evaluator.load(policies, generation)
+        return evaluator.evaluate(request)
+
+    def _send_check(self, request: schemas.CheckRequest) -> schemas.CheckResponse:
+        if self._batcher is not None:
+            return self._batcher.submit(request)
+
+        data = self._post_check("/check", request.model_dump(mode="json"))
+        return schemas.CheckResponse.model_validate(data)
+
+    def _post_check(self, url: str, data: dict | list) -> dict | list:
+        response = self.client.post(
+            url, **encode_body(data, self._msgpack, self._compression)
+        )
         self._handle_response(response)
-        return schemas.CheckResponse.model_validate(response.json())
+        return decode_body(response)
+
+    def _start_revision_watcher(self) -> None:
+        with self._watcher_lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(
+                    target=self._watch_revisions, daemon=True
+                )
+                self._watcher.start()
+
+    def _invalidate(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
+        if self._evaluator is not None:
+            self._evaluator.clear()
+
+    def _disable_local_state(self) -> None:
+        # without the watcher, changes would never invalidate the local state
+        cache, self._cache = self._cache, None
+        evaluator, self._evaluator = self._evaluator, None
+        if cache is not None:
+            cache.clear()
+        if evaluator is not None:
+            evaluator.clear()
+
+    def _watch_revisions(self) -> None:
+        try:
+            self._poll_revisions()
+        except Exception:
+            if self._watcher_stop.is_set():
+                # the client was closed during the long-poll
+                return
+            logger.exception(
+                "Revision watcher stopped, disabling the decision cache "
+                "and the local evaluation"
+            )
+            self._disable_local_state()
+
+    def _poll_revisions(self) -> None:
+        # long-poll the server revision, invalidating the local state on changes
+        revision = None
+        while not self._watcher_stop.is_set():
+            params = {"timeout": REVISION_POLL_TIMEOUT}
+            if revision is not None:
+                params["after"] = revision
+            try:
+                response = self.client.get(
+                    "/check/revision",
+                    params=params,
+                    timeout=REVISION_POLL_TIMEOUT * 2,
+                )
+                self._handle_response(response)
+            except httpx.HTTPError as e:
+                if (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and e.response.status_code == 404
+                ):
+                    # the server does not expose its revision: rely on the cache ttl
+                    # only, and evaluate remotely since policy changes are not notified
+                    self._evaluator = None
+                    return
+                # changes may be missed while the server is unreachable
+                if self._watcher_stop.is_set():
+                    return
+                self._invalidate()
+                revision = None
+                self._watcher_stop.wait(REVISION_RETRY_DELAY)
+                continue
+
+            latest = response.json()
+            if latest != revision:
+                self._invalidate()
+                revision = latest
+
+    def _get_bulk_max_size(self) -> int:
+        if self._bulk_max_size is None:
+            try:
+                response = self.client.get("/check/bulk/limit")
+                self._handle_response(response)
+                self._bulk_max_size = int(response.json())
+            except httpx.HTTPStatusError:
+                self._bulk_max_size = DEFAULT_BULK_MAX_SIZE
+        return self._bulk_max_size
+
+    def _map_chunks(
+        self, items: list, send: Callable[[list], list[schemas.CheckResponse]]
+    ) -> list[schemas.CheckResponse]:
+        # chunks within the bulk size limit are sent concurrently, results in order
+        size = self._get_bulk_max_size()
+        if len(items) <= size:
+            return send(items)
+
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        with ThreadPoolExecutor(
+            max_workers=min(self._bulk_max_concurrency, len(chunks))
+        ) as executor:
+            # each chunk is sent in a copy of the current context, keeping the trace
+            contexts = [contextvars.copy_context() for _ in chunks]
+            results = list(
+                executor.map(
+                    contextvars.Context.run, contexts, itertools.repeat(send), chunks
+                )
+            )
+        return [result for chunk in results for result in chunk]
+
+    def _bulk_check_chunk(
+        self, check_requests: list[schemas.CheckRequest]
+    ) -> list[schemas.CheckResponse]:
+        data = self._post_check(
+            "/check/bulk",
+            [
+                schemas.CheckRequest.model_validate(request).model_dump(mode="json")
+                for request in check_requests
+            ],
+        )
+        return [schemas.CheckResponse.model_validate(result) for result in data]
 
+    @traced("eunomia.bulk_check")
     def bulk_check(
         self, check_requests: list[schemas.CheckRequest]
     ) -> list[schemas.CheckResponse]:
         """
-        Perform a set of permission checks in a single request.
+        Perform a set of permission checks.
+
+        Lists longer than the bulk size limit are split into chunks, sent concurrently
+        over the pooled connections, and their results are returned in order.
 
         Parameters
         ----------
@@ -112,17 +403,244 @@ class EunomiaClient:
         list[schemas.CheckResponse]
             The list of results of the check requests.
         """
+        return self._map_chunks(check_requests, self._bulk_check_chunk)
+
+    def _check_resources_chunk(
+        self,
+        principal: schemas.PrincipalCheck,
+        action: str,
+        resources: list[schemas.ResourceCheck],
+    ) -> list[schemas.CheckResponse]:
+        request = schemas.ResourcesCheckRequest(
+            principal=principal, resources=resources, action=action
+        )
+        data = self._post_check("/check/resources", request.model_dump(mode="json"))
+        return [schemas.CheckResponse.model_validate(result) for result in data]
+
+    @traced("eunomia.check_resources")
+    def check_resources(
+        self,
+        resources: list[schemas.ResourceCheck],
+        principal_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        action: str = "access",
+    ) -> list[schemas.CheckResponse]:
+        """
+        Check whether a principal has permissions to perform an action on many resources.
+
+        Unlike `bulk_check`, the principal is sent once for all the resources, and the
+        server resolves it and evaluates its side of the policies once. Lists longer
+        than the bulk size limit are split into chunks like in `bulk_check`.
+
+        Parameters
+        ----------
+        resources : list[schemas.ResourceCheck]
+            The resources to check, defined either with their identifier (uri), attributes or both.
+        principal_uri : str, optional
+            The identifier of the principal. Can be provided for registered principals to automatically retrieve attributes.
+        principal_attributes : dict, optional
+            The attributes of the principal. Shall be provided if the principal is not registered.
+        action : str, optional
+            The action to check permissions for. Defaults to "access".
+
+        Returns
+        -------
+        list[schemas.CheckResponse]
+            The results for each resource, in the same order.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        if not resources:
+            return []
+
+        principal = schemas.PrincipalCheck(
+            uri=principal_uri, attributes=principal_attributes or {}
+        )
+        return self._map_chunks(
+            resources,
+            functools.partial(self._check_resources_chunk, principal, action),
+        )
+
+    @traced("eunomia.check_matrix")
+    def check_matrix(
+        self,
+        principals: list[schemas.PrincipalCheck],
+        resources: list[schemas.ResourceCheck],
+        actions: list[str] | None = None,
+    ) -> schemas.MatrixCheckResponse:
+        """
+        Check every combination of the principals, resources and actions.
+
+        The server resolves each entity once and evaluates the whole matrix at once,
+        which is much faster than bulk checks over the expanded combinations.
+
+        Parameters
+        ----------
+        principals : list[schemas.PrincipalCheck]
+            The principals to check.
+        resources : list[schemas.ResourceCheck]
+            The resources to check.
+        actions : list[str], optional
+            The actions to check. Defaults to ["access"].
+
+        Returns
+        -------
+        schemas.MatrixCheckResponse
+            The bitmaps of the allowed resources for each principal and action,
+            queried by position with `is_allowed`.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        request = schemas.MatrixCheckRequest(
+            principals=principals, resources=resources, actions=actions or ["access"]
+        )
+        data = self._post_check("/check/matrix", request.model_dump(mode="json"))
+        return schemas.MatrixCheckResponse.model_validate(data)
+
+    def stream_bulk_check(
+        self, check_requests: Iterable[schemas.CheckRequest], chunk_size: int = 1000
+    ) -> Iterator[schemas.CheckStreamResponse]:
+        """
+        Perform any number of checks, yielding the responses as they complete.
+
+        The requests are consumed lazily and sent in chunks as streams of lines, whose
+        responses are yielded as soon as they are received, so that memory stays
+        constant regardless of the number of checks.
+
+        Parameters
+        ----------
+        check_requests : Iterable[schemas.CheckRequest]
+            The check requests to perform.
+        chunk_size : int, optional
+            The number of check requests sent with a single streaming request.
+            Defaults to 1000.
+
+        Yields
+        ------
+        schemas.CheckStreamResponse
+            The check response or the error, identified by the position of the request
+            in `check_requests`. Responses of the same chunk may be yielded out of order.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        requests = iter(check_requests)
+        offset = 0
+        while chunk := list(itertools.islice(requests, chunk_size)):
+            with self.client.stream(
+                "POST",
+                "/check/bulk/stream",
+                content=encode_ndjson(chunk),
+                headers={"Content-Type": NDJSON_MEDIA_TYPE},
+            ) as response:
+                if response.is_error:
+                    response.read()
+                self._handle_response(response)
+                for line in response.iter_lines():
+                    if line:
+                        result = schemas.CheckStreamResponse.model_validate_json(line)
+                        result.id = str(offset + int(result.id))
+                        yield result
+            offset += len(chunk)
+
+    def partial_check(
+        self,
+        principal_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        action: str = "access",
+    ) -> schemas.PartialCheckResponse:
+        """
+        Partially evaluate the policies for a principal and an action.
+
+        The response contains the residual conditions over the resource attributes,
+        which can be pushed down as a filter into queries of vector stores or databases:
+        a resource is allowed if any rule in `allow_if` applies to it and no rule in
+        `deny_if` does.
+
+        Parameters
+        ----------
+        principal_uri : str, optional
+            The identifier of the principal. Can be provided for registered principals to automatically retrieve attributes.
+        principal_attributes : dict, optional
+            The attributes of the principal. Shall be provided if the principal is not registered.
+        action : str, optional
+            The action to check permissions for. Defaults to "access".
+
+        Returns
+        -------
+        schemas.PartialCheckResponse
+            The residual rules over the resource attributes.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        request = schemas.PartialCheckRequest(
+            principal=schemas.PrincipalCheck(
+                uri=principal_uri, attributes=principal_attributes or {}
+            ),
+            action=action,
+        )
+        response = self.client.post("/check/partial", json=request.model_dump())
+        self._handle_response(response)
+        return schemas.PartialCheckResponse.model_validate(response.json())
+
+    def list_allowed_resources(
+        self,
+        principal_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        action: str = "access",
+        offset: int = 0,
+        limit: int = 100,
+    ) -> list[str]:
+        """
+        List the registered resources a principal is allowed to perform an action on.
+
+        Parameters
+        ----------
+        principal_uri : str, optional
+            The identifier of the principal. Can be provided for registered principals to automatically retrieve attributes.
+        principal_attributes : dict, optional
+            The attributes of the principal. Shall be provided if the principal is not registered.
+        action : str, optional
+            The action to check permissions for. Defaults to "access".
+        offset : int, default=0
+            The number of resource uris to skip.
+        limit : int, default=100
+            The maximum number of resource uris to return.
+
+        Returns
+        -------
+        list[str]
+            The uris of the allowed resources.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        request = schemas.PartialCheckRequest(
+            principal=schemas.PrincipalCheck(
+                uri=principal_uri, attributes=principal_attributes or {}
+            ),
+            action=action,
+        )
         response = self.client.post(
-            "/check/bulk",
-            json=[
-                schemas.CheckRequest.model_validate(request).model_dump()
-                for request in check_requests
-            ],
+            "/check/allowed-resources",
+            json=request.model_dump(),
+            params={"offset": offset, "limit": limit},
         )
         self._handle_response(response)
-        return [
-            schemas.CheckResponse.model_validate(result) for result in response.json()
-        ]
+        return response.json()
 
     def register_entity(
         self, type: enums.EntityType, attributes: dict, uri: str | None = None
@@ -159,6 +677,73 @@ class EunomiaClient:
         self._handle_response(response)
         return schemas.EntityInDb.model_validate(response.json())
 
+    def register_entities(
+        self, entities: list[schemas.EntityCreate]
+    ) -> list[schemas.EntityInDb]:
+        """
+        Register multiple new entities with the Eunomia server in a single request.
+
+        Either all the entities are registered or none of them is.
+
+        Parameters
+        ----------
+        entities : list[schemas.EntityCreate]
+            The entities to register, with their type, attributes and optional uri.
+
+        Returns
+        -------
+        list[schemas.EntityInDb]
+            The newly registered entities, in the same order.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        response = self.client.post(
+            "/admin/fetchers/registry/entities/$bulk",
+            json=[
+                schemas.EntityCreate.model_validate(entity).model_dump()
+                for entity in entities
+            ],
+        )
+        self._handle_response(response)
+        return [schemas.EntityInDb.model_validate(entity) for entity in response.json()]
+
+    def upsert_entities(
+        self, entities: list[schemas.EntityCreate]
+    ) -> list[schemas.EntityInDb]:
+        """
+        Register or replace multiple entities with the Eunomia server in a single request.
+
+        Entities that are not registered yet are created, while the registered
+        ones are overridden only if their type or attributes changed.
+
+        Parameters
+        ----------
+        entities : list[schemas.EntityCreate]
+            The entities to upsert, with their type, attributes and uri.
+
+        Returns
+        -------
+        list[schemas.EntityInDb]
+            The registered entities, in the same order.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        response = self.client.put(
+            "/admin/fetchers/registry/entities/$bulk",
+            json=[
+                schemas.EntityCreate.model_validate(entity).model_dump()
+                for entity in entities
+            ],
+        )
+        self._handle_response(response)
+        return [schemas.EntityInDb.model_validate(entity) for entity in response.json()]
+
     def update_entity(
         self, uri: str, attributes: dict, override: bool = False
     ) -> schemas.EntityInDb:
@@ -195,6 +780,47 @@ class EunomiaClient:
         self._handle_response(response)
         return schemas.EntityInDb.model_validate(response.json())
 
+    def find_entities(
+        self,
+        conditions: list[schemas.Condition],
+        type: enums.EntityType | None = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> list[str]:
+        """
+        Find the registered entities whose attributes match all the given conditions.
+
+        Parameters
+        ----------
+        conditions : list[schemas.Condition]
+            The conditions to match, with paths either "uri" or "attributes.<key>"
+            and the same operators used in policies.
+        type : enums.EntityType, optional
+            If provided, only entities of this type are returned.
+        offset : int, default=0
+            The number of uris to skip.
+        limit : int, default=100
+            The maximum number of uris to return.
+
+        Returns
+        -------
+        list[str]
+            The uris of the matching entities.
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            If the HTTP request returns an unsuccessful status code.
+        """
+        request = schemas.EntitySearch(conditions=conditions, type=type)
+        response = self.client.post(
+            "/admin/fetchers/registry/entities/$search",
+            json=request.model_dump(),
+            params={"offset": offset, "limit": limit},
+        )
+        self._handle_response(response)
+        return response.json()
+
     def delete_entity(self, uri: str) -> bool:
         """
         Delete an entity from the Eunomia server.
@@ -0,0 +1,198 @@
+import threading
+from typing import Any, Callable
+
+from eunomia_core import enums, schemas
+
+Predicate = Callable[[Any], bool]
+
+
+def _compile_path(path: str) -> Callable[[Any], Any]:
+    components = path.split(".")
+
+    def resolve(obj: Any) -> Any:
+        current = obj
+        for component in components:
+            if hasattr(current, component):
+                current = getattr(current, component)
+            elif isinstance(current, dict) and component in current:
+                current = current[component]
+            elif (
+                isinstance(current, list)
+                and component.isdigit()
+                and int(component) < len(current)
+            ):
+                current = current[int(component)]
+            else:
+                return None
+
+            if current is None:
+                return None
+        return current
+
+    return resolve
+
+
+def _compile_operator(operator: enums.ConditionOperator, value: Any) -> Predicate:
+    if value is None:
+        return lambda target: False
+
+    if operator == enums.ConditionOperator.EQUALS:
+        return lambda target: target is not None and value == target
+    if operator == enums.ConditionOperator.NOT_EQUALS:
+        return lambda target: target is not None and value != target
+
+    if isinstance(value, str):
+        if operator == enums.ConditionOperator.CONTAINS:
+            return lambda target: isinstance(target, str) and value in target
+        if operator == enums.ConditionOperator.NOT_CONTAINS:
+            return lambda target: isinstance(target, str) and value not in target
+        if operator == enums.ConditionOperator.STARTS_WITH:
+            return lambda target: isinstance(target, str) and target.startswith(value)
+        if operator == enums.ConditionOperator.ENDS_WITH:
+            return lambda target: isinstance(target, str) and target.endswith(value)
+
+    elif isinstance(value, (int, float)):
+        if operator == enums.ConditionOperator.GREATER:
+            return lambda target: isinstance(target, (int, float)) and value > target
+        if operator == enums.ConditionOperator.GREATER_OR_EQUAL:
+            return lambda target: isinstance(target, (int, float)) and value >= target
+        if operator == enums.ConditionOperator.LESS:
+            return lambda target: isinstance(target, (int, float)) and value < target
+        if operator == enums.ConditionOperator.LESS_OR_EQUAL:
+            return lambda target: isinstance(target, (int, float)) and value <= target
+
+    elif isinstance(value, list):
+        if operator == enums.ConditionOperator.IN:
+            return lambda target: target is not None and target in value
+        if operator == enums.ConditionOperator.NOT_IN:
+            return lambda target: target is not None and target not in value
+
+    return lambda target: False
+
+
+def _compile_conditions(conditions: list[schemas.Condition]) -> Predicate:
+    compiled = [
+        (_compile_path(c.path), _compile_operator(c.operator, c.value))
+        for c in conditions
+    ]
+    return lambda obj: all(matches(resolve(obj)) for resolve, matches in compiled)
+
+
+class _CompiledRule:
+    def __init__(self, rule: schemas.Rule) -> None:
+        self.rule = rule
+        self.actions = frozenset(rule.actions)
+        self.principal_matches = _compile_conditions(rule.principal_conditions)
+        self.resource_matches = _compile_conditions(rule.resource_conditions)
+
+    def matches(self, request: schemas.CheckRequest) -> bool:
+        return (
+            request.action in self.actions
+            and self.principal_matches(request.principal)
+            and self.resource_matches(request.resource)
+        )
+
+
+class LocalEvaluator:
+    """
+    In-process evaluation of a copy of the server policies.
+
+    Policies are compiled into predicates once per sync, and evaluated with the same
+    semantics as the `evaluate_all` method of the server policy engine.
+    Only requests carrying all their attributes inline can be evaluated locally,
+    since registered attributes are fetched by the server.
+
+    Every `clear` starts a new generation: policies downloaded before the evaluator
+    was cleared are not loaded, since they may be stale. A failed download is not
+    retried before the next generation.
+    """
+
+    def __init__(self) -> None:
+        self._policies: list[tuple[schemas.Policy, list[_CompiledRule]]] | None = None
+        self._generation = 0
+        self._failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def synced(self) -> bool:
+        return self._policies is not None
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+    @staticmethod
+    def supports(request: schemas.CheckRequest) -> bool:
+        """Whether the request can be evaluated without fetching attributes."""
+        return request.principal.uri is None and request.resource.uri is None
+
+    def load(self, policies: list[schemas.Policy], generation: int) -> None:
+        """Compile and load the policies downloaded during the given generation."""
+        compiled = [
+            (policy, [_CompiledRule(rule) for rule in policy.rules])
+            for policy in policies
+        ]
+        with self._lock:
+            if generation == self._generation:
+                self._policies = compiled
+
+    def fail(self, generation: int) -> None:
+        """Record that the policies could not be downloaded during the given generation."""
+        with self._lock:
+            if generation == self._generation:
+                self._failed = True
+
+    def clear(self) -> None:
+        """Drop the loaded policies, so that they are downloaded again."""
+        with self._lock:
+            self._policies = None
+            self._failed = False
+            self._generation += 1
+
+    def evaluate(self, request: schemas.CheckRequest) -> schemas.CheckResponse | None:
+        """
+        Evaluate the loaded policies against the request.
+
+        Returns None if the policies are not loaded.
+        """
+        policies = self._policies
+        if policies is None:
+            return None
+
+        explicit_deny, explicit_allow, default_deny = None, None, None
+        for policy, rules in policies:
+            matched = next((r.rule for r in rules if r.matches(request)), None)
+            if matched is not None:
+                if matched.effect == enums.PolicyEffect.DENY:
+                    explicit_deny = (policy, matched)
+                elif matched.effect == enums.PolicyEffect.ALLOW:
+                    explicit_allow = (policy, matched)
+            elif policy.default_effect == enums.PolicyEffect.DENY:
+                default_deny = policy
+
+        if explicit_deny:
+            policy, rule = explicit_deny
+            return schemas.CheckResponse(
+                allowed=False,
+                reason=f"Rule {rule.name} denied the action in policy {policy.name}",
+            )
+        if explicit_allow:
+            policy, rule = explicit_allow
+            return schemas.CheckResponse(
+                allowed=True,
+                reason=f"Rule {rule.name} allowed the action in policy {policy.name}",
+            )
+        if default_deny:
+            return schemas.CheckResponse(
+                allowed=False,
+                reason="Action denied by default effect",
+            )
+
+        return schemas.CheckResponse(
+            allowed=False,
+            reason="Action denied by default because there are no policies",
+        )
@@ -0,0 +1,55 @@
+import gzip
+import json
+from typing import Any
+
+import httpx
+from eunomia_core import schemas
+
+try:
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# request bodies larger than this size in bytes are compressed
+COMPRESSION_MIN_SIZE = 1024
+
+
+def check_msgpack_available() -> None:
+    if ormsgpack is None:
+        raise ValueError(
+            "MessagePack serialization requires the ormsgpack package, "
+            "installed with `pip install eunomia-sdk[msgpack]`"
+        )
+
+
+def encode_body(data: Any, msgpack: bool, compression: bool) -> dict:
+    """Return the keyword arguments of an httpx request sending the data."""
+    if msgpack:
+        content = ormsgpack.packb(data)
+        headers = {"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE}
+    else:
+        content = json.dumps(data, separators=(",", ":")).encode()
+        headers = {"Content-Type": "application/json"}
+
+    if compression and len(content) >= COMPRESSION_MIN_SIZE:
+        content = gzip.compress(content)
+        headers["Content-Encoding"] = "gzip"
+    return {"content": content, "headers": headers}
+
+
+def decode_body(response: httpx.Response) -> Any:
+    """Decode the body of a response according to its content type."""
+    if response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+        return ormsgpack.unpackb(response.content)
+    return response.json()
+
+
+def encode_ndjson(check_requests: list[schemas.CheckRequest]) -> bytes:
+    """Encode the check requests as JSON lines."""
+    return b"".join(
+        schemas.CheckRequest.model_validate(request).model_dump_json().encode() + b"\n"
+        for request in check_requests
+    )
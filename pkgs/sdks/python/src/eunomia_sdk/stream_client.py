@@ -0,0 +1,170 @@
+import asyncio
+import itertools
+import os
+from typing import Any
+
+from eunomia_core import schemas
+
+try:
+    from websockets.asyncio.client import ClientConnection, connect
+    from websockets.exceptions import ConnectionClosed
+except ImportError:
+    connect = None
+
+
+class AsyncEunomiaStreamClient:
+    """
+    An asynchronous client multiplexing checks over a single WebSocket connection.
+
+    Each check is tagged with a correlation identifier and sent without waiting for
+    the previous ones, while the server returns the decisions as they complete.
+    This avoids the overhead of a request per check for long-lived, high-frequency
+    callers. The connection is opened on the first check and reopened if it drops,
+    failing the checks pending on it.
+
+    Requires the `websockets` package: `pip install eunomia-sdk[websocket]`.
+
+    Parameters
+    ----------
+    endpoint : str, optional
+        The base URL endpoint of the Eunomia server.
+        Defaults to "http://localhost:8421" if not provided.
+    api_key : str, optional
+        The API key for authenticating with the server.
+        Defaults to the environment variable "WAY_API_KEY" if not provided.
+    open_timeout : float, optional
+        The timeout of the connection opening in seconds. Defaults to 10.
+
+    Examples
+    --------
+    >>> async with AsyncEunomiaStreamClient() as client:
+    ...     responses = await asyncio.gather(
+    ...         *(client.check(principal_uri=uri, resource_uri="doc") for uri in uris)
+    ...     )
+    """
+
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        api_key: str | None = None,
+        open_timeout: float = 10,
+    ) -> None:
+        if connect is None:
+            raise ValueError(
+                "The stream client requires the websockets package, "
+                "installed with `pip install eunomia-sdk[websocket]`"
+            )
+
+        endpoint = endpoint if endpoint is not None else "http://localhost:8421"
+        # http becomes ws and https becomes wss
+        self._url = "ws" + endpoint.rstrip("/").removeprefix("http") + "/check/stream"
+        self._api_key = (
+            api_key if api_key is not None else os.getenv("WAY_API_KEY", None)
+        )
+        self._open_timeout = open_timeout
+
+        self._connection: ClientConnection | None = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._reader: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._ids = itertools.count()
+
+    async def __aenter__(self) -> "AsyncEunomiaStreamClient":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connection, failing the pending checks."""
+        if self._connection is not None:
+            await self._connection.close()
+        if self._reader is not None:
+            await self._reader
+            self._reader = None
+
+    async def _connect(self) -> tuple["ClientConnection", dict[str, asyncio.Future]]:
+        async with self._lock:
+            if self._connection is None:
+                headers = {}
+                if self._api_key is not None:
+                    headers["WAY-API-KEY"] = self._api_key
+
+                self._connection = await connect(
+                    self._url,
+                    additional_headers=headers,
+                    open_timeout=self._open_timeout,
+                )
+                self._pending = {}
+                self._reader = asyncio.create_task(
+                    self._read(self._connection, self._pending)
+                )
+            return self._connection, self._pending
+
+    async def _read(
+        self, connection: "ClientConnection", pending: dict[str, asyncio.Future]
+    ) -> None:
+        try:
+            async for data in connection:
+                message = schemas.CheckStreamResponse.model_validate_json(data)
+                future = pending.pop(message.id, None)
+                if future is None or future.done():
+                    continue
+                if message.error is not None:
+                    future.set_exception(RuntimeError(message.error))
+                else:
+                    future.set_result(message.response)
+        except ConnectionClosed:
+            pass
+        finally:
+            if self._connection is connection:
+                self._connection = None
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError("The connection to the server was closed")
+                    )
+            pending.clear()
+
+    async def check(
+        self,
+        principal_uri: str | None = None,
+        resource_uri: str | None = None,
+        principal_attributes: dict | None = None,
+        resource_attributes: dict | None = None,
+        action: str = "access",
+        timeout: float | None = None,
+    ) -> schemas.CheckResponse:
+        """
+        Streaming version of `EunomiaClient.check`.
+
+        Raises
+        ------
+        RuntimeError
+            If the server failed to perform the check.
+        ConnectionError
+            If the connection was closed before the decision was received.
+        asyncio.TimeoutError
+            If the decision was not received within the timeout.
+        """
+        request = schemas.CheckRequest(
+            principal=schemas.PrincipalCheck(
+                uri=principal_uri, attributes=principal_attributes or {}
+            ),
+            resource=schemas.ResourceCheck(
+                uri=resource_uri, attributes=resource_attributes or {}
+            ),
+            action=action,
+        )
+        connection, pending = await self._connect()
+
+        message = schemas.CheckStreamRequest(id=str(next(self._ids)), request=request)
+        future = asyncio.get_running_loop().create_future()
+        pending[message.id] = future
+        try:
+            await connection.send(message.model_dump_json())
+            return await asyncio.wait_for(future, timeout)
+        except ConnectionClosed as e:
+            raise ConnectionError("The connection to the server was closed") from e
+        finally:
+            pending.pop(message.id, None)
@@ -0,0 +1,66 @@
+import contextlib
+import functools
+import inspect
+from typing import Callable, TypeVar
+
+import httpx
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:
+    propagate = None
+    trace = None
+
+F = TypeVar("F", bound=Callable)
+
+# the tracer delegates to the global tracer provider, once configured
+_tracer = trace.get_tracer("eunomia_sdk") if trace is not None else None
+
+
+def start_span(
+    name: str, attributes: dict | None = None
+) -> contextlib.AbstractContextManager:
+    """
+    Start a span as the current span, doing nothing without OpenTelemetry.
+
+    Spans are recorded if the `opentelemetry-api` package is installed, with
+    `pip install eunomia-sdk[tracing]`, and the application configures a tracer
+    provider.
+    """
+    if _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Record a span for each call of the decorated function or coroutine function."""
+
+    def decorator(function: F) -> F:
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(name):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with start_span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def inject_context(request: httpx.Request) -> None:
+    """Propagate the current trace context to the server in the request headers."""
+    if propagate is not None:
+        propagate.inject(request.headers)
+
+
+async def ainject_context(request: httpx.Request) -> None:
+    """Asynchronous version of `inject_context`, for the httpx async event hooks."""
+    inject_context(request)
@@ -1,12 +1,18 @@
 from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from eunomia.api.routers import admin_router_factory, public_router_factory
 from eunomia.config import settings
 from eunomia.server import EunomiaServer
+from eunomia.utils import metrics, tracing
+
+if settings.TRACING_EXPORTER:
+    tracing.configure_tracing(settings.TRACING_EXPORTER)
 
 app = FastAPI(title=settings.PROJECT_NAME, debug=settings.DEBUG)
 server = EunomiaServer()
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
 
 
 @app.get("/health")
@@ -14,6 +20,11 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 app.include_router(public_router_factory(server))
 app.include_router(admin_router_factory(server))
 
@@ -21,6 +21,9 @@ class Settings(BaseSettings):
     # Engine config
     ENGINE_SQL_DATABASE: bool = True
     ENGINE_SQL_DATABASE_URL: str = "sqlite:///./.db/eunomia_db.sqlite"
+    ENGINE_RULE_STATS: bool = True
+    ENGINE_OPTIMIZER: bool = False
+    ENGINE_OPTIMIZER_INTERVAL: int = 10000
 
     # Fetcher config
     FETCHERS: dict[str, dict] = {
@@ -32,6 +35,14 @@ class Settings(BaseSettings):
     ADMIN_API_KEY: str = ""
     BULK_CHECK_MAX_REQUESTS: int = 100
     BULK_CHECK_BATCH_SIZE: int = 10
+    BULK_CHECK_MAX_CONCURRENCY: int = 100
+    BULK_CHECK_ADAPTIVE_CONCURRENCY: bool = False
+    MATRIX_CHECK_MAX_SIZE: int = 100000
+    REVISION_POLL_MAX_TIMEOUT: float = 60
+    COMPRESSION_MIN_SIZE: int = 1024
+    DECOMPRESSED_BODY_MAX_SIZE: int = 10 * 1024 * 1024
+    CHECK_STREAM_MAX_PENDING: int = 100
+    TRACING_EXPORTER: str = ""
 
     model_config = SettingsConfigDict(
         env_file=".env", case_sensitive=True, extra="ignore"
@@ -6,6 +6,7 @@ from sqlalchemy.engine.base import Engine
 from sqlalchemy.orm import DeclarativeBase, declarative_base, sessionmaker
 
 from eunomia.config import Settings
+from eunomia.utils.tracing import instrument_engine
 
 Base: DeclarativeBase = declarative_base()
 SessionLocal: sessionmaker | None = None
@@ -45,6 +46,7 @@ def init_db(sql_database_url: str):
                 )
 
     engine = create_engine(sql_database_url, connect_args=connect_args)
+    instrument_engine(engine)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
 
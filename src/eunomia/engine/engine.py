@@ -1,16 +1,35 @@
+import time
 from typing import Optional
 
 from eunomia_core import enums, schemas
 
 from eunomia.config import settings
 from eunomia.engine.db import crud, db
-from eunomia.engine.evaluator import evaluate_policy
+from eunomia.engine.evaluator import (
+    evaluate_applicable_rules,
+    evaluate_conditions,
+    evaluate_policy,
+    explain_policy,
+    get_applicable_rules,
+    partial_evaluate_policy,
+    simplify_residual,
+)
+from eunomia.engine.optimizer import PolicyOptimizer
+from eunomia.engine.stats import RuleStatsRecorder
+from eunomia.utils import metrics, tracing
+from eunomia.utils.revision import revision_tracker
 
 
 class PolicyEngine:
     def __init__(self):
         self._db_enabled = settings.ENGINE_SQL_DATABASE
         self.policies: list[schemas.Policy] = []
+        self._stats = RuleStatsRecorder() if settings.ENGINE_RULE_STATS else None
+        self._optimizer = (
+            PolicyOptimizer(settings.ENGINE_OPTIMIZER_INTERVAL)
+            if settings.ENGINE_OPTIMIZER
+            else None
+        )
 
         if self._db_enabled:
             db.init_db(settings.ENGINE_SQL_DATABASE_URL)
@@ -28,6 +47,9 @@ class PolicyEngine:
             with db.SessionLocal() as db_session:
                 crud.create_policy(policy, db=db_session)
         self.policies.append(policy)
+        if self._stats is not None:
+            self._stats.reset(policy.name)
+        revision_tracker.bump()
 
     def remove_policy(self, policy_name: str) -> bool:
         """Remove a policy by name from the engine and database."""
@@ -42,6 +64,11 @@ class PolicyEngine:
             updated_policies = [p for p in self.policies if p.name != policy_name]
             if len(updated_policies) != len(self.policies):
                 self.policies = updated_policies
+                if self._stats is not None:
+                    self._stats.reset(policy_name)
+                if self._optimizer is not None:
+                    self._optimizer.retain(self.policies)
+                revision_tracker.bump()
                 return True
         return False
 
@@ -56,17 +83,68 @@ class PolicyEngine:
                 return policy
         return None
 
+    def get_policy_stats(self, policy_name: str) -> Optional[schemas.PolicyStats]:
+        """
+        Retrieve the statistics of the rules of a policy by name.
+
+        Only single checks are recorded, bulk and matrix checks are not.
+        """
+        if self._stats is None:
+            raise ValueError("Rule statistics are disabled")
+        policy = self.get_policy(policy_name)
+        if policy is None:
+            return None
+        return self._stats.collect(policy)
+
+    def reset_policy_stats(self, policy_name: str) -> bool:
+        """Reset the statistics of the rules of a policy by name."""
+        if self._stats is None:
+            raise ValueError("Rule statistics are disabled")
+        if self.get_policy(policy_name) is None:
+            return False
+        self._stats.reset(policy_name)
+        return True
+
+    def optimize(self) -> None:
+        """
+        Recompile the evaluation order of the policies from their runtime profile.
+
+        This is done periodically when the optimizer is enabled, and has no effect
+        otherwise.
+        """
+        if self._optimizer is not None:
+            self._optimizer.optimize(self.policies)
+
     def _evaluate(
-        self, request: schemas.CheckRequest
-    ) -> list[schemas.PolicyEvaluationResult]:
-        """Evaluate all policies against the check request."""
-        results = []
+        self, policies: list[schemas.Policy], request: schemas.CheckRequest
+    ) -> tuple[list[schemas.PolicyEvaluationResult], int]:
+        """
+        Evaluate the policies against the check request.
 
-        for policy in self.policies:
-            result = evaluate_policy(policy, request)
+        Returns the result of each policy and the number of rules evaluated.
+        """
+        results, rules_evaluated = [], 0
+
+        for policy in policies:
+            counters = self._stats.counters(policy) if self._stats else None
+            if self._optimizer is not None:
+                compiled = self._optimizer.compiled(policy)
+                result, evaluated = compiled.evaluate(request, counters)
+                rules_evaluated += evaluated
+            else:
+                result = evaluate_policy(policy, request, counters)
+                # the rules are evaluated in declaration order up to the matching one
+                if result.matched_rule is None:
+                    rules_evaluated += len(policy.rules)
+                else:
+                    rules_evaluated += next(
+                        i
+                        for i, rule in enumerate(policy.rules, 1)
+                        if rule is result.matched_rule
+                    )
             results.append(result)
 
-        return results
+        return results, rules_evaluated
 
     def evaluate_all(self, request: schemas.CheckRequest) -> schemas.CheckResponse:
         """
@@ -76,9 +154,182 @@ class PolicyEngine:
         If any policy explicitly matches a rule with ALLOW effect, the result is ALLOW.
         If no explicit rule matches, and any policy returns a default DENY, the result is DENY.
         If no policies matched or there are no policies, deny by default.
+
+        When the optimizer is enabled, the conditions and the rules of each policy
+        are evaluated in their optimized order, giving the same decision.
+        """
+        start = time.perf_counter()
+        policies = self.policies
+        with tracing.start_span("eunomia.evaluate") as span:
+            results, rules_evaluated = self._evaluate(policies, request)
+            response = self._combine(results)
+            if span is not None:
+                span.set_attribute("eunomia.allowed", response.allowed)
+        metrics.policy_evaluation_duration.observe(
+            time.perf_counter() - start, mode="single"
+        )
+        if self._optimizer is not None:
+            self._optimizer.tick(policies)
+
+        metrics.rules_evaluated.observe(rules_evaluated)
+
+        last_deny, last_allow = None, None
+        for policy, result in zip(policies, results):
+            if result.matched_rule is None:
+                continue
+            index = next(
+                i for i, rule in enumerate(policy.rules) if rule is result.matched_rule
+            )
+            if result.effect == enums.PolicyEffect.DENY:
+                last_deny = (policy, index)
+            elif result.effect == enums.PolicyEffect.ALLOW:
+                last_allow = (policy, index)
+
+        # the applied rule is the one whose effect is the decision of `_combine`
+        applied = last_deny or last_allow
+        if self._stats is not None and applied is not None:
+            policy, index = applied
+            self._stats.counters(policy).applied[index] += 1
+        metrics.checks.inc(decision="allowed" if response.allowed else "denied")
+        return response
+
+    def explain(self, request: schemas.CheckRequest) -> schemas.ExplainedCheckResponse:
         """
-        results = self._evaluate(request)
+        Evaluate all policies like `evaluate_all`, explaining the decision.
 
+        The explanation lists every rule evaluated in each policy, the conditions
+        evaluated with the resolved attribute values, where the evaluation of each
+        rule stopped and the time spent on each step. It is slower than
+        `evaluate_all`, which remains unaffected.
+        """
+        results, policies = [], []
+        for policy in self.policies:
+            result, explanation = explain_policy(policy, request)
+            results.append(result)
+            policies.append(explanation)
+
+        response = self._combine(results)
+        return schemas.ExplainedCheckResponse(
+            allowed=response.allowed,
+            reason=response.reason,
+            policies=policies,
+            duration_ns=sum(policy.duration_ns for policy in policies),
+        )
+
+    def evaluate_bulk(
+        self,
+        principal: schemas.PrincipalCheck,
+        action: str,
+        resources: list[schemas.ResourceCheck],
+    ) -> list[schemas.CheckResponse]:
+        """
+        Evaluate all policies for a principal and an action against many resources.
+
+        The result is the same as `evaluate_all` for each resource, but the action and
+        the principal conditions of each rule are evaluated once for all resources,
+        leaving only the resource conditions to evaluate per resource.
+        """
+        start = time.perf_counter()
+        applicable = [
+            (policy, get_applicable_rules(policy, principal, action))
+            for policy in self.policies
+        ]
+        responses = [
+            self._combine(
+                [
+                    evaluate_applicable_rules(policy, rules, resource)
+                    for policy, rules in applicable
+                ]
+            )
+            for resource in resources
+        ]
+        metrics.policy_evaluation_duration.observe(
+            time.perf_counter() - start, mode="bulk"
+        )
+        allowed = sum(response.allowed for response in responses)
+        metrics.checks.inc(allowed, decision="allowed")
+        metrics.checks.inc(len(responses) - allowed, decision="denied")
+        return responses
+
+    def evaluate_matrix(
+        self,
+        principals: list[schemas.PrincipalCheck],
+        resources: list[schemas.ResourceCheck],
+        actions: list[str],
+    ) -> list[list[int]]:
+        """
+        Evaluate all policies for every combination of principal, resource and action.
+
+        The decisions are the same as `evaluate_all`, computed on bitmasks over the
+        resources: the resource conditions of each rule are evaluated once per
+        resource and its principal conditions once per principal, then the rules of
+        each policy are applied in order to all the resources at once.
+
+        Returns
+        -------
+        list[list[int]]
+            For each principal and action, the mask of the allowed resources,
+            where bit `i` is set if resource `i` is allowed.
+        """
+        start = time.perf_counter()
+        everything = (1 << len(resources)) - 1
+        policies = [
+            [
+                (
+                    rule,
+                    sum(
+                        1 << i
+                        for i, resource in enumerate(resources)
+                        if evaluate_conditions(rule.resource_conditions, resource)
+                    ),
+                )
+                for rule in policy.rules
+            ]
+            for policy in self.policies
+        ]
+
+        matrix = []
+        for principal in principals:
+            principal_matches = [
+                [
+                    evaluate_conditions(rule.principal_conditions, principal)
+                    for rule, _ in rules
+                ]
+                for rules in policies
+            ]
+            row = []
+            for action in actions:
+                allowed, denied = 0, 0
+                for rules, matches in zip(policies, principal_matches):
+                    # resources not matched yet by a rule of the policy
+                    remaining = everything
+                    for (rule, mask), match in zip(rules, matches):
+                        if not match or action not in rule.actions:
+                            continue
+                        if rule.effect == enums.PolicyEffect.DENY:
+                            denied |= mask & remaining
+                        elif rule.effect == enums.PolicyEffect.ALLOW:
+                            allowed |= mask & remaining
+                        remaining &= ~mask
+                        if not remaining:
+                            break
+                # default effects never allow an action
+                row.append(allowed & ~denied)
+            matrix.append(row)
+
+        metrics.policy_evaluation_duration.observe(
+            time.perf_counter() - start, mode="matrix"
+        )
+        allowed = sum(mask.bit_count() for row in matrix for mask in row)
+        decisions = len(principals) * len(resources) * len(actions)
+        metrics.checks.inc(allowed, decision="allowed")
+        metrics.checks.inc(decisions - allowed, decision="denied")
+        return matrix
+
+    def _combine(
+        self, results: list[schemas.PolicyEvaluationResult]
+    ) -> schemas.CheckResponse:
+        """Combine the results of the policies into a single decision."""
         explicit_deny, explicit_allow, default_deny = None, None, None
         for result in results:
             if result.matched_rule:
@@ -109,3 +360,24 @@ class PolicyEngine:
             allowed=False,
             reason="Action denied by default because there are no policies",
         )
+
+    def partial_evaluate(
+        self, principal: schemas.PrincipalCheck, action: str
+    ) -> schemas.PartialCheckResponse:
+        """
+        Evaluate all policies for a principal and an action, leaving the resource unknown.
+
+        The result is the simplified residual expression over the resource:
+        a resource is allowed if any rule in `allow_if` applies to it and no rule
+        in `deny_if` does, consistently with `evaluate_all`. Clients can push it down
+        as a filter in their own queries instead of checking every resource.
+        """
+        allow_if, deny_if = [], []
+        for policy in self.policies:
+            allow_rules, deny_rules = partial_evaluate_policy(policy, principal, action)
+            allow_if.extend(allow_rules)
+            deny_if.extend(deny_rules)
+
+        return simplify_residual(
+            schemas.PartialCheckResponse(allow_if=allow_if, deny_if=deny_if)
+        )
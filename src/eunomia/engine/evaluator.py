@@ -1,7 +1,10 @@
+import time
 from typing import Any
 
 from eunomia_core import enums, schemas
 
+from eunomia.engine.stats import RuleCounters
+
 
 def get_attribute_value(obj: Any, path: str) -> Any:
     """Extract a value from an object using dot notation path."""
@@ -103,11 +106,24 @@ def evaluate_rule(rule: schemas.Rule, request: schemas.CheckRequest) -> bool:
 
 
 def evaluate_policy(
-    policy: schemas.Policy, request: schemas.CheckRequest
+    policy: schemas.Policy,
+    request: schemas.CheckRequest,
+    counters: RuleCounters | None = None,
 ) -> schemas.PolicyEvaluationResult:
-    """Evaluate a policy against a check request."""
-    for rule in policy.rules:
-        if evaluate_rule(rule, request):
+    """
+    Evaluate a policy against a check request.
+
+    If counters are given, the evaluation and the time of each rule are recorded.
+    """
+    for index, rule in enumerate(policy.rules):
+        if counters is None:
+            matched = evaluate_rule(rule, request)
+        else:
+            start = time.perf_counter_ns()
+            matched = evaluate_rule(rule, request)
+            counters.record(index, matched, time.perf_counter_ns() - start)
+
+        if matched:
             return schemas.PolicyEvaluationResult(
                 effect=rule.effect, matched_rule=rule, policy_name=policy.name
             )
@@ -116,3 +132,230 @@ def evaluate_policy(
     return schemas.PolicyEvaluationResult(
         effect=policy.default_effect, matched_rule=None, policy_name=policy.name
     )
+
+
+def get_applicable_rules(
+    policy: schemas.Policy, principal: schemas.PrincipalCheck, action: str
+) -> list[schemas.Rule]:
+    """Return the rules of a policy matching the principal and the action, in order."""
+    return [
+        rule
+        for rule in policy.rules
+        if action in rule.actions
+        and evaluate_conditions(rule.principal_conditions, principal)
+    ]
+
+
+def evaluate_applicable_rules(
+    policy: schemas.Policy, rules: list[schemas.Rule], resource: schemas.ResourceCheck
+) -> schemas.PolicyEvaluationResult:
+    """
+    Evaluate a policy against a resource, given its rules applicable to the request.
+
+    Only the resource conditions of the rules are evaluated, giving the same result
+    as `evaluate_policy` since the other rules cannot match.
+    """
+    for rule in rules:
+        if evaluate_conditions(rule.resource_conditions, resource):
+            return schemas.PolicyEvaluationResult(
+                effect=rule.effect, matched_rule=rule, policy_name=policy.name
+            )
+
+    return schemas.PolicyEvaluationResult(
+        effect=policy.default_effect, matched_rule=None, policy_name=policy.name
+    )
+
+
+def explain_conditions(
+    conditions: list[schemas.Condition], obj: Any
+) -> tuple[bool, list[schemas.ConditionExplanation]]:
+    """
+    Evaluate a list of conditions like `evaluate_conditions`, explaining each one.
+
+    The conditions are evaluated in order up to the first one not matching.
+    """
+    explanations = []
+    for condition in conditions:
+        start = time.perf_counter_ns()
+        target_value = get_attribute_value(obj, condition.path)
+        matched = apply_operator(condition.operator, condition.value, target_value)
+        duration_ns = time.perf_counter_ns() - start
+
+        explanations.append(
+            schemas.ConditionExplanation(
+                condition=condition,
+                attribute_value=target_value,
+                matched=matched,
+                duration_ns=duration_ns,
+            )
+        )
+        if not matched:
+            return False, explanations
+    return True, explanations
+
+
+def explain_rule(
+    rule: schemas.Rule, request: schemas.CheckRequest
+) -> schemas.RuleExplanation:
+    """Evaluate a rule like `evaluate_rule`, explaining where it stopped."""
+    start = time.perf_counter_ns()
+    action_match = request.action in rule.actions
+    duration_ns = time.perf_counter_ns() - start
+
+    explanation = schemas.RuleExplanation(
+        name=rule.name, effect=rule.effect, matched=False, duration_ns=0
+    )
+    if not action_match:
+        explanation.short_circuit = "action"
+    else:
+        for side, conditions, obj in (
+            ("principal_conditions", rule.principal_conditions, request.principal),
+            ("resource_conditions", rule.resource_conditions, request.resource),
+        ):
+            matched, explanations = explain_conditions(conditions, obj)
+            setattr(explanation, side, explanations)
+            duration_ns += sum(e.duration_ns for e in explanations)
+            if not matched:
+                explanation.short_circuit = f"{side}[{len(explanations) - 1}]"
+                break
+        else:
+            explanation.matched = True
+
+    # the time spent building the explanation is not accounted
+    explanation.duration_ns = duration_ns
+    return explanation
+
+
+def explain_policy(
+    policy: schemas.Policy, request: schemas.CheckRequest
+) -> tuple[schemas.PolicyEvaluationResult, schemas.PolicyExplanation]:
+    """Evaluate a policy like `evaluate_policy`, explaining each rule evaluated."""
+    rules = []
+    for rule in policy.rules:
+        explanation = explain_rule(rule, request)
+        rules.append(explanation)
+        if explanation.matched:
+            result = schemas.PolicyEvaluationResult(
+                effect=rule.effect, matched_rule=rule, policy_name=policy.name
+            )
+            break
+    else:
+        result = schemas.PolicyEvaluationResult(
+            effect=policy.default_effect, matched_rule=None, policy_name=policy.name
+        )
+
+    return result, schemas.PolicyExplanation(
+        name=policy.name,
+        effect=result.effect,
+        matched_rule=result.matched_rule.name if result.matched_rule else None,
+        rules=rules,
+        duration_ns=sum(rule.duration_ns for rule in rules),
+    )
+
+
+def partial_evaluate_policy(
+    policy: schemas.Policy, principal: schemas.PrincipalCheck, action: str
+) -> tuple[list[schemas.ResidualRule], list[schemas.ResidualRule]]:
+    """
+    Evaluate a policy against a principal and an action, leaving the resource unknown.
+
+    Rules that cannot match the principal or the action are discarded, while the others
+    are reduced to their resource conditions. Since the first matching rule determines
+    the policy effect, each residual DENY rule keeps the conditions of the preceding
+    ALLOW rules, which void it when they match. ALLOW rules do not need them: when
+    a preceding DENY rule matches, either the resource is denied anyway or another
+    ALLOW rule of the policy matches first.
+
+    Returns
+    -------
+    tuple[list[schemas.ResidualRule], list[schemas.ResidualRule]]
+        The residual rules with ALLOW effect and the ones with DENY effect.
+    """
+    allow_rules, deny_rules = [], []
+    preceding_allow: list[list[schemas.Condition]] = []
+
+    for rule in policy.rules:
+        if action not in rule.actions:
+            continue
+        if not evaluate_conditions(rule.principal_conditions, principal):
+            continue
+
+        if rule.effect == enums.PolicyEffect.ALLOW:
+            allow_rules.append(
+                schemas.ResidualRule(
+                    policy_name=policy.name,
+                    rule_name=rule.name,
+                    conditions=rule.resource_conditions,
+                )
+            )
+            preceding_allow.append(rule.resource_conditions)
+        else:
+            deny_rules.append(
+                schemas.ResidualRule(
+                    policy_name=policy.name,
+                    rule_name=rule.name,
+                    conditions=rule.resource_conditions,
+                    unless=list(preceding_allow),
+                )
+            )
+
+        if not rule.resource_conditions:
+            # the rule matches every resource, following rules are unreachable
+            break
+
+    return allow_rules, deny_rules
+
+
+def simplify_residual(
+    partial: schemas.PartialCheckResponse,
+) -> schemas.PartialCheckResponse:
+    """
+    Simplify the residual rules of a partial evaluation, preserving its decisions.
+
+    Rules that can never apply are dropped, as well as duplicated rules and rules
+    made redundant by an unconditional one.
+    """
+
+    def applicable(rules: list[schemas.ResidualRule]) -> list[schemas.ResidualRule]:
+        unique, seen = [], set()
+        for rule in rules:
+            if any(not conditions for conditions in rule.unless):
+                continue  # voided by a rule matching every resource
+            key = (
+                tuple(c.model_dump_json() for c in rule.conditions),
+                tuple(tuple(c.model_dump_json() for c in u) for u in rule.unless),
+            )
+            if key not in seen:
+                seen.add(key)
+                unique.append(rule)
+        return unique
+
+    allow_if, deny_if = applicable(partial.allow_if), applicable(partial.deny_if)
+
+    for rule in deny_if:
+        if not rule.conditions and not rule.unless:
+            # every resource is denied
+            return schemas.PartialCheckResponse(allow_if=[], deny_if=[rule])
+    if not allow_if:
+        # nothing can be allowed, deny rules are irrelevant
+        return schemas.PartialCheckResponse(allow_if=[], deny_if=[])
+    for rule in allow_if:
+        if not rule.conditions:
+            # every resource is allowed unless denied
+            allow_if = [rule]
+            break
+
+    return schemas.PartialCheckResponse(allow_if=allow_if, deny_if=deny_if)
+
+
+def evaluate_residual(partial: schemas.PartialCheckResponse, obj: Any) -> bool:
+    """Evaluate the residual rules of a partial evaluation against a resource."""
+
+    def applies(rule: schemas.ResidualRule) -> bool:
+        return evaluate_conditions(rule.conditions, obj) and not any(
+            evaluate_conditions(conditions, obj) for conditions in rule.unless
+        )
+
+    return any(applies(rule) for rule in partial.allow_if) and not any(
+        applies(rule) for rule in partial.deny_if
+    )
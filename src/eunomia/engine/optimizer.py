@@ -0,0 +1,258 @@
+import math
+import time
+
+from eunomia_core import enums, schemas
+
+from eunomia.engine.evaluator import evaluate_condition
+from eunomia.engine.stats import RuleCounters
+
+
+def conditions_exclusive(a: schemas.Condition, b: schemas.Condition) -> bool:
+    """Check if two conditions on the same path can never both match."""
+    if a.path != b.path:
+        return False
+
+    operators = enums.ConditionOperator
+    for x, y in ((a, b), (b, a)):
+        if x.operator == operators.EQUALS:
+            if y.operator == operators.EQUALS and x.value != y.value:
+                return True
+            if y.operator == operators.NOT_EQUALS and x.value == y.value:
+                return True
+            if isinstance(y.value, list):
+                if y.operator == operators.IN and x.value not in y.value:
+                    return True
+                if y.operator == operators.NOT_IN and x.value in y.value:
+                    return True
+        elif x.operator == operators.IN and y.operator == operators.IN:
+            if isinstance(x.value, list) and isinstance(y.value, list):
+                return not any(value in y.value for value in x.value)
+    return False
+
+
+def rules_exclusive(a: schemas.Rule, b: schemas.Rule) -> bool:
+    """
+    Check if two rules can never both match a check request.
+
+    The check is conservative: it only detects disjoint actions and contradicting
+    conditions on the same attribute, so some exclusive rules are not detected.
+    """
+    if not set(a.actions) & set(b.actions):
+        return True
+    return any(
+        conditions_exclusive(x, y)
+        for x_conditions, y_conditions in (
+            (a.principal_conditions, b.principal_conditions),
+            (a.resource_conditions, b.resource_conditions),
+        )
+        for x in x_conditions
+        for y in y_conditions
+    )
+
+
+def rules_swappable(a: schemas.Rule, b: schemas.Rule) -> bool:
+    """
+    Check if two adjacent rules of a policy can be swapped without changing its effect.
+
+    Rules with the same effect give the same effect whichever matches first, although
+    the matched rule may differ, and exclusive rules never match the same request.
+    """
+    return a.effect == b.effect or rules_exclusive(a, b)
+
+
+class CompiledRule:
+    """
+    A rule with its conditions in evaluation order and their runtime profile.
+
+    One evaluation out of `sample_every` evaluates all the conditions and records
+    whether each one passed and how long it took, the others stop at the first
+    condition failing. The profile tolerates the lost updates of concurrent checks,
+    since it only drives the evaluation order and never the decision.
+    """
+
+    def __init__(self, index: int, rule: schemas.Rule, sample_every: int) -> None:
+        self.index = index
+        self.rule = rule
+        # the conditions in declaration order, with the side they apply to
+        self.conditions = [(c, True) for c in rule.principal_conditions] + [
+            (c, False) for c in rule.resource_conditions
+        ]
+        self.order = list(self.conditions)
+        self.rank: float | None = None
+        self.evaluated, self.action_matched, self.matched = 0, 0, 0
+        self.passed = [0] * len(self.conditions)
+        self.time_ns = [0] * len(self.conditions)
+        self._sample_every = self._countdown = sample_every
+
+    def evaluate(self, request: schemas.CheckRequest) -> bool:
+        """Evaluate if the rule matches the check request, like `evaluate_rule`."""
+        self._countdown -= 1
+        if not self._countdown:
+            self._countdown = self._sample_every
+            return self._profile(request)
+
+        if request.action not in self.rule.actions:
+            return False
+        principal, resource = request.principal, request.resource
+        for condition, on_principal in self.order:
+            if not evaluate_condition(
+                condition, principal if on_principal else resource
+            ):
+                return False
+        return True
+
+    def _profile(self, request: schemas.CheckRequest) -> bool:
+        self.evaluated += 1
+        if request.action not in self.rule.actions:
+            return False
+        self.action_matched += 1
+
+        matched = True
+        for position, (condition, on_principal) in enumerate(self.conditions):
+            start = time.perf_counter_ns()
+            passed = evaluate_condition(
+                condition, request.principal if on_principal else request.resource
+            )
+            self.time_ns[position] += time.perf_counter_ns() - start
+            self.passed[position] += passed
+            matched = matched and passed
+        self.matched += matched
+        return matched
+
+    def optimize(self) -> None:
+        """
+        Order the conditions by increasing cost per failure and rank the rule.
+
+        Under independent conditions, this order minimizes the expected cost of
+        the evaluation. The rank of the rule is its expected cost per match, or
+        None if the rule was never profiled.
+        """
+        if not self.evaluated:
+            self.rank = None
+            return
+        if not self.action_matched:
+            self.rank = math.inf
+            return
+
+        def cost_per_failure(position: int) -> float:
+            failure = 1 - self.passed[position] / self.action_matched
+            if not failure:
+                return math.inf
+            return self.time_ns[position] / self.action_matched / failure
+
+        positions = sorted(range(len(self.conditions)), key=cost_per_failure)
+        self.order = [self.conditions[position] for position in positions]
+
+        cost, reached = 0.0, self.action_matched / self.evaluated
+        for position in positions:
+            cost += reached * self.time_ns[position] / self.action_matched
+            reached *= self.passed[position] / self.action_matched
+        self.rank = cost * self.evaluated / self.matched if self.matched else math.inf
+
+
+class CompiledPolicy:
+    """A policy with its rules in evaluation order, optimized from their profile."""
+
+    def __init__(self, policy: schemas.Policy, sample_every: int) -> None:
+        self.policy = policy
+        self.rules = [
+            CompiledRule(index, rule, sample_every)
+            for index, rule in enumerate(policy.rules)
+        ]
+        self.order = list(self.rules)
+
+    def evaluate(
+        self, request: schemas.CheckRequest, counters: RuleCounters | None = None
+    ) -> tuple[schemas.PolicyEvaluationResult, int]:
+        """
+        Evaluate the policy against a check request, like `evaluate_policy`.
+
+        Returns the result and the number of rules evaluated in the optimized order.
+        """
+        # the order is read once, as it may be recompiled concurrently
+        order = self.order
+        for evaluated, rule in enumerate(order, 1):
+            if counters is None:
+                matched = rule.evaluate(request)
+            else:
+                start = time.perf_counter_ns()
+                matched = rule.evaluate(request)
+                counters.record(rule.index, matched, time.perf_counter_ns() - start)
+
+            if matched:
+                result = schemas.PolicyEvaluationResult(
+                    effect=rule.rule.effect,
+                    matched_rule=rule.rule,
+                    policy_name=self.policy.name,
+                )
+                return result, evaluated
+
+        result = schemas.PolicyEvaluationResult(
+            effect=self.policy.default_effect,
+            matched_rule=None,
+            policy_name=self.policy.name,
+        )
+        return result, len(order)
+
+    def optimize(self) -> None:
+        """
+        Reorder the conditions of each rule, then the rules by increasing rank.
+
+        Starting from the declaration order, adjacent rules are only swapped when
+        `rules_swappable`, so the effect of the policy is unchanged for any request.
+        """
+        for rule in self.rules:
+            rule.optimize()
+
+        order = list(self.rules)
+        swapped = True
+        while swapped:
+            swapped = False
+            for i in range(len(order) - 1):
+                a, b = order[i], order[i + 1]
+                if a.rank is None or b.rank is None or b.rank >= a.rank:
+                    continue
+                if rules_swappable(a.rule, b.rule):
+                    order[i], order[i + 1] = b, a
+                    swapped = True
+        self.order = order
+
+
+class PolicyOptimizer:
+    """
+    Profile-guided evaluation order of the policies.
+
+    The policies are compiled on their first evaluation and recompiled every
+    `interval` checks from the profile collected in the meantime.
+    """
+
+    def __init__(self, interval: int, sample_every: int = 16) -> None:
+        self._interval = interval
+        self._sample_every = sample_every
+        self._compiled: dict[int, CompiledPolicy] = {}
+        self._checks = 0
+
+    def compiled(self, policy: schemas.Policy) -> CompiledPolicy:
+        """Return the compiled policy, compiling it on its first evaluation."""
+        compiled = self._compiled.get(id(policy))
+        if compiled is None or compiled.policy is not policy:
+            compiled = self._compiled[id(policy)] = CompiledPolicy(
+                policy, self._sample_every
+            )
+        return compiled
+
+    def tick(self, policies: list[schemas.Policy]) -> None:
+        """Count a check, recompiling the policies every `interval` checks."""
+        self._checks += 1
+        if self._checks >= self._interval:
+            self._checks = 0
+            self.optimize(policies)
+
+    def optimize(self, policies: list[schemas.Policy]) -> None:
+        """Recompile the evaluation order of the policies from their profile."""
+        for policy in policies:
+            self.compiled(policy).optimize()
+
+    def retain(self, policies: list[schemas.Policy]) -> None:
+        """Drop the compiled policies not in the given ones."""
+        self._compiled = {id(policy): self.compiled(policy) for policy in policies}
@@ -41,4 +41,17 @@ def engine_router_factory(engine: PolicyEngine) -> APIRouter:
     async def delete_policy(name: str):
         return engine.remove_policy(name)
 
+    @router.get("/policies/{name}/stats", response_model=schemas.PolicyStats)
+    async def get_policy_stats(name: str):
+        stats = engine.get_policy_stats(name)
+        if stats is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Policy not found"
+            )
+        return stats
+
+    @router.delete("/policies/{name}/stats", response_model=bool)
+    async def reset_policy_stats(name: str):
+        return engine.reset_policy_stats(name)
+
     return router
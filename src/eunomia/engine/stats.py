@@ -0,0 +1,85 @@
+import threading
+
+from eunomia_core import schemas
+
+
+class RuleCounters:
+    """Counters of the rules of a policy, indexed by the position of the rule."""
+
+    __slots__ = ("applied", "evaluated", "matched", "time_ns")
+
+    def __init__(self, size: int) -> None:
+        self.evaluated = [0] * size
+        self.matched = [0] * size
+        self.applied = [0] * size
+        self.time_ns = [0] * size
+
+    def record(self, index: int, matched: bool, time_ns: int) -> None:
+        self.evaluated[index] += 1
+        self.time_ns[index] += time_ns
+        if matched:
+            self.matched[index] += 1
+
+
+class RuleStatsRecorder:
+    """
+    Per-rule statistics of the policies, sharded by thread.
+
+    Each thread records into its own shard without locking, and the shards are
+    only summed when the statistics are read. Counters are keyed by policy name
+    and rule position, so they must be reset when a policy changes.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: list[dict[str, RuleCounters]] = []
+        self._lock = threading.Lock()
+
+    def counters(self, policy: schemas.Policy) -> RuleCounters:
+        """Return the counters of the policy in the shard of the current thread."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+
+        counters = shard.get(policy.name)
+        if counters is None or len(counters.evaluated) != len(policy.rules):
+            counters = shard[policy.name] = RuleCounters(len(policy.rules))
+        return counters
+
+    def collect(self, policy: schemas.Policy) -> schemas.PolicyStats:
+        """Sum the counters of the policy across all shards."""
+        size = len(policy.rules)
+        total = RuleCounters(size)
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            counters = shard.get(policy.name)
+            if counters is None or len(counters.evaluated) != size:
+                continue
+            for field in RuleCounters.__slots__:
+                values = getattr(total, field)
+                for index, value in enumerate(getattr(counters, field)):
+                    values[index] += value
+
+        return schemas.PolicyStats(
+            name=policy.name,
+            rules=[
+                schemas.RuleStats(
+                    name=rule.name,
+                    evaluated=total.evaluated[index],
+                    matched=total.matched[index],
+                    applied=total.applied[index],
+                    total_time_ns=total.time_ns[index],
+                )
+                for index, rule in enumerate(policy.rules)
+            ],
+        )
+
+    def reset(self, policy_name: str) -> None:
+        """Reset the counters of the policy in all shards."""
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            shard.pop(policy_name, None)
@@ -9,6 +9,7 @@ from jose import jwt
 from eunomia.fetchers.base import BaseFetcher, BaseFetcherConfig
 from eunomia.fetchers.factory import FetcherFactory
 from eunomia.fetchers.registry import RegistryFetcher
+from eunomia.utils.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
@@ -123,14 +124,15 @@ class PassportFetcher(BaseFetcher):
             raise
 
     def _verify_passport(self, token: str) -> PassportJWT:
-        return PassportJWT.model_validate(
-            jwt.decode(
-                token,
-                self.config.jwt_secret,
-                algorithms=[self.config.jwt_algorithm],
-                issuer=self.config.jwt_issuer,
+        with start_span("eunomia.passport.verify"):
+            return PassportJWT.model_validate(
+                jwt.decode(
+                    token,
+                    self.config.jwt_secret,
+                    algorithms=[self.config.jwt_algorithm],
+                    issuer=self.config.jwt_issuer,
+                )
             )
-        )
 
     async def fetch_attributes(self, uri: str) -> dict:
         # this fetcher is receiving the access token as uri
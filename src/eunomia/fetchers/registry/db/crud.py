@@ -1,11 +1,42 @@
 import json
+from typing import Any
 
-from eunomia_core import schemas
-from sqlalchemy.orm import Session, joinedload
+from eunomia_core import enums, schemas
+from sqlalchemy import ColumnElement, and_, false, or_, select, true
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from eunomia.fetchers.registry.db import models
 
 
+def typed_values(value: Any) -> tuple[str | None, float | None]:
+    """Split an attribute value into its indexed string and numeric columns."""
+    if isinstance(value, str):
+        return value, None
+    if isinstance(value, (int, float)):
+        return None, float(value)
+    return None, None
+
+
+def _build_attribute(attribute: schemas.Attribute) -> models.Attribute:
+    value_str, value_num = typed_values(attribute.value)
+    return models.Attribute(
+        key=attribute.key,
+        value=json.dumps(attribute.value),
+        value_str=value_str,
+        value_num=value_num,
+    )
+
+
+def _build_entity(entity: schemas.EntityCreate) -> models.Entity:
+    db_entity = models.Entity(
+        uri=entity.uri,
+        type=entity.type,
+    )
+    for attribute in entity.attributes:
+        db_entity.attributes.append(_build_attribute(attribute))
+    return db_entity
+
+
 def create_entity(entity: schemas.EntityCreate, db: Session) -> models.Entity:
     """
     Create a new entity in the database.
@@ -25,22 +56,110 @@ def create_entity(entity: schemas.EntityCreate, db: Session) -> models.Entity:
     models.Entity
         The created entity as a SQLAlchemy model.
     """
-    db_entity = models.Entity(
-        uri=entity.uri,
-        type=entity.type,
-    )
-    for attribute in entity.attributes:
-        db_attribute = models.Attribute(
-            key=attribute.key, value=json.dumps(attribute.value)
-        )
-        db_entity.attributes.append(db_attribute)
-
+    db_entity = _build_entity(entity)
     db.add(db_entity)
     db.commit()
     db.refresh(db_entity)
     return db_entity
 
 
+def create_entities(
+    entities: list[schemas.EntityCreate], db: Session
+) -> list[models.Entity]:
+    """
+    Create multiple entities in the database within a single transaction.
+
+    Parameters
+    ----------
+    entities : list[schemas.EntityCreate]
+        Pydantic models containing the entity data to be created.
+    db : Session
+        SQLAlchemy database session.
+
+    Returns
+    -------
+    list[models.Entity]
+        The created entities as SQLAlchemy models, in the same order.
+    """
+    db.add_all([_build_entity(entity) for entity in entities])
+    db.commit()
+
+    uris = [entity.uri for entity in entities]
+    db_entities = (
+        db.query(models.Entity)
+        .options(selectinload(models.Entity.attributes))
+        .filter(models.Entity.uri.in_(uris))
+        .all()
+    )
+    by_uri = {db_entity.uri: db_entity for db_entity in db_entities}
+    return [by_uri[uri] for uri in uris]
+
+
+def upsert_entities(
+    entities: list[schemas.EntityCreate], db: Session
+) -> tuple[list[models.Entity], bool]:
+    """
+    Create or replace multiple entities in the database within a single transaction.
+
+    New entities are created, while the type and attributes of the registered ones
+    are replaced only if they differ, so that unchanged entities cost no write.
+
+    Parameters
+    ----------
+    entities : list[schemas.EntityCreate]
+        Pydantic models containing the entity data to be upserted.
+    db : Session
+        SQLAlchemy database session.
+
+    Returns
+    -------
+    tuple[list[models.Entity], bool]
+        The upserted entities as SQLAlchemy models, in the same order,
+        and whether any of them was created or replaced.
+    """
+    uris = [entity.uri for entity in entities]
+    existing = {
+        db_entity.uri: db_entity
+        for db_entity in db.query(models.Entity)
+        .options(selectinload(models.Entity.attributes))
+        .filter(models.Entity.uri.in_(uris))
+    }
+
+    changed = False
+    for entity in entities:
+        db_entity = existing.get(entity.uri)
+        if db_entity is None:
+            db.add(_build_entity(entity))
+            changed = True
+            continue
+
+        registered = {
+            attr.key: schemas.Attribute(key=attr.key, value=attr.value).value
+            for attr in db_entity.attributes
+        }
+        attributes = {attr.key: attr.value for attr in entity.attributes}
+        if db_entity.type == entity.type and registered == attributes:
+            continue
+
+        db_entity.type = entity.type
+        db_entity.attributes.clear()
+        # flush the removed attributes before re-adding the same keys
+        db.flush()
+        for attribute in entity.attributes:
+            db_entity.attributes.append(_build_attribute(attribute))
+        changed = True
+
+    if changed:
+        db.commit()
+        existing = {
+            db_entity.uri: db_entity
+            for db_entity in db.query(models.Entity)
+            .options(selectinload(models.Entity.attributes))
+            .filter(models.Entity.uri.in_(uris))
+        }
+    return [existing[uri] for uri in uris], changed
+
+
 def update_entity_attributes(
     db_entity: models.Entity, attributes: list[schemas.Attribute], db: Session
 ) -> models.Entity:
@@ -66,12 +185,18 @@ def update_entity_attributes(
         The updated entity as a SQLAlchemy model.
     """
     for attribute in attributes:
+        value_str, value_num = typed_values(attribute.value)
         db_attribute = get_attribute(db_entity.uri, attribute.key, db)
         if db_attribute is not None:
             db_attribute.value = attribute.value
+            db_attribute.value_str = value_str
+            db_attribute.value_num = value_num
         else:
             db_attribute = models.Attribute(
-                key=attribute.key, value=json.dumps(attribute.value)
+                key=attribute.key,
+                value=json.dumps(attribute.value),
+                value_str=value_str,
+                value_num=value_num,
             )
             db_entity.attributes.append(db_attribute)
 
@@ -141,6 +266,27 @@ def get_entity(uri: str, db: Session) -> models.Entity | None:
     return db.query(models.Entity).filter(models.Entity.uri == uri).first()
 
 
+def get_existing_uris(uris: list[str], db: Session) -> set[str]:
+    """
+    Get the uris, among the given ones, of the entities registered in the database.
+
+    Parameters
+    ----------
+    uris : list[str]
+        The uris to look up.
+    db : Session
+        SQLAlchemy database session.
+
+    Returns
+    -------
+    set[str]
+        The uris that are registered.
+    """
+    if not uris:
+        return set()
+    return set(db.scalars(select(models.Entity.uri).where(models.Entity.uri.in_(uris))))
+
+
 def get_entities_count(db: Session) -> int:
     """
     Retrieve the total number of entities in the database.
@@ -208,3 +354,290 @@ def get_attribute(uri: str, key: str, db: Session) -> models.Attribute | None:
         .filter(models.Attribute.entity_uri == uri, models.Attribute.key == key)
         .first()
     )
+
+
+def _string_clause(
+    column: ColumnElement, operator: enums.ConditionOperator, value: Any
+) -> ColumnElement[bool]:
+    """Build the clause of a string operator, matching `apply_operator` semantics."""
+    if not isinstance(value, str):
+        return false()
+
+    if operator == enums.ConditionOperator.CONTAINS:
+        return column.contains(value, autoescape=True)
+    elif operator == enums.ConditionOperator.NOT_CONTAINS:
+        return and_(column.is_not(None), ~column.contains(value, autoescape=True))
+    elif operator == enums.ConditionOperator.STARTS_WITH:
+        return column.startswith(value, autoescape=True)
+    return column.endswith(value, autoescape=True)
+
+
+def _condition_clause(
+    operator: enums.ConditionOperator,
+    value: Any,
+    value_str: ColumnElement,
+    value_num: ColumnElement | None = None,
+) -> ColumnElement[bool]:
+    """
+    Translate a condition operator into a SQL clause over typed value columns.
+
+    Strings are compared against `value_str` and numbers against `value_num`, so the
+    clause matches the scalar values for which `apply_operator` would return True.
+    Lists, objects and nulls are stored in neither column and never match, which
+    agrees with `apply_operator` except for the negated equality and membership
+    operators, see `_check_scalar_values`. Entities missing the attribute never match,
+    as `apply_operator` returns False for a missing value.
+    """
+    if value is None:
+        return false()
+    is_number = isinstance(value, (int, float))
+
+    if operator in (enums.ConditionOperator.EQUALS, enums.ConditionOperator.NOT_EQUALS):
+        if not isinstance(value, str) and not is_number:
+            raise ValueError(
+                f"Operator '{operator.value}' with a non-scalar value is not supported "
+                "for attribute lookups"
+            )
+
+        column, other = (
+            (value_str, value_num) if not is_number else (value_num, value_str)
+        )
+        if column is None:
+            # numbers never equal the values of a string-only column
+            if operator == enums.ConditionOperator.EQUALS:
+                return false()
+            return other.is_not(None)
+
+        if operator == enums.ConditionOperator.EQUALS:
+            return column == value
+        if other is None:
+            return column != value
+        return or_(column != value, other.is_not(None))
+
+    if operator in (
+        enums.ConditionOperator.CONTAINS,
+        enums.ConditionOperator.NOT_CONTAINS,
+        enums.ConditionOperator.STARTS_WITH,
+        enums.ConditionOperator.ENDS_WITH,
+    ):
+        return _string_clause(value_str, operator, value)
+
+    if operator in (
+        enums.ConditionOperator.GREATER,
+        enums.ConditionOperator.GREATER_OR_EQUAL,
+        enums.ConditionOperator.LESS,
+        enums.ConditionOperator.LESS_OR_EQUAL,
+    ):
+        if not is_number or value_num is None:
+            return false()
+        # the condition value is the left operand, as in `apply_operator`
+        if operator == enums.ConditionOperator.GREATER:
+            return value_num < value
+        elif operator == enums.ConditionOperator.GREATER_OR_EQUAL:
+            return value_num <= value
+        elif operator == enums.ConditionOperator.LESS:
+            return value_num > value
+        return value_num >= value
+
+    # list operators
+    if not isinstance(value, list):
+        return false()
+    strings = [v for v in value if isinstance(v, str)]
+    numbers = [v for v in value if isinstance(v, (int, float))]
+    typed = [(value_str, strings)]
+    if value_num is not None:
+        typed.append((value_num, numbers))
+
+    if operator == enums.ConditionOperator.IN:
+        return or_(false(), *[column.in_(items) for column, items in typed if items])
+    return or_(
+        false(),
+        *[
+            and_(column.is_not(None), column.not_in(items) if items else true())
+            for column, items in typed
+        ],
+    )
+
+
+def _check_scalar_values(conditions: list[schemas.Condition], db: Session) -> None:
+    """
+    Reject the negated operators on attributes having non-scalar values.
+
+    `apply_operator` matches lists and objects with 'not_equals' and 'not_in',
+    while the lookups over the typed value columns cannot.
+    """
+    for condition in conditions:
+        if condition.operator not in (
+            enums.ConditionOperator.NOT_EQUALS,
+            enums.ConditionOperator.NOT_IN,
+        ):
+            continue
+        prefix, _, key = condition.path.partition(".")
+        if prefix != "attributes":
+            continue
+
+        untyped = db.scalars(
+            select(models.Attribute.value).where(
+                models.Attribute.key == key,
+                models.Attribute.value_str.is_(None),
+                models.Attribute.value_num.is_(None),
+            )
+        )
+        if any(
+            isinstance(schemas.Attribute(key=key, value=value).value, (list, dict))
+            for value in untyped
+        ):
+            raise ValueError(
+                f"Operator '{condition.operator.value}' is not supported for "
+                f"attribute lookups on '{key}', which has non-scalar values"
+            )
+
+
+def _entity_condition_clause(condition: schemas.Condition) -> ColumnElement[bool]:
+    """Build the clause matching the entities that satisfy a single condition."""
+    if condition.path == "uri":
+        return _condition_clause(condition.operator, condition.value, models.Entity.uri)
+
+    prefix, _, key = condition.path.partition(".")
+    if prefix != "attributes" or not key or "." in key:
+        raise ValueError(
+            f"Path '{condition.path}' is not supported for attribute lookups, "
+            "use 'uri' or 'attributes.<key>'"
+        )
+
+    return models.Entity.uri.in_(
+        select(models.Attribute.entity_uri).where(
+            models.Attribute.key == key,
+            _condition_clause(
+                condition.operator,
+                condition.value,
+                models.Attribute.value_str,
+                models.Attribute.value_num,
+            ),
+        )
+    )
+
+
+def _conditions_clause(conditions: list[schemas.Condition]) -> ColumnElement[bool]:
+    """Build the clause matching the entities that satisfy all the conditions."""
+    return and_(true(), *[_entity_condition_clause(c) for c in conditions])
+
+
+def _residual_rules_clause(rules: list[schemas.ResidualRule]) -> ColumnElement[bool]:
+    """Build the clause matching the entities to which any of the residual rules applies."""
+    return or_(
+        false(),
+        *[
+            and_(
+                _conditions_clause(rule.conditions),
+                *[~_conditions_clause(conditions) for conditions in rule.unless],
+            )
+            for rule in rules
+        ],
+    )
+
+
+def find_entities(
+    conditions: list[schemas.Condition],
+    db: Session,
+    type: enums.EntityType | None = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> list[str]:
+    """
+    Find the uris of the entities matching all the given conditions.
+
+    Each condition is translated into an indexed lookup over the attributes table,
+    so that the matching entities are found without scanning every entity.
+
+    Parameters
+    ----------
+    conditions : list[schemas.Condition]
+        The conditions to match (AND logic). Paths must be either 'uri'
+        or 'attributes.<key>'.
+    db : Session
+        SQLAlchemy database session.
+    type : enums.EntityType, optional
+        If provided, only entities of this type are returned.
+    offset : int, optional
+        The number of uris to skip.
+    limit : int, optional
+        The number of uris to retrieve.
+
+    Returns
+    -------
+    list[str]
+        The uris of the matching entities, sorted alphabetically.
+
+    Raises
+    ------
+    ValueError
+        If a condition path or value is not supported for attribute lookups.
+    """
+    _check_scalar_values(conditions, db)
+    query = select(models.Entity.uri)
+    if type is not None:
+        query = query.where(models.Entity.type == type)
+
+    query = query.where(_conditions_clause(conditions))
+    query = query.order_by(models.Entity.uri).offset(offset).limit(limit)
+    return list(db.scalars(query).all())
+
+
+def find_allowed_entities(
+    partial: schemas.PartialCheckResponse,
+    db: Session,
+    type: enums.EntityType | None = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> list[str]:
+    """
+    Find the uris of the entities allowed by the residual of a partial evaluation.
+
+    An entity is returned if any rule in `allow_if` applies to it and no rule
+    in `deny_if` does. The whole expression is resolved in a single indexed query.
+
+    Parameters
+    ----------
+    partial : schemas.PartialCheckResponse
+        The residual rules over the entity attributes.
+    db : Session
+        SQLAlchemy database session.
+    type : enums.EntityType, optional
+        If provided, only entities of this type are returned.
+    offset : int, optional
+        The number of uris to skip.
+    limit : int, optional
+        The number of uris to retrieve.
+
+    Returns
+    -------
+    list[str]
+        The uris of the allowed entities, sorted alphabetically.
+
+    Raises
+    ------
+    ValueError
+        If a condition path or value is not supported for attribute lookups.
+    """
+    if not partial.allow_if:
+        return []
+
+    _check_scalar_values(
+        [
+            condition
+            for rule in partial.allow_if + partial.deny_if
+            for conditions in [rule.conditions, *rule.unless]
+            for condition in conditions
+        ],
+        db,
+    )
+    query = select(models.Entity.uri).where(
+        _residual_rules_clause(partial.allow_if),
+        ~_residual_rules_clause(partial.deny_if),
+    )
+    if type is not None:
+        query = query.where(models.Entity.type == type)
+
+    query = query.order_by(models.Entity.uri).offset(offset).limit(limit)
+    return list(db.scalars(query).all())
@@ -1,10 +1,13 @@
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from eunomia_core import schemas
+from sqlalchemy import create_engine, event, inspect, select, text
 from sqlalchemy.engine import make_url
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.orm import DeclarativeBase, declarative_base, sessionmaker
 
+from eunomia.utils.tracing import instrument_engine
+
 Base: DeclarativeBase = declarative_base()
 SessionLocal: sessionmaker | None = None
 engine: Engine | None = None
@@ -36,10 +39,70 @@ def init_db(sql_database_url: str):
                 )
 
     engine = create_engine(sql_database_url, connect_args=connect_args)
+    instrument_engine(engine)
+    if sql_database_url.startswith("sqlite"):
+        # attribute lookups rely on LIKE, which SQLite makes case-insensitive by default
+        event.listen(engine, "connect", _enable_case_sensitive_like)
+
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    _upgrade_attributes(engine)
     Base.metadata.create_all(bind=engine)
 
 
+def _upgrade_attributes(engine: Engine) -> None:
+    """
+    Add the typed value columns to an attributes table created without them.
+
+    `create_all` does not alter existing tables, so the columns and their indexes
+    are added here and the typed values of the existing rows are backfilled,
+    within a single transaction.
+    """
+    # the models and crud modules import this one
+    from eunomia.fetchers.registry.db import crud, models
+
+    inspector = inspect(engine)
+    if not inspector.has_table(models.Attribute.__tablename__):
+        return
+    columns = {c["name"] for c in inspector.get_columns(models.Attribute.__tablename__)}
+    if {"value_str", "value_num"} <= columns:
+        return
+
+    table = models.Attribute.__table__
+    with engine.begin() as connection:
+        for column in (table.c.value_str, table.c.value_num):
+            if column.name not in columns:
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {table.name} "
+                        f"ADD COLUMN {column.name} {column_type}"
+                    )
+                )
+
+        rows = connection.execute(
+            select(table.c.entity_uri, table.c.key, table.c.value)
+        ).all()
+        for entity_uri, key, value in rows:
+            decoded = schemas.Attribute(key=key, value=value).value
+            value_str, value_num = crud.typed_values(decoded)
+            if value_str is None and value_num is None:
+                continue
+            connection.execute(
+                table.update()
+                .where(table.c.entity_uri == entity_uri, table.c.key == key)
+                .values(value_str=value_str, value_num=value_num)
+            )
+
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _enable_case_sensitive_like(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA case_sensitive_like = ON")
+    cursor.close()
+
+
 def get_db():
     if SessionLocal is None:
         raise RuntimeError("Database not initialized. Call init_db first.")
@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 
 from eunomia_core import enums
-from sqlalchemy import JSON, ForeignKey, func
+from sqlalchemy import JSON, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from eunomia.fetchers.registry.db import db
@@ -23,10 +23,17 @@ class Entity(db.Base):
 
 class Attribute(db.Base):
     __tablename__ = "attributes"
+    __table_args__ = (
+        # secondary indexes for attribute lookups, typed for numeric comparisons
+        Index("ix_attributes_key_value_str", "key", "value_str"),
+        Index("ix_attributes_key_value_num", "key", "value_num"),
+    )
 
     entity_uri: Mapped[str] = mapped_column(ForeignKey(Entity.uri), primary_key=True)
     key: Mapped[str] = mapped_column(primary_key=True)
     value: Mapped[Any] = mapped_column(JSON)
+    value_str: Mapped[Optional[str]]
+    value_num: Mapped[Optional[float]]
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(), onupdate=func.now()
     )
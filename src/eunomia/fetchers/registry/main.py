@@ -1,8 +1,9 @@
-from eunomia_core import schemas
+from eunomia_core import enums, schemas
 from sqlalchemy.orm import Session
 
 from eunomia.fetchers.base import BaseFetcher, BaseFetcherConfig
 from eunomia.fetchers.registry.db import crud, db
+from eunomia.utils.revision import revision_tracker
 
 
 class RegistryFetcherConfig(BaseFetcherConfig):
@@ -55,8 +56,91 @@ class RegistryFetcher(BaseFetcher):
             raise ValueError(f"Entity with uri '{entity.uri}' is already registered")
 
         db_entity = crud.create_entity(entity, db=db_session)
+        revision_tracker.bump()
         return schemas.EntityInDb.model_validate(db_entity)
 
+    def register_entities(
+        self, entities: list[schemas.EntityCreate], db_session: Session
+    ) -> list[schemas.EntityInDb]:
+        """
+        Register multiple new entities in the system within a single transaction.
+
+        Either all the entities are registered or none of them is.
+
+        Parameters
+        ----------
+        entities : list[schemas.EntityCreate]
+            Pydantic models containing attributes about the entities.
+        db_session : Session
+            The SQLAlchemy database session.
+
+        Returns
+        -------
+        list[schemas.EntityInDb]
+            The generated entities as Pydantic models, in the same order.
+
+        Raises
+        ------
+        ValueError
+            If no entities are provided, an uri is duplicated
+            or an entity is already registered.
+        """
+        if not entities:
+            raise ValueError("At least one entity must be provided")
+
+        uris = [entity.uri for entity in entities]
+        if len(set(uris)) != len(uris):
+            raise ValueError("Entity uris must be unique")
+
+        existing_uris = crud.get_existing_uris(uris, db=db_session)
+        if existing_uris:
+            raise ValueError(
+                f"Entities with uris {sorted(existing_uris)} are already registered"
+            )
+
+        db_entities = crud.create_entities(entities, db=db_session)
+        revision_tracker.bump()
+        return [schemas.EntityInDb.model_validate(e) for e in db_entities]
+
+    def upsert_entities(
+        self, entities: list[schemas.EntityCreate], db_session: Session
+    ) -> list[schemas.EntityInDb]:
+        """
+        Register or replace multiple entities within a single transaction.
+
+        Entities that are not registered yet are created, while the registered
+        ones are overridden only if their type or attributes changed.
+
+        Parameters
+        ----------
+        entities : list[schemas.EntityCreate]
+            Pydantic models containing attributes about the entities.
+        db_session : Session
+            The SQLAlchemy database session.
+
+        Returns
+        -------
+        list[schemas.EntityInDb]
+            The registered entities as Pydantic models, in the same order.
+
+        Raises
+        ------
+        ValueError
+            If no entities are provided or an uri is duplicated.
+        """
+        if not entities:
+            raise ValueError("At least one entity must be provided")
+
+        uris = [entity.uri for entity in entities]
+        if len(set(uris)) != len(uris):
+            raise ValueError("Entity uris must be unique")
+
+        db_entities, changed = crud.upsert_entities(entities, db=db_session)
+        if changed:
+            # an idempotent upsert keeps the cached decisions of the clients
+            revision_tracker.bump()
+        return [schemas.EntityInDb.model_validate(e) for e in db_entities]
+
     def update_entity(
         self, entity: schemas.EntityUpdate, override: bool, db_session: Session
     ) -> schemas.EntityInDb:
@@ -94,6 +178,7 @@ class RegistryFetcher(BaseFetcher):
         db_entity = crud.update_entity_attributes(
             db_entity, entity.attributes, db=db_session
         )
+        revision_tracker.bump()
         return schemas.EntityInDb.model_validate(db_entity)
 
     def delete_entity(self, uri: str, db_session: Session) -> None:
@@ -117,7 +202,89 @@ class RegistryFetcher(BaseFetcher):
         if db_entity is None:
             raise ValueError(f"Entity with uri '{uri}' is not registered")
 
-        return crud.delete_entity(db_entity, db=db_session)
+        is_deleted = crud.delete_entity(db_entity, db=db_session)
+        revision_tracker.bump()
+        return is_deleted
+
+    def find_entities(
+        self,
+        conditions: list[schemas.Condition],
+        db_session: Session,
+        type: enums.EntityType | None = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> list[str]:
+        """
+        Find the entities whose attributes match all the given conditions.
+
+        Conditions use the same paths and operators as policy conditions and are
+        resolved through the attribute indexes, without scanning every entity.
+
+        Parameters
+        ----------
+        conditions : list[schemas.Condition]
+            The conditions to match, with paths either 'uri' or 'attributes.<key>'.
+        db_session : Session
+            The SQLAlchemy database session.
+        type : enums.EntityType, optional
+            If provided, only entities of this type are returned.
+        offset : int, optional
+            The number of uris to skip.
+        limit : int, optional
+            The number of uris to retrieve.
+
+        Returns
+        -------
+        list[str]
+            The uris of the matching entities.
+
+        Raises
+        ------
+        ValueError
+            If no conditions are provided or a condition is not supported.
+        """
+        if not conditions:
+            raise ValueError("At least one condition must be provided")
+
+        return crud.find_entities(
+            conditions, db=db_session, type=type, offset=offset, limit=limit
+        )
+
+    def find_allowed_entities(
+        self,
+        partial: schemas.PartialCheckResponse,
+        type: enums.EntityType | None = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> list[str]:
+        """
+        Find the entities allowed by the residual rules of a partial evaluation.
+
+        Parameters
+        ----------
+        partial : schemas.PartialCheckResponse
+            The residual rules over the entity attributes.
+        type : enums.EntityType, optional
+            If provided, only entities of this type are returned.
+        offset : int, optional
+            The number of uris to skip.
+        limit : int, optional
+            The number of uris to retrieve.
+
+        Returns
+        -------
+        list[str]
+            The uris of the allowed entities.
+
+        Raises
+        ------
+        ValueError
+            If a residual condition is not supported for attribute lookups.
+        """
+        with db.SessionLocal() as db_session:
+            return crud.find_allowed_entities(
+                partial, db=db_session, type=type, offset=offset, limit=limit
+            )
 
     async def fetch_attributes(self, uri: str) -> dict:
         """
@@ -19,12 +19,39 @@ def registry_router_factory(fetcher: RegistryFetcher) -> APIRouter:
     async def get_entities_count(db_session: Session = Depends(db.get_db)) -> int:
         return crud.get_entities_count(db=db_session)
 
+    @router.post("/entities/$search", response_model=list[str])
+    async def search_entities(
+        request: schemas.EntitySearch,
+        offset: int = 0,
+        limit: int = 100,
+        db_session: Session = Depends(db.get_db),
+    ):
+        return fetcher.find_entities(
+            request.conditions,
+            db_session=db_session,
+            type=request.type,
+            offset=offset,
+            limit=limit,
+        )
+
     @router.post("/entities", response_model=schemas.EntityInDb)
     async def create_entity(
         entity: schemas.EntityCreate, db_session: Session = Depends(db.get_db)
     ):
         return fetcher.register_entity(entity, db_session=db_session)
 
+    @router.post("/entities/$bulk", response_model=list[schemas.EntityInDb])
+    async def create_entities(
+        entities: list[schemas.EntityCreate], db_session: Session = Depends(db.get_db)
+    ):
+        return fetcher.register_entities(entities, db_session=db_session)
+
+    @router.put("/entities/$bulk", response_model=list[schemas.EntityInDb])
+    async def upsert_entities(
+        entities: list[schemas.EntityCreate], db_session: Session = Depends(db.get_db)
+    ):
+        return fetcher.upsert_entities(entities, db_session=db_session)
+
     @router.get("/entities/{uri}", response_model=schemas.EntityInDb)
     async def get_entity(uri: str, db_session: Session = Depends(db.get_db)):
         entity = crud.get_entity(uri, db=db_session)
@@ -1,11 +1,21 @@
 import asyncio
+import base64
+import contextlib
+import time
+from typing import AsyncIterator
 
-from eunomia_core import schemas
+from eunomia_core import enums, schemas
+from pydantic import ValidationError
 
 from eunomia.config import settings
 from eunomia.engine import PolicyEngine
 from eunomia.fetchers import FetcherFactory
+from eunomia.fetchers.base import BaseFetcher
+from eunomia.fetchers.registry import RegistryFetcher
+from eunomia.utils import metrics, tracing
+from eunomia.utils.adaptive_limiter import AdaptiveLimiter
 from eunomia.utils.batch_processor import BatchProcessor
+from eunomia.utils.revision import revision_tracker
 
 
 class EunomiaServer:
@@ -19,9 +29,41 @@ class EunomiaServer:
         self.engine = PolicyEngine()
         FetcherFactory.initialize_fetchers(settings.FETCHERS)
         self._fetchers = FetcherFactory.get_all_fetchers()
+        limiter = None
+        if settings.BULK_CHECK_ADAPTIVE_CONCURRENCY:
+            limiter = AdaptiveLimiter(
+                initial_limit=settings.BULK_CHECK_BATCH_SIZE,
+                min_limit=1,
+                max_limit=settings.BULK_CHECK_MAX_CONCURRENCY,
+            )
         self._batch_processor = BatchProcessor(
-            batch_size=settings.BULK_CHECK_BATCH_SIZE
+            batch_size=settings.BULK_CHECK_BATCH_SIZE,
+            max_concurrency=settings.BULK_CHECK_MAX_CONCURRENCY,
+            limiter=limiter,
+        )
+
+        metrics.policies.set_function(lambda: len(self.engine.policies))
+        metrics.revision.set_function(lambda: revision_tracker.revision)
+        metrics.batch_queue_depth.set_function(
+            lambda: self._batch_processor.queue_depth
         )
+        metrics.batch_concurrency_limit.set_function(
+            lambda: self._batch_processor.concurrency_limit
+        )
+
+    @staticmethod
+    async def _fetch_attributes(name: str, fetcher: BaseFetcher, uri: str) -> dict:
+        start = time.perf_counter()
+        try:
+            with tracing.start_span(
+                "eunomia.fetch_attributes", {"eunomia.fetcher": name}
+            ):
+                return await fetcher.fetch_attributes(uri)
+        except Exception:
+            metrics.fetcher_errors.inc(fetcher=name)
+            raise
+        finally:
+            metrics.fetcher_duration.observe(time.perf_counter() - start, fetcher=name)
 
     async def _fetch_all_attributes(self, entity: schemas.EntityCheck) -> None:
         if entity.attributes is None:
@@ -31,8 +73,8 @@ class EunomiaServer:
             # run all fetchers concurrently
             fetched_results = await asyncio.gather(
                 *[
-                    fetcher.fetch_attributes(entity.uri)
-                    for fetcher in self._fetchers.values()
+                    self._fetch_attributes(name, fetcher, entity.uri)
+                    for name, fetcher in self._fetchers.items()
                     # enforce entity type if configured
                     if fetcher.config.entity_type is None
                     or fetcher.config.entity_type == entity.type
@@ -48,6 +90,25 @@ class EunomiaServer:
                         )
             entity.attributes.update(registered_attributes)
 
+    async def _resolve_entities(
+        self, entities: list[schemas.EntityCheck]
+    ) -> list[schemas.EntityCheck]:
+        """
+        Fetch the attributes of many entities, resolving each distinct entity once.
+
+        Equal entities are replaced by the same resolved instance in the result.
+        """
+        distinct: dict[str, schemas.EntityCheck] = {}
+        resolved = [
+            distinct.setdefault(entity.model_dump_json(), entity) for entity in entities
+        ]
+        metrics.entity_resolutions.inc(len(distinct), result="fetched")
+        metrics.entity_resolutions.inc(len(entities) - len(distinct), result="reused")
+        await self._batch_processor.run(
+            list(distinct.values()), self._fetch_all_attributes, cancel_on_error=True
+        )
+        return resolved
+
     async def check(self, request: schemas.CheckRequest) -> schemas.CheckResponse:
         """
         Check if a principal has permissions to perform an action on a specific resource.
@@ -67,6 +128,35 @@ class EunomiaServer:
         schemas.CheckResponse
             The response containing the allowed flag and the reason for the decision.
 
+        Raises
+        ------
+        ValueError
+            If there is a discrepancy between the provided attributes and the fetched attributes.
+        """
+        with tracing.start_span("eunomia.check", {"eunomia.action": request.action}):
+            await asyncio.gather(
+                self._fetch_all_attributes(request.principal),
+                self._fetch_all_attributes(request.resource),
+            )
+            return self.engine.evaluate_all(request)
+
+    async def explain_check(
+        self, request: schemas.CheckRequest
+    ) -> schemas.ExplainedCheckResponse:
+        """
+        Perform a check like `check`, explaining how the decision was taken.
+
+        Parameters
+        ----------
+        request : schemas.CheckRequest
+            The check request containing the principal, the action and the resource.
+
+        Returns
+        -------
+        schemas.ExplainedCheckResponse
+            The response with, for each policy, the rules and conditions evaluated,
+            the resolved attribute values and the evaluation time of each of them.
+
         Raises
         ------
         ValueError
@@ -76,11 +166,73 @@ class EunomiaServer:
             self._fetch_all_attributes(request.principal),
             self._fetch_all_attributes(request.resource),
         )
-        return self.engine.evaluate_all(request)
+        return self.engine.explain(request)
+
+    async def wait_for_revision(self, after: int | None, timeout: float) -> int:
+        """
+        Wait for a change to the policies or the registered entities.
+
+        Clients caching decisions use it as a long-poll: the call returns as soon as
+        the revision differs from the last one they know, or after the timeout.
+
+        Parameters
+        ----------
+        after : int, optional
+            The last revision known by the client.
+            If not provided, the current revision is returned immediately.
+        timeout : float
+            The maximum time in seconds to wait for a change,
+            capped to the REVISION_POLL_MAX_TIMEOUT setting.
+
+        Returns
+        -------
+        int
+            The current revision.
+        """
+        timeout = min(max(timeout, 0), settings.REVISION_POLL_MAX_TIMEOUT)
+        return await revision_tracker.wait(after, timeout)
+
+    async def stream_check(
+        self, message: schemas.CheckStreamRequest
+    ) -> schemas.CheckStreamResponse:
+        """
+        Perform a check received from a stream, capturing its error.
+
+        Parameters
+        ----------
+        message : schemas.CheckStreamRequest
+            The check request with its correlation identifier.
+
+        Returns
+        -------
+        schemas.CheckStreamResponse
+            The check response or the error, with the correlation identifier.
+        """
+        try:
+            response = await self.check(message.request)
+        except Exception as e:
+            return schemas.CheckStreamResponse(id=message.id, error=str(e))
+        return schemas.CheckStreamResponse(id=message.id, response=response)
+
+    def get_bulk_check_limit(self) -> int:
+        """Return the maximum number of requests accepted by a bulk check."""
+        return settings.BULK_CHECK_MAX_REQUESTS
+
+    def get_bulk_check_concurrency(self) -> int | None:
+        """Return the number of checks currently allowed to run concurrently."""
+        return self._batch_processor.concurrency_limit
 
     async def bulk_check(
         self, requests: list[schemas.CheckRequest]
     ) -> list[schemas.CheckResponse]:
+        """
+        Perform a set of permission checks, with the same decisions as `check`.
+
+        The checks are planned to avoid repeating the work they share: each distinct
+        principal and resource is resolved once, and requests with the same principal
+        and action are evaluated together, so that the principal conditions of the
+        policies are evaluated once per group instead of once per request.
+        """
         if not requests:
             raise ValueError("Empty request list")
 
@@ -89,4 +241,225 @@ class EunomiaServer:
                 f"Too many requests. Maximum allowed: {settings.BULK_CHECK_MAX_REQUESTS}",
             )
 
-        return await self._batch_processor.run(requests, self.check)
+        entities = await self._resolve_entities(
+            [r.principal for r in requests] + [r.resource for r in requests]
+        )
+        principals, resources = entities[: len(requests)], entities[len(requests) :]
+
+        # requests sharing the principal and the action are evaluated together
+        groups: dict[tuple[int, str], list[int]] = {}
+        for index, request in enumerate(requests):
+            groups.setdefault((id(principals[index]), request.action), []).append(index)
+
+        responses: list[schemas.CheckResponse | None] = [None] * len(requests)
+        for indexes in groups.values():
+            first = indexes[0]
+            results = self.engine.evaluate_bulk(
+                principals[first],
+                requests[first].action,
+                [resources[index] for index in indexes],
+            )
+            for index, result in zip(indexes, results):
+                responses[index] = result
+        return responses
+
+    async def check_resources(
+        self, request: schemas.ResourcesCheckRequest
+    ) -> list[schemas.CheckResponse]:
+        """
+        Check if a principal has permissions to perform an action on many resources.
+
+        The principal is resolved once and the principal side of the policies is
+        evaluated once for all resources, leaving only the resource conditions
+        to evaluate per resource.
+
+        Parameters
+        ----------
+        request : schemas.ResourcesCheckRequest
+            The request containing the principal, the action and the resources.
+
+        Returns
+        -------
+        list[schemas.CheckResponse]
+            The responses for each resource, in the same order.
+
+        Raises
+        ------
+        ValueError
+            If there are too many resources or there is a discrepancy between
+            the provided attributes and the fetched attributes.
+        """
+        if len(request.resources) > settings.BULK_CHECK_MAX_REQUESTS:
+            raise ValueError(
+                f"Too many resources. Maximum allowed: {settings.BULK_CHECK_MAX_REQUESTS}",
+            )
+
+        principal, *resources = await self._resolve_entities(
+            [request.principal, *request.resources]
+        )
+        return self.engine.evaluate_bulk(principal, request.action, resources)
+
+    async def check_matrix(
+        self, request: schemas.MatrixCheckRequest
+    ) -> schemas.MatrixCheckResponse:
+        """
+        Check every combination of the principals, resources and actions.
+
+        Each distinct entity is resolved once, then the decisions are computed
+        as bitmaps over the resources, evaluating the principal conditions of each
+        rule once per principal and its resource conditions once per resource.
+
+        Parameters
+        ----------
+        request : schemas.MatrixCheckRequest
+            The request containing the principals, the resources and the actions.
+
+        Returns
+        -------
+        schemas.MatrixCheckResponse
+            The bitmaps of the allowed resources, for each principal and action.
+
+        Raises
+        ------
+        ValueError
+            If there are too many decisions or there is a discrepancy between
+            the provided attributes and the fetched attributes.
+        """
+        size = len(request.principals) * len(request.resources) * len(request.actions)
+        if size > settings.MATRIX_CHECK_MAX_SIZE:
+            raise ValueError(
+                f"Too many decisions. Maximum allowed: {settings.MATRIX_CHECK_MAX_SIZE}",
+            )
+        if size == 0:
+            return schemas.MatrixCheckResponse(
+                allowed=[[""] * len(request.actions) for _ in request.principals]
+            )
+
+        entities = await self._resolve_entities(
+            [*request.principals, *request.resources]
+        )
+        count = len(request.principals)
+        principals, resources = entities[:count], entities[count:]
+        masks = self.engine.evaluate_matrix(principals, resources, request.actions)
+
+        length = (len(resources) + 7) // 8
+        return schemas.MatrixCheckResponse(
+            allowed=[
+                [
+                    base64.b64encode(mask.to_bytes(length, "little")).decode()
+                    for mask in row
+                ]
+                for row in masks
+            ]
+        )
+
+    async def stream_bulk_check(
+        self, lines: AsyncIterator[bytes]
+    ) -> AsyncIterator[schemas.CheckStreamResponse]:
+        """
+        Perform a stream of checks, yielding the responses as they complete.
+
+        Each line holds a check request in JSON, identified in the responses by
+        its position in the stream. Lines are read as the checks complete and their
+        responses are consumed, so that memory stays bounded by BULK_CHECK_BATCH_SIZE
+        regardless of the number of checks.
+
+        Parameters
+        ----------
+        lines : AsyncIterator[bytes]
+            The check requests, one per line.
+
+        Yields
+        ------
+        schemas.CheckStreamResponse
+            The check response or the error, with the position of the request.
+        """
+
+        async def process(line: bytes) -> schemas.CheckStreamResponse:
+            # the identifier is set to the position of the line once processed
+            try:
+                request = schemas.CheckRequest.model_validate_json(line)
+            except ValidationError as e:
+                return schemas.CheckStreamResponse(id="", error=str(e))
+            return await self.stream_check(
+                schemas.CheckStreamRequest(id="", request=request)
+            )
+
+        async with contextlib.aclosing(
+            self._batch_processor.stream(lines, process)
+        ) as results:
+            async for index, result in results:
+                result.id = str(index)
+                yield result
+
+    async def partial_check(
+        self, request: schemas.PartialCheckRequest
+    ) -> schemas.PartialCheckResponse:
+        """
+        Partially evaluate the policies for a principal and an action.
+
+        This method fetches the principal attributes from all configured fetchers
+        and then fixes the principal side of every rule, returning the residual
+        conditions over the resource attributes.
+
+        Parameters
+        ----------
+        request : schemas.PartialCheckRequest
+            The request containing the principal and the action.
+
+        Returns
+        -------
+        schemas.PartialCheckResponse
+            The residual rules: a resource is allowed if any rule in `allow_if`
+            applies to it and no rule in `deny_if` does.
+
+        Raises
+        ------
+        ValueError
+            If there is a discrepancy between the provided attributes and the fetched attributes.
+        """
+        await self._fetch_all_attributes(request.principal)
+        return self.engine.partial_evaluate(request.principal, request.action)
+
+    async def list_allowed_resources(
+        self, request: schemas.PartialCheckRequest, offset: int = 0, limit: int = 100
+    ) -> list[str]:
+        """
+        List the registered resources a principal is allowed to perform an action on.
+
+        The policies are partially evaluated against the principal and the action,
+        then the residual resource conditions are resolved with an indexed query
+        over the registry, instead of checking every registered resource.
+
+        Parameters
+        ----------
+        request : schemas.PartialCheckRequest
+            The request containing the principal and the action.
+        offset : int, optional
+            The number of resource uris to skip.
+        limit : int, optional
+            The number of resource uris to retrieve.
+
+        Returns
+        -------
+        list[str]
+            The uris of the allowed resources.
+
+        Raises
+        ------
+        ValueError
+            If the registry fetcher is not configured or a policy condition
+            on the resource cannot be resolved by the registry.
+
+        Notes
+        -----
+        Only the resource attributes stored in the registry are considered.
+        """
+        registry = self._fetchers.get("registry")
+        if not isinstance(registry, RegistryFetcher):
+            raise ValueError("Listing allowed resources requires the registry fetcher")
+
+        partial = await self.partial_check(request)
+        return registry.find_allowed_entities(
+            partial, type=enums.EntityType.resource, offset=offset, limit=limit
+        )
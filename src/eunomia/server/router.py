@@ -1,18 +1,126 @@
+import asyncio
+
+import orjson
 from eunomia_core import schemas
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
 
+from eunomia.config import settings
 from eunomia.server import EunomiaServer
+from eunomia.utils.serialization import (
+    NDJSON_MEDIA_TYPE,
+    DuplexStreamingResponse,
+    SerializedRoute,
+    iter_lines,
+    serialize_response,
+)
 
 
 def server_router_factory(server: EunomiaServer) -> APIRouter:
-    router = APIRouter()
+    router = APIRouter(route_class=SerializedRoute)
 
-    @router.post("/check", response_model=schemas.CheckResponse)
-    async def check(request: schemas.CheckRequest):
-        return await server.check(request)
+    @router.post(
+        "/check",
+        response_model=schemas.CheckResponse | schemas.ExplainedCheckResponse,
+    )
+    async def check(
+        request: schemas.CheckRequest, http_request: Request, explain: bool = False
+    ):
+        if explain:
+            return serialize_response(await server.explain_check(request), http_request)
+        return serialize_response(await server.check(request), http_request)
 
     @router.post("/check/bulk", response_model=list[schemas.CheckResponse])
-    async def bulk_check(requests: list[schemas.CheckRequest]):
-        return await server.bulk_check(requests)
+    async def bulk_check(requests: list[schemas.CheckRequest], http_request: Request):
+        return serialize_response(await server.bulk_check(requests), http_request)
+
+    @router.post("/check/resources", response_model=list[schemas.CheckResponse])
+    async def check_resources(
+        request: schemas.ResourcesCheckRequest, http_request: Request
+    ):
+        return serialize_response(await server.check_resources(request), http_request)
+
+    @router.post("/check/matrix", response_model=schemas.MatrixCheckResponse)
+    async def check_matrix(request: schemas.MatrixCheckRequest, http_request: Request):
+        return serialize_response(await server.check_matrix(request), http_request)
+
+    @router.post("/check/bulk/stream")
+    async def stream_bulk_check(http_request: Request):
+        results = server.stream_bulk_check(iter_lines(http_request.stream()))
+        return DuplexStreamingResponse(
+            (result.model_dump_json() + "\n" async for result in results),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    @router.websocket("/check/stream")
+    async def check_stream(websocket: WebSocket):
+        await websocket.accept()
+        semaphore = asyncio.Semaphore(settings.CHECK_STREAM_MAX_PENDING)
+        send_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+
+        async def send(message: schemas.CheckStreamResponse) -> None:
+            async with send_lock:
+                await websocket.send_text(message.model_dump_json())
+
+        async def process(message: schemas.CheckStreamRequest) -> None:
+            try:
+                await send(await server.stream_check(message))
+            finally:
+                semaphore.release()
+
+        try:
+            while True:
+                data = await websocket.receive_text()
+                try:
+                    message = schemas.CheckStreamRequest.model_validate_json(data)
+                except ValidationError as e:
+                    message_id = _get_message_id(data)
+                    if message_id is None:
+                        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+                        return
+                    await send(schemas.CheckStreamResponse(id=message_id, error=str(e)))
+                    continue
+
+                # stop reading while too many checks are pending
+                await semaphore.acquire()
+                task = asyncio.create_task(process(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except WebSocketDisconnect:
+            for task in tasks:
+                task.cancel()
+
+    @router.get("/check/bulk/limit", response_model=int)
+    async def get_bulk_check_limit():
+        return server.get_bulk_check_limit()
+
+    @router.get("/check/bulk/concurrency", response_model=int | None)
+    async def get_bulk_check_concurrency():
+        return server.get_bulk_check_concurrency()
+
+    @router.get("/check/revision", response_model=int)
+    async def wait_for_revision(after: int | None = None, timeout: float = 30):
+        return await server.wait_for_revision(after, timeout)
+
+    @router.post("/check/partial", response_model=schemas.PartialCheckResponse)
+    async def partial_check(request: schemas.PartialCheckRequest):
+        return await server.partial_check(request)
+
+    @router.post("/check/allowed-resources", response_model=list[str])
+    async def list_allowed_resources(
+        request: schemas.PartialCheckRequest, offset: int = 0, limit: int = 100
+    ):
+        return await server.list_allowed_resources(request, offset=offset, limit=limit)
 
     return router
+
+
+def _get_message_id(data: str) -> str | None:
+    try:
+        message = orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return None
+    if isinstance(message, dict) and isinstance(message.get("id"), str):
+        return message["id"]
+    return None
@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import AsyncIterator
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter adapting its limit to the observed latency (AIMD).
+
+    The latency of each processed item is compared to a baseline tracking the
+    lowest latency observed: while it stays within `tolerance` times the baseline,
+    the limit grows by one for every `limit` items completed with all the slots in
+    use (additive increase). Otherwise, the work is queuing somewhere downstream,
+    e.g. in a slow database, and the limit is multiplied by `backoff`, at most once
+    for every `limit` items so that a single burst does not collapse it
+    (multiplicative decrease). Slots are granted in FIFO order.
+
+    Parameters
+    ----------
+    initial_limit : int
+        The limit before any latency is observed.
+    min_limit : int
+        The lowest limit.
+    max_limit : int
+        The highest limit.
+    tolerance : float, optional
+        The ratio of the baseline latency above which the limit decreases.
+        Defaults to 2.
+    backoff : float, optional
+        The factor applied to the limit when it decreases. Defaults to 0.9.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+    ) -> None:
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._tolerance = tolerance
+        self._backoff = backoff
+
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._baseline: float | None = None
+        self._completed_since_decrease = 0
+
+    @property
+    def limit(self) -> int:
+        """The current number of items allowed to be processed concurrently."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of items being processed."""
+        return self._in_flight
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free slot, measuring the latency of the work done in it."""
+        await self._acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - start)
+
+    async def _acquire(self) -> None:
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was granted while being cancelled
+                self._in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def _release(self, latency: float) -> None:
+        saturated = self._in_flight >= self.limit
+        self._in_flight -= 1
+        self._update(latency, saturated)
+        self._wake()
+
+    def _update(self, latency: float, saturated: bool) -> None:
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # drift slowly towards the latency, to follow lasting changes
+            self._baseline += (latency - self._baseline) * 0.01
+        self._completed_since_decrease += 1
+
+        if latency > self._baseline * self._tolerance:
+            if self._completed_since_decrease >= self.limit:
+                self._limit = max(self._min_limit, self._limit * self._backoff)
+                self._completed_since_decrease = 0
+        elif saturated:
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
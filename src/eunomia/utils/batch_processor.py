@@ -1,42 +1,215 @@
 import asyncio
-from typing import Awaitable, Callable, List, TypeVar
+import contextlib
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Sized,
+    TypeVar,
+)
+
+from eunomia.utils.adaptive_limiter import AdaptiveLimiter
 
 T = TypeVar("T")
 R = TypeVar("R")
 
 
+async def _aiter(items: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
 class BatchProcessor:
     """
     Utility class for processing items with controlled concurrency to manage resource usage.
+
+    Each call is processed by a pool of at most `batch_size` workers pulling the items
+    from a bounded queue, so that memory does not grow with the number of items.
+    The optional `max_concurrency` limit is shared by all the calls, whose workers
+    wait in turn for a free slot, so that a large call cannot starve the others.
+    An `AdaptiveLimiter` can be given in its place, to adapt the shared limit to
+    the observed latency.
     """
 
-    def __init__(self, batch_size: int = 10):
+    def __init__(
+        self,
+        batch_size: int = 10,
+        max_concurrency: int | None = None,
+        limiter: AdaptiveLimiter | None = None,
+    ):
         self._batch_size = batch_size
-        self._semaphore = asyncio.Semaphore(batch_size)
+        self._max_concurrency = max_concurrency
+        self._limiter = limiter
+        # the semaphore is created in the running loop on first use
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._queued = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of items waiting to be processed across all calls."""
+        return self._queued
+
+    @property
+    def concurrency_limit(self) -> int | None:
+        """The current number of items processed concurrently across all calls."""
+        if self._limiter is not None:
+            return self._limiter.limit
+        return self._max_concurrency
+
+    def _slot(self) -> contextlib.AbstractAsyncContextManager:
+        if self._limiter is not None:
+            return self._limiter.slot()
+        if self._max_concurrency is None:
+            return contextlib.nullcontext()
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    async def _iterate(
+        self,
+        items: Iterable[T] | AsyncIterable[T],
+        processor: Callable[[T], Awaitable[R]],
+    ) -> AsyncIterator[tuple[int, R | None, Exception | None]]:
+        workers = self._batch_size
+        if isinstance(items, Sized):
+            workers = min(workers, len(items))
+
+        pending: asyncio.Queue[tuple[int, T] | None] = asyncio.Queue(
+            maxsize=self._batch_size
+        )
+        outcomes: asyncio.Queue[tuple[int, R | None, Exception | None] | None] = (
+            asyncio.Queue(maxsize=self._batch_size)
+        )
+
+        async def feed() -> None:
+            try:
+                index = 0
+                async for item in _aiter(items):
+                    await pending.put((index, item))
+                    self._queued += 1
+                    index += 1
+            except Exception as e:
+                # a negative index reports the failure of the items themselves
+                await outcomes.put((-1, None, e))
+            for _ in range(workers):
+                await pending.put(None)
+
+        async def work() -> None:
+            while (entry := await pending.get()) is not None:
+                index, item = entry
+                queued = True
+                try:
+                    async with self._slot():
+                        self._queued -= 1
+                        queued = False
+                        result = await processor(item)
+                except Exception as e:
+                    await outcomes.put((index, None, e))
+                else:
+                    await outcomes.put((index, result, None))
+                finally:
+                    if queued:
+                        self._queued -= 1
+            await outcomes.put(None)
+
+        tasks = [asyncio.create_task(feed())]
+        tasks.extend(asyncio.create_task(work()) for _ in range(workers))
+        try:
+            finished = 0
+            while finished < workers:
+                outcome = await outcomes.get()
+                if outcome is None:
+                    finished += 1
+                elif outcome[0] < 0:
+                    raise outcome[2]
+                else:
+                    yield outcome
+        finally:
+            for task in tasks:
+                task.cancel()
+            # the items left in the queue will not be processed
+            while not pending.empty():
+                if pending.get_nowait() is not None:
+                    self._queued -= 1
 
     async def run(
-        self, items: List[T], processor: Callable[[T], Awaitable[R]]
+        self,
+        items: List[T],
+        processor: Callable[[T], Awaitable[R]],
+        cancel_on_error: bool = False,
     ) -> List[R]:
         """
         Process a list of items with controlled concurrency.
 
-        Uses semaphore to limit concurrent operations while maintaining input order.
-
         Parameters
         ----------
         items : List[T]
             The items to process
         processor : Callable[[T], Awaitable[R]]
             Async function to process each item
+        cancel_on_error : bool, optional
+            Whether to cancel the remaining items as soon as one fails, instead of
+            processing all of them before raising the error of the first failed item.
+            Defaults to False.
 
         Returns
         -------
         List[R]
             Results in the same order as input items
         """
+        results: List = [None] * len(items)
+        first_error: tuple[int, Exception] | None = None
+
+        async with contextlib.aclosing(self._iterate(items, processor)) as outcomes:
+            async for index, result, error in outcomes:
+                if error is None:
+                    results[index] = result
+                elif cancel_on_error:
+                    raise error
+                elif first_error is None or index < first_error[0]:
+                    first_error = (index, error)
+
+        if first_error is not None:
+            raise first_error[1]
+        return results
+
+    async def stream(
+        self,
+        items: Iterable[T] | AsyncIterable[T],
+        processor: Callable[[T], Awaitable[R]],
+    ) -> AsyncIterator[tuple[int, R]]:
+        """
+        Process a stream of items with controlled concurrency.
+
+        Items are consumed lazily, as workers become available, and the results are
+        yielded as soon as they complete. The first error is raised, cancelling the
+        remaining items.
 
-        async def bounded_processor(item: T) -> R:
-            async with self._semaphore:
-                return await processor(item)
+        Parameters
+        ----------
+        items : Iterable[T] | AsyncIterable[T]
+            The items to process
+        processor : Callable[[T], Awaitable[R]]
+            Async function to process each item
 
-        return await asyncio.gather(*[bounded_processor(item) for item in items])
+        Yields
+        ------
+        tuple[int, R]
+            The position of the item and its result, in order of completion
+        """
+        async with contextlib.aclosing(self._iterate(items, processor)) as outcomes:
+            async for index, result, error in outcomes:
+                if error is not None:
+                    raise error
+                yield index, result
@@ -0,0 +1,312 @@
+import bisect
+import threading
+import time
+from typing import Callable, Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type: str
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects the labels {list(self.labelnames)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, such as a number of requests."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}_total", dict(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, such as a number of policies.
+
+    Unlabelled gauges can be computed when collected with `set_function`.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float | None]) -> None:
+        self._function = function
+
+    def get(self, **labels: str) -> float | None:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels))
+
+    def _samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        if self._function is not None:
+            value = self._function()
+            if value is not None:
+                yield self.name, {}, value
+            return
+
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values, such as latencies, in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per labels: the count of each bucket, the sum and the count
+        self._values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            counts, totals = self._values[key]
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def get_count(self, **labels: str) -> int:
+        values = self._values.get(self._key(labels))
+        return values[1][1] if values is not None else 0
+
+    def _samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            values = [
+                (key, list(counts), list(totals))
+                for key, (counts, totals) in self._values.items()
+            ]
+        for key, counts, (total, count) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": _format_value(bound)},
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """
+    Registry of the server metrics, rendered in the Prometheus text format.
+
+    Metrics are updated in place and collected when scraped, so that recording
+    them costs a dictionary update.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render all the metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and the status of the check endpoints.
+
+    Endpoints are labelled by their route path, so that path parameters do not
+    create a series per value. Streaming responses are measured until their end.
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str = "/check") -> None:
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            check_requests.inc(endpoint=endpoint, status=str(status_code))
+            check_duration.observe(time.perf_counter() - start, endpoint=endpoint)
+
+
+registry = MetricsRegistry()
+
+check_requests = registry.counter(
+    "eunomia_check_requests",
+    "Requests to the check endpoints, by endpoint and status code",
+    ("endpoint", "status"),
+)
+check_duration = registry.histogram(
+    "eunomia_check_duration_seconds",
+    "Latency of the requests to the check endpoints",
+    ("endpoint",),
+)
+checks = registry.counter(
+    "eunomia_checks", "Decisions taken by the policy engine", ("decision",)
+)
+policy_evaluation_duration = registry.histogram(
+    "eunomia_policy_evaluation_duration_seconds",
+    "Time spent evaluating the policies, by evaluation mode",
+    ("mode",),
+)
+rules_evaluated = registry.histogram(
+    "eunomia_rules_evaluated",
+    "Rules evaluated per single check",
+    buckets=COUNT_BUCKETS,
+)
+fetcher_duration = registry.histogram(
+    "eunomia_fetcher_duration_seconds",
+    "Latency of the attribute fetches, by fetcher",
+    ("fetcher",),
+)
+fetcher_errors = registry.counter(
+    "eunomia_fetcher_errors", "Failed attribute fetches, by fetcher", ("fetcher",)
+)
+entity_resolutions = registry.counter(
+    "eunomia_entity_resolutions",
+    "Entities of bulk checks, either fetched or reused from an equal entity",
+    ("result",),
+)
+batch_queue_depth = registry.gauge(
+    "eunomia_batch_queue_depth", "Items of bulk checks waiting for a worker slot"
+)
+batch_concurrency_limit = registry.gauge(
+    "eunomia_batch_concurrency_limit",
+    "Items of bulk checks allowed to be processed concurrently",
+)
+policies = registry.gauge("eunomia_policies", "Policies loaded in the engine")
+revision = registry.gauge(
+    "eunomia_revision", "Revision of the policies and the registered entities"
+)
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+
+class RevisionTracker:
+    """
+    Monotonic counter of the changes to the policies and the registered entities.
+
+    Clients caching decisions can wait for the next revision to invalidate them.
+    The counter starts from the current time so that it keeps increasing across
+    restarts of the server.
+    """
+
+    def __init__(self) -> None:
+        self._revision = time.time_ns()
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    def bump(self) -> int:
+        """Record a change and wake up the waiters, returning the new revision."""
+        with self._lock:
+            self._revision += 1
+            revision = self._revision
+            waiters, self._waiters = self._waiters, []
+
+        # changes can be recorded from the threads running sync endpoints
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_set_result, future, revision)
+        return revision
+
+    async def wait(self, after: int | None, timeout: float) -> int:
+        """
+        Wait until the revision differs from `after`, up to `timeout` seconds.
+
+        Parameters
+        ----------
+        after : int, optional
+            The last revision known by the caller.
+            If not provided, the current revision is returned immediately.
+        timeout : float
+            The maximum time in seconds to wait for a change.
+
+        Returns
+        -------
+        int
+            The current revision.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if after is None or after != self._revision:
+                return self._revision
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            return self._revision
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+
+def _set_result(future: asyncio.Future, revision: int) -> None:
+    if not future.done():
+        future.set_result(revision)
+
+
+revision_tracker = RevisionTracker()
@@ -0,0 +1,182 @@
+import gzip
+import io
+from typing import Any, AsyncIterator, BinaryIO, Callable
+
+import orjson
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+from eunomia.config import settings
+
+try:
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class SerializedRequest(Request):
+    """
+    Request decoding compressed and MessagePack bodies, and parsing JSON with orjson.
+
+    Bodies can be compressed with gzip, or zstd if the `zstandard` package is
+    installed, as declared by the Content-Encoding header. They are decompressed
+    in chunks and rejected with a 413 status once they exceed the
+    DECOMPRESSED_BODY_MAX_SIZE setting. MessagePack bodies require
+    the `ormsgpack` package and are parsed in place of JSON ones, so that they go
+    through the same validation.
+    """
+
+    def __init__(self, scope: dict, receive: Callable) -> None:
+        self.is_msgpack = _media_type(scope) == MSGPACK_MEDIA_TYPE
+        if self.is_msgpack:
+            # without a content type, the body is parsed with the json method
+            scope = {
+                **scope,
+                "headers": [
+                    (key, value)
+                    for key, value in scope["headers"]
+                    if key != b"content-type"
+                ],
+            }
+        super().__init__(scope, receive)
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            encoding = self.headers.get("content-encoding", "identity").lower()
+            if encoding == "gzip":
+                body = _read_limited(gzip.GzipFile(fileobj=io.BytesIO(body)))
+            elif encoding == "zstd" and zstandard is not None:
+                body = _read_limited(zstandard.ZstdDecompressor().stream_reader(body))
+            elif encoding != "identity":
+                raise ValueError(f"Unsupported content encoding: {encoding}")
+            self._body = body
+        return self._body
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            if self.is_msgpack:
+                if ormsgpack is None:
+                    raise ValueError("MessagePack bodies require the ormsgpack package")
+                self._json = ormsgpack.unpackb(body)
+            else:
+                self._json = orjson.loads(body)
+        return self._json
+
+
+class SerializedRoute(APIRoute):
+    """Route handling requests with `SerializedRequest`."""
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await original_route_handler(
+                SerializedRequest(request.scope, request.receive)
+            )
+
+        return route_handler
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose content is generated while reading the request body.
+
+    The Starlette streaming response detects the client disconnection by reading
+    the request messages, which would consume the body still to be read. The
+    disconnection is instead detected when sending the response fails.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+        if self.background is not None:
+            await self.background()
+
+
+def serialize_response(
+    content: BaseModel | list[BaseModel], request: Request
+) -> Response:
+    """
+    Serialize the content with the format and the encoding accepted by the client.
+
+    The content is serialized with MessagePack if accepted by the client and the
+    `ormsgpack` package is installed, otherwise with orjson. Bodies larger than the
+    COMPRESSION_MIN_SIZE setting are compressed with zstd or gzip if accepted.
+    """
+    if isinstance(content, BaseModel):
+        data = content.model_dump(mode="json")
+    else:
+        data = [item.model_dump(mode="json") for item in content]
+
+    if ormsgpack is not None and MSGPACK_MEDIA_TYPE in request.headers.get(
+        "accept", ""
+    ):
+        body, media_type = ormsgpack.packb(data), MSGPACK_MEDIA_TYPE
+    else:
+        body, media_type = orjson.dumps(data), "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= settings.COMPRESSION_MIN_SIZE:
+        encodings = {
+            encoding.split(";")[0].strip().lower()
+            for encoding in request.headers.get("accept-encoding", "").split(",")
+        }
+        if "zstd" in encodings and zstandard is not None:
+            body = zstandard.ZstdCompressor().compress(body)
+            headers["Content-Encoding"] = "zstd"
+        elif "gzip" in encodings:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a stream of chunks into its non-empty lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+def _read_limited(reader: BinaryIO) -> bytes:
+    """Read a decompressed body, up to the DECOMPRESSED_BODY_MAX_SIZE setting."""
+    chunks, size = [], 0
+    while chunk := reader.read(64 * 1024):
+        size += len(chunk)
+        if size > settings.DECOMPRESSED_BODY_MAX_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Decompressed request body too large",
+            )
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _media_type(scope: dict) -> str:
+    for key, value in scope["headers"]:
+        if key == b"content-type":
+            return value.decode("latin-1").split(";")[0].strip().lower()
+    return ""
@@ -0,0 +1,159 @@
+import contextlib
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine.base import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:
+    propagate = None
+    trace = None
+
+# the tracer delegates to the global tracer provider, once configured
+_tracer = trace.get_tracer("eunomia") if trace is not None else None
+
+
+def start_span(
+    name: str, attributes: dict | None = None
+) -> contextlib.AbstractContextManager:
+    """
+    Start a span as the current span, doing nothing without OpenTelemetry.
+
+    Spans are recorded if the `opentelemetry-api` package is installed and a tracer
+    provider is configured, either with the TRACING_EXPORTER setting or by the
+    application embedding the server.
+    """
+    if _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def configure_tracing(exporter: str) -> None:
+    """
+    Configure the global tracer provider to export the spans.
+
+    Parameters
+    ----------
+    exporter : str
+        Either "console", printing the spans to the standard output, or "otlp",
+        sending them to the OTLP/HTTP endpoint configured by the standard
+        OTEL_EXPORTER_OTLP_* environment variables.
+
+    Raises
+    ------
+    ValueError
+        If the exporter is unknown or the OpenTelemetry SDK is not installed.
+    """
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+        )
+    except ImportError:
+        raise ValueError(
+            "Tracing requires the OpenTelemetry SDK, "
+            "installed with `pip install eunomia-ai[tracing]`"
+        )
+
+    if exporter == "console":
+        span_exporter = ConsoleSpanExporter()
+    elif exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        span_exporter = OTLPSpanExporter()
+    else:
+        raise ValueError(f"Unsupported tracing exporter: {exporter}")
+
+    provider = TracerProvider(
+        resource=Resource.create(
+            {"service.name": os.getenv("OTEL_SERVICE_NAME", "eunomia")}
+        )
+    )
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record a span for each SQL statement executed by the engine."""
+    if _tracer is None:
+        return
+
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            operation = statement.lstrip().split(" ", 1)[0].upper()
+            context._span = _tracer.start_span(
+                f"{system} {operation}",
+                kind=trace.SpanKind.CLIENT,
+                attributes={"db.system": system, "db.statement": statement},
+            )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany) -> None:
+        span = getattr(context, "_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context) -> None:
+        span = getattr(exception_context.execution_context, "_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(trace.StatusCode.ERROR)
+            span.end()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware recording a span for each HTTP request.
+
+    The trace context propagated by the client in the request headers, such as
+    `traceparent`, becomes the parent of the span, so that the spans of the server
+    belong to the trace of the caller. Spans are named after the route path, so
+    that path parameters do not create a name per value.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if _tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope["headers"]
+        }
+        with _tracer.start_as_current_span(
+            scope["method"],
+            context=propagate.extract(carrier),
+            kind=trace.SpanKind.SERVER,
+            attributes={
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+            },
+        ) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(trace.StatusCode.ERROR)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{scope['method']} {route.path}")
+                    span.set_attribute("http.route", route.path)
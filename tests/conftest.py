@@ -0,0 +1,28 @@
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+
+@pytest.fixture(scope="session")
+def tracer_provider_exporter() -> InMemorySpanExporter:
+    """Configure the global tracer provider, which can be set once per process."""
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+
+    exporter = InMemorySpanExporter()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return exporter
+
+
+@pytest.fixture
+def span_exporter(tracer_provider_exporter: InMemorySpanExporter):
+    """Collect in memory the spans finished during the test."""
+    tracer_provider_exporter.clear()
+    yield tracer_provider_exporter
+    tracer_provider_exporter.clear()
@@ -1,6 +1,9 @@
+import threading
+
 from eunomia_core import enums, schemas
 
 from eunomia.engine import PolicyEngine
+from eunomia.utils.revision import revision_tracker
 
 
 class TestPolicyEngineWithDatabase:
@@ -99,6 +102,20 @@ class TestPolicyEngineWithoutDatabase:
         assert len(policies) == 1
         assert policies[0].name == sample_policy.name
 
+    def test_policy_changes_bump_revision(
+        self, engine_without_database: PolicyEngine, sample_policy: schemas.Policy
+    ):
+        """Test that adding and removing policies changes the revision."""
+        revision = revision_tracker.revision
+        engine_without_database.add_policy(sample_policy)
+        assert revision_tracker.revision == revision + 1
+
+        engine_without_database.remove_policy("non-existent")
+        assert revision_tracker.revision == revision + 1
+
+        engine_without_database.remove_policy("test-policy")
+        assert revision_tracker.revision == revision + 2
+
 
 class TestPolicyEngineEvaluation:
     """Test PolicyEngine evaluation logic (independent of persistence mode)."""
@@ -163,3 +180,352 @@ class TestPolicyEngineEvaluation:
         # Results should be identical
         assert result_with_db.allowed == result_without_db.allowed
         assert result_with_db.reason == result_without_db.reason
+
+    def test_evaluate_bulk_consistency(
+        self, engine_without_database: PolicyEngine, sample_policy: schemas.Policy
+    ):
+        """Test that bulk evaluation gives the same decisions as single evaluations."""
+        engine_without_database.add_policy(sample_policy)
+        engine_without_database.add_policy(
+            schemas.Policy(
+                name="deny-secret",
+                rules=[
+                    schemas.Rule(
+                        name="deny-secret",
+                        effect=enums.PolicyEffect.DENY,
+                        principal_conditions=[
+                            schemas.Condition(
+                                path="attributes.role",
+                                operator=enums.ConditionOperator.NOT_EQUALS,
+                                value="owner",
+                            )
+                        ],
+                        resource_conditions=[
+                            schemas.Condition(
+                                path="attributes.secret",
+                                operator=enums.ConditionOperator.EQUALS,
+                                value=True,
+                            )
+                        ],
+                        actions=["access"],
+                    )
+                ],
+                default_effect=enums.PolicyEffect.ALLOW,
+            )
+        )
+        resources = [
+            schemas.ResourceCheck(attributes={"name": "public"}),
+            schemas.ResourceCheck(attributes={"name": "secret", "secret": True}),
+        ]
+
+        for role in ["admin", "owner", "user"]:
+            for action in ["access", "write"]:
+                principal = schemas.PrincipalCheck(attributes={"role": role})
+                results = engine_without_database.evaluate_bulk(
+                    principal, action, resources
+                )
+                assert results == [
+                    engine_without_database.evaluate_all(
+                        schemas.CheckRequest(
+                            principal=principal, resource=resource, action=action
+                        )
+                    )
+                    for resource in resources
+                ]
+
+    def test_evaluate_matrix_consistency(
+        self, engine_without_database: PolicyEngine, sample_policy: schemas.Policy
+    ):
+        """Test that matrix evaluation gives the same decisions as single evaluations."""
+
+        def condition(path, operator, value):
+            return schemas.Condition(path=path, operator=operator, value=value)
+
+        engine_without_database.add_policy(sample_policy)
+        engine_without_database.add_policy(
+            schemas.Policy(
+                name="documents",
+                rules=[
+                    schemas.Rule(
+                        name="deny-archived",
+                        effect=enums.PolicyEffect.DENY,
+                        resource_conditions=[
+                            condition(
+                                "attributes.archived",
+                                enums.ConditionOperator.EQUALS,
+                                True,
+                            )
+                        ],
+                        actions=["access", "write"],
+                    ),
+                    schemas.Rule(
+                        name="allow-low-level",
+                        effect=enums.PolicyEffect.ALLOW,
+                        principal_conditions=[
+                            condition(
+                                "attributes.level",
+                                enums.ConditionOperator.GREATER_OR_EQUAL,
+                                2,
+                            )
+                        ],
+                        resource_conditions=[
+                            condition(
+                                "attributes.level", enums.ConditionOperator.GREATER, 0
+                            )
+                        ],
+                        actions=["access", "write"],
+                    ),
+                ],
+                default_effect=enums.PolicyEffect.ALLOW,
+            )
+        )
+        principals = [
+            schemas.PrincipalCheck(attributes={"role": role, "level": level})
+            for role in ["admin", "user"]
+            for level in [1, 3]
+        ]
+        resources = [
+            schemas.ResourceCheck(attributes={"level": level, "archived": archived})
+            for level in [1, 2, 5]
+            for archived in [False, True]
+        ] * 2
+        actions = ["access", "write", "delete"]
+
+        matrix = engine_without_database.evaluate_matrix(principals, resources, actions)
+
+        for p, principal in enumerate(principals):
+            for a, action in enumerate(actions):
+                for r, resource in enumerate(resources):
+                    expected = engine_without_database.evaluate_all(
+                        schemas.CheckRequest(
+                            principal=principal, resource=resource, action=action
+                        )
+                    )
+                    assert bool(matrix[p][a] >> r & 1) is expected.allowed
+
+    def test_explain_consistency(
+        self, engine_without_database: PolicyEngine, sample_policy: schemas.Policy
+    ):
+        """Test that explained evaluation gives the same decisions as evaluate_all."""
+        engine_without_database.add_policy(sample_policy)
+        engine_without_database.add_policy(
+            schemas.Policy(
+                name="deny-secret",
+                rules=[
+                    schemas.Rule(
+                        name="deny-secret",
+                        effect=enums.PolicyEffect.DENY,
+                        resource_conditions=[
+                            schemas.Condition(
+                                path="attributes.secret",
+                                operator=enums.ConditionOperator.EQUALS,
+                                value=True,
+                            )
+                        ],
+                        actions=["access"],
+                    )
+                ],
+                default_effect=enums.PolicyEffect.ALLOW,
+            )
+        )
+
+        for role in ["admin", "user"]:
+            for secret in [False, True]:
+                for action in ["access", "write"]:
+                    request = schemas.CheckRequest(
+                        principal=schemas.PrincipalCheck(attributes={"role": role}),
+                        resource=schemas.ResourceCheck(attributes={"secret": secret}),
+                        action=action,
+                    )
+                    explained = engine_without_database.explain(request)
+                    expected = engine_without_database.evaluate_all(request)
+                    assert explained.allowed is expected.allowed
+                    assert explained.reason == expected.reason
+
+    def test_explain_short_circuit(
+        self, engine_without_database: PolicyEngine, sample_policy: schemas.Policy
+    ):
+        """Test that the explanation reports the evaluated steps of each rule."""
+        sample_policy.rules.insert(
+            0,
+            schemas.Rule(
+                name="deny-guests",
+                effect=enums.PolicyEffect.DENY,
+                principal_conditions=[
+                    schemas.Condition(
+                        path="attributes.level",
+                        operator=enums.ConditionOperator.GREATER,
+                        value=3,
+                    ),
+                    schemas.Condition(
+                        path="attributes.role",
+                        operator=enums.ConditionOperator.EQUALS,
+                        value="guest",
+                    ),
+                    schemas.Condition(
+                        path="attributes.team",
+                        operator=enums.ConditionOperator.EQUALS,
+                        value="external",
+                    ),
+                ],
+                actions=["access"],
+            ),
+        )
+        sample_policy.rules.append(
+            schemas.Rule(name="never-reached", effect="allow", actions=["access"])
+        )
+        engine_without_database.add_policy(sample_policy)
+
+        explained = engine_without_database.explain(
+            schemas.CheckRequest(
+                principal=schemas.PrincipalCheck(
+                    attributes={"role": "admin", "level": 2}
+                ),
+                resource=schemas.ResourceCheck(attributes={"name": "doc"}),
+                action="access",
+            )
+        )
+
+        assert explained.allowed
+        (policy,) = explained.policies
+        assert policy.matched_rule == "test-rule"
+        assert [rule.name for rule in policy.rules] == ["deny-guests", "test-rule"]
+
+        deny, allow = policy.rules
+        assert not deny.matched
+        assert deny.short_circuit == "principal_conditions[1]"
+        assert [c.attribute_value for c in deny.principal_conditions] == [2, "admin"]
+        assert [c.matched for c in deny.principal_conditions] == [True, False]
+        assert deny.duration_ns >= sum(c.duration_ns for c in deny.principal_conditions)
+        assert allow.matched and allow.short_circuit is None
+        assert policy.duration_ns == deny.duration_ns + allow.duration_ns
+        assert explained.duration_ns == policy.duration_ns
+
+        explained = engine_without_database.explain(
+            schemas.CheckRequest(
+                principal=schemas.PrincipalCheck(attributes={"role": "admin"}),
+                resource=schemas.ResourceCheck(attributes={"name": "doc"}),
+                action="write",
+            )
+        )
+        assert not explained.allowed
+        assert [rule.short_circuit for rule in explained.policies[0].rules] == [
+            "action",
+            "action",
+            "action",
+        ]
+
+
+class TestPolicyEnginePartialEvaluation:
+    """Test PolicyEngine partial evaluation against a principal."""
+
+    def test_partial_evaluate_matching_principal(
+        self, engine_without_database: PolicyEngine, sample_policy: schemas.Policy
+    ):
+        """Test that rules matching the principal are reduced to resource conditions."""
+        engine_without_database.add_policy(sample_policy)
+        result = engine_without_database.partial_evaluate(
+            schemas.PrincipalCheck(attributes={"role": "admin"}), "access"
+        )
+        assert len(result.allow_if) == 1
+        assert result.allow_if[0].rule_name == "test-rule"
+        assert result.allow_if[0].conditions == []
+        assert result.deny_if == []
+
+    def test_partial_evaluate_non_matching_principal(
+        self, engine_without_database: PolicyEngine, sample_policy: schemas.Policy
+    ):
+        """Test that rules not matching the principal are discarded."""
+        engine_without_database.add_policy(sample_policy)
+        result = engine_without_database.partial_evaluate(
+            schemas.PrincipalCheck(attributes={"role": "user"}), "access"
+        )
+        assert result.allow_if == []
+        assert result.deny_if == []
+
+
+class TestPolicyEngineRuleStats:
+    """Test PolicyEngine per-rule statistics."""
+
+    def test_rule_stats(
+        self,
+        engine_without_database: PolicyEngine,
+        sample_policy: schemas.Policy,
+        sample_access_request: schemas.CheckRequest,
+    ):
+        """Test that rules are counted as evaluated, matched and applied."""
+        deny = schemas.Policy(
+            name="deny-policy",
+            rules=[
+                schemas.Rule(
+                    name="deny-read",
+                    effect=enums.PolicyEffect.DENY,
+                    actions=["read"],
+                ),
+                schemas.Rule(
+                    name="deny-access",
+                    effect=enums.PolicyEffect.DENY,
+                    actions=["access"],
+                ),
+            ],
+        )
+        engine_without_database.add_policy(sample_policy)
+        engine_without_database.add_policy(deny)
+        engine_without_database.evaluate_all(sample_access_request)
+
+        stats = engine_without_database.get_policy_stats("test-policy")
+        (rule,) = stats.rules
+        assert (rule.name, rule.evaluated, rule.matched, rule.applied) == (
+            "test-rule",
+            1,
+            1,
+            0,
+        )
+        read, access = engine_without_database.get_policy_stats("deny-policy").rules
+        assert (read.evaluated, read.matched, read.applied) == (1, 0, 0)
+        assert (access.evaluated, access.matched, access.applied) == (1, 1, 1)
+        assert access.total_time_ns >= 0
+
+    def test_rule_stats_across_threads(
+        self,
+        engine_without_database: PolicyEngine,
+        sample_policy: schemas.Policy,
+        sample_access_request: schemas.CheckRequest,
+    ):
+        """Test that the statistics recorded by each thread are summed."""
+        engine_without_database.add_policy(sample_policy)
+
+        def check():
+            for _ in range(10):
+                engine_without_database.evaluate_all(sample_access_request)
+
+        threads = [threading.Thread(target=check) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        (rule,) = engine_without_database.get_policy_stats("test-policy").rules
+        assert (rule.evaluated, rule.matched, rule.applied) == (40, 40, 40)
+
+    def test_reset_rule_stats(
+        self,
+        engine_without_database: PolicyEngine,
+        sample_policy: schemas.Policy,
+        sample_access_request: schemas.CheckRequest,
+    ):
+        """Test that the statistics are reset on demand and on policy changes."""
+        engine_without_database.add_policy(sample_policy)
+        engine_without_database.evaluate_all(sample_access_request)
+        assert engine_without_database.reset_policy_stats("test-policy") is True
+        (rule,) = engine_without_database.get_policy_stats("test-policy").rules
+        assert rule.evaluated == 0
+
+        engine_without_database.evaluate_all(sample_access_request)
+        engine_without_database.remove_policy("test-policy")
+        engine_without_database.add_policy(sample_policy)
+        (rule,) = engine_without_database.get_policy_stats("test-policy").rules
+        assert rule.evaluated == 0
+
+        assert engine_without_database.get_policy_stats("non-existent") is None
+        assert engine_without_database.reset_policy_stats("non-existent") is False
@@ -5,8 +5,11 @@ from eunomia.engine.evaluator import (
     evaluate_condition,
     evaluate_conditions,
     evaluate_policy,
+    evaluate_residual,
     evaluate_rule,
     get_attribute_value,
+    partial_evaluate_policy,
+    simplify_residual,
 )
 
 
@@ -278,3 +281,208 @@ def test_evaluate_policy():
     assert result.effect == enums.PolicyEffect.DENY
     assert result.matched_rule is None
     assert result.policy_name == "test-policy"
+
+
+def test_partial_evaluate_policy():
+    def rule(name, effect, resource_value=None, role="admin", actions=["access"]):
+        return schemas.Rule(
+            name=name,
+            effect=effect,
+            principal_conditions=[
+                schemas.Condition(
+                    path="attributes.role",
+                    operator=enums.ConditionOperator.EQUALS,
+                    value=role,
+                )
+            ],
+            resource_conditions=[
+                schemas.Condition(
+                    path="attributes.type",
+                    operator=enums.ConditionOperator.EQUALS,
+                    value=resource_value,
+                )
+            ]
+            if resource_value
+            else [],
+            actions=actions,
+        )
+
+    policy = schemas.Policy(
+        name="test-policy",
+        rules=[
+            rule("deny-secret", enums.PolicyEffect.DENY, "secret"),
+            rule("allow-user-docs", enums.PolicyEffect.ALLOW, "document", role="user"),
+            rule(
+                "allow-write", enums.PolicyEffect.ALLOW, "document", actions=["write"]
+            ),
+            rule("allow-docs", enums.PolicyEffect.ALLOW, "document"),
+            rule("allow-all", enums.PolicyEffect.ALLOW),
+            rule("unreachable", enums.PolicyEffect.DENY, "image"),
+        ],
+    )
+    principal = schemas.PrincipalCheck(attributes={"role": "admin"})
+
+    allow_rules, deny_rules = partial_evaluate_policy(policy, principal, "access")
+
+    assert [r.rule_name for r in deny_rules] == ["deny-secret"]
+    assert deny_rules[0].unless == []
+    assert [r.rule_name for r in allow_rules] == ["allow-docs", "allow-all"]
+    assert all(r.policy_name == "test-policy" for r in allow_rules)
+    # allow rules are voided by the preceding deny rule
+    assert allow_rules[0].conditions[0].value == "document"
+    assert allow_rules[1].conditions == []
+    assert all(r.unless == [] for r in allow_rules)
+
+    allow_rules, deny_rules = partial_evaluate_policy(policy, principal, "delete")
+    assert allow_rules == [] and deny_rules == []
+
+
+def test_partial_evaluate_policy_deny_after_allow():
+    policy = schemas.Policy(
+        name="test-policy",
+        rules=[
+            schemas.Rule(
+                name="allow-public",
+                effect=enums.PolicyEffect.ALLOW,
+                resource_conditions=[
+                    schemas.Condition(
+                        path="attributes.public",
+                        operator=enums.ConditionOperator.EQUALS,
+                        value=True,
+                    )
+                ],
+                actions=["access"],
+            ),
+            schemas.Rule(
+                name="deny-all",
+                effect=enums.PolicyEffect.DENY,
+                actions=["access"],
+            ),
+        ],
+    )
+    principal = schemas.PrincipalCheck(attributes={"role": "user"})
+
+    allow_rules, deny_rules = partial_evaluate_policy(policy, principal, "access")
+
+    assert [r.rule_name for r in allow_rules] == ["allow-public"]
+    assert [r.rule_name for r in deny_rules] == ["deny-all"]
+    # the deny rule is voided by the preceding allow rule
+    assert deny_rules[0].unless == [allow_rules[0].conditions]
+
+
+def test_simplify_residual():
+    def residual(name, value=None, unless=None):
+        conditions = (
+            [
+                schemas.Condition(
+                    path="attributes.type",
+                    operator=enums.ConditionOperator.EQUALS,
+                    value=value,
+                )
+            ]
+            if value
+            else []
+        )
+        return schemas.ResidualRule(
+            policy_name="p", rule_name=name, conditions=conditions, unless=unless or []
+        )
+
+    # duplicated rules are removed
+    result = simplify_residual(
+        schemas.PartialCheckResponse(
+            allow_if=[residual("a", "doc"), residual("b", "doc")],
+            deny_if=[residual("c", "secret")],
+        )
+    )
+    assert [r.rule_name for r in result.allow_if] == ["a"]
+    assert [r.rule_name for r in result.deny_if] == ["c"]
+
+    # an unconditional allow rule makes the other allow rules redundant
+    result = simplify_residual(
+        schemas.PartialCheckResponse(
+            allow_if=[residual("a", "doc"), residual("b")],
+            deny_if=[residual("c", "secret")],
+        )
+    )
+    assert [r.rule_name for r in result.allow_if] == ["b"]
+    assert [r.rule_name for r in result.deny_if] == ["c"]
+
+    # an unconditional deny rule denies everything
+    result = simplify_residual(
+        schemas.PartialCheckResponse(
+            allow_if=[residual("a", "doc")], deny_if=[residual("b")]
+        )
+    )
+    assert result.allow_if == []
+    assert [r.rule_name for r in result.deny_if] == ["b"]
+
+    # deny rules are irrelevant when nothing can be allowed
+    result = simplify_residual(
+        schemas.PartialCheckResponse(allow_if=[], deny_if=[residual("a", "doc")])
+    )
+    assert result.allow_if == [] and result.deny_if == []
+
+
+def test_evaluate_residual_consistency(engine_without_database):
+    engine_without_database.add_policy(
+        schemas.Policy(
+            name="documents",
+            rules=[
+                schemas.Rule(
+                    name="allow-public",
+                    effect=enums.PolicyEffect.ALLOW,
+                    resource_conditions=[
+                        schemas.Condition(
+                            path="attributes.visibility",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="public",
+                        )
+                    ],
+                    actions=["read"],
+                ),
+                schemas.Rule(
+                    name="deny-archived",
+                    effect=enums.PolicyEffect.DENY,
+                    resource_conditions=[
+                        schemas.Condition(
+                            path="attributes.archived",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value=True,
+                        )
+                    ],
+                    actions=["read"],
+                ),
+                schemas.Rule(
+                    name="allow-owner",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.role",
+                            operator=enums.ConditionOperator.IN,
+                            value=["owner", "admin"],
+                        )
+                    ],
+                    actions=["read"],
+                ),
+            ],
+        )
+    )
+    resources = [
+        {"visibility": "public"},
+        {"visibility": "public", "archived": True},
+        {"visibility": "private"},
+        {"visibility": "private", "archived": True},
+    ]
+
+    for role in ["owner", "guest"]:
+        principal = schemas.PrincipalCheck(attributes={"role": role})
+        partial = engine_without_database.partial_evaluate(principal, "read")
+
+        for attributes in resources:
+            resource = schemas.ResourceCheck(attributes=attributes)
+            expected = engine_without_database.evaluate_all(
+                schemas.CheckRequest(
+                    principal=principal, resource=resource, action="read"
+                )
+            ).allowed
+            assert evaluate_residual(partial, resource) is expected
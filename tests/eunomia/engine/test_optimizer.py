@@ -0,0 +1,204 @@
+import itertools
+
+from eunomia_core import enums, schemas
+
+from eunomia.engine import PolicyEngine
+from eunomia.engine.evaluator import evaluate_policy
+from eunomia.engine.optimizer import (
+    CompiledPolicy,
+    CompiledRule,
+    conditions_exclusive,
+    rules_exclusive,
+    rules_swappable,
+)
+from eunomia.utils import metrics
+
+
+def condition(path: str, operator: enums.ConditionOperator, value) -> schemas.Condition:
+    return schemas.Condition(path=path, operator=operator, value=value)
+
+
+def request(role: str, level: int, action: str = "read") -> schemas.CheckRequest:
+    return schemas.CheckRequest(
+        principal=schemas.PrincipalCheck(attributes={"role": role}),
+        resource=schemas.ResourceCheck(attributes={"level": level}),
+        action=action,
+    )
+
+
+ADMIN = condition("attributes.role", enums.ConditionOperator.EQUALS, "admin")
+USER = condition("attributes.role", enums.ConditionOperator.EQUALS, "user")
+NOT_ADMIN = condition("attributes.role", enums.ConditionOperator.NOT_EQUALS, "admin")
+STAFF = condition("attributes.role", enums.ConditionOperator.IN, ["admin", "user"])
+GUESTS = condition("attributes.role", enums.ConditionOperator.IN, ["guest"])
+LOW = condition("attributes.level", enums.ConditionOperator.GREATER, 3)
+
+
+def test_conditions_exclusive():
+    assert conditions_exclusive(ADMIN, USER)
+    assert conditions_exclusive(ADMIN, NOT_ADMIN)
+    assert conditions_exclusive(USER, GUESTS)
+    assert conditions_exclusive(STAFF, GUESTS)
+    assert not conditions_exclusive(ADMIN, ADMIN)
+    assert not conditions_exclusive(ADMIN, STAFF)
+    assert not conditions_exclusive(USER, NOT_ADMIN)
+    assert not conditions_exclusive(ADMIN, LOW)
+
+
+def test_rules_swappable():
+    allow_admin = schemas.Rule(
+        name="allow-admin",
+        effect=enums.PolicyEffect.ALLOW,
+        principal_conditions=[ADMIN],
+        actions=["read"],
+    )
+    deny_user = schemas.Rule(
+        name="deny-user",
+        effect=enums.PolicyEffect.DENY,
+        principal_conditions=[USER],
+        actions=["read"],
+    )
+    deny_low = schemas.Rule(
+        name="deny-low",
+        effect=enums.PolicyEffect.DENY,
+        resource_conditions=[LOW],
+        actions=["read"],
+    )
+    deny_write = schemas.Rule(
+        name="deny-write", effect=enums.PolicyEffect.DENY, actions=["write"]
+    )
+
+    assert rules_exclusive(allow_admin, deny_user)
+    assert rules_exclusive(allow_admin, deny_write)
+    assert not rules_exclusive(allow_admin, deny_low)
+    assert rules_swappable(deny_user, deny_low)
+    assert rules_swappable(allow_admin, deny_user)
+    assert not rules_swappable(allow_admin, deny_low)
+
+
+def test_compiled_rule_fails_on_selective_condition_first():
+    rule = CompiledRule(
+        0,
+        schemas.Rule(
+            name="admins-low",
+            effect=enums.PolicyEffect.ALLOW,
+            principal_conditions=[STAFF],
+            resource_conditions=[LOW],
+            actions=["read"],
+        ),
+        sample_every=1,
+    )
+    for level in range(10):
+        assert rule.evaluate(request("user", level)) is (level < 3)
+
+    rule.optimize()
+    # the condition always passing is evaluated last
+    assert [c for c, _ in rule.order] == [LOW, STAFF]
+    assert rule.order[0][1] is False
+    assert rule.rank is not None
+
+
+def test_compiled_policy_reorders_swappable_rules():
+    policy = schemas.Policy(
+        name="documents",
+        rules=[
+            schemas.Rule(
+                name="allow-guests",
+                effect=enums.PolicyEffect.ALLOW,
+                principal_conditions=[GUESTS],
+                actions=["read"],
+            ),
+            schemas.Rule(
+                name="allow-staff",
+                effect=enums.PolicyEffect.ALLOW,
+                principal_conditions=[STAFF],
+                actions=["read"],
+            ),
+            schemas.Rule(
+                name="deny-low",
+                effect=enums.PolicyEffect.DENY,
+                resource_conditions=[LOW],
+                actions=["read"],
+            ),
+            schemas.Rule(
+                name="deny-write",
+                effect=enums.PolicyEffect.DENY,
+                actions=["write"],
+            ),
+        ],
+    )
+    compiled = CompiledPolicy(policy, sample_every=1)
+    requests = [
+        request(role, level, action)
+        for role, level, action in itertools.product(
+            ["admin", "user", "other"], range(6), ["read", "write"]
+        )
+    ]
+    for check in requests:
+        compiled.evaluate(check)
+
+    compiled.optimize()
+    # allow-guests never matches and moves after allow-staff with the same effect
+    # but not after deny-low, while deny-write without conditions moves first
+    # since its action is exclusive with the other rules
+    assert [rule.rule.name for rule in compiled.order] == [
+        "deny-write",
+        "allow-staff",
+        "allow-guests",
+        "deny-low",
+    ]
+    for check in requests:
+        result, _ = compiled.evaluate(check)
+        assert result.effect == evaluate_policy(policy, check).effect
+
+
+def test_engine_optimizer(monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_OPTIMIZER", True)
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_OPTIMIZER_INTERVAL", 10)
+    engine = PolicyEngine()
+    engine.add_policy(
+        schemas.Policy(
+            name="documents",
+            rules=[
+                schemas.Rule(
+                    name="allow-guests",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[GUESTS],
+                    actions=["read"],
+                ),
+                schemas.Rule(
+                    name="allow-staff",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[STAFF],
+                    resource_conditions=[LOW],
+                    actions=["read"],
+                ),
+            ],
+        )
+    )
+
+    for _ in range(5):
+        for level in range(10):
+            response = engine.evaluate_all(request("admin", level))
+            assert response.allowed is (level < 3)
+    engine.optimize()
+
+    # the statistics are still recorded by declaration order
+    guests, staff = engine.get_policy_stats("documents").rules
+    assert guests.matched == 0
+    assert staff.applied == 15
+
+    (policy,) = engine.get_policies()
+    order = engine._optimizer.compiled(policy).order
+    assert [rule.rule.name for rule in order] == ["allow-staff", "allow-guests"]
+
+    # the rules evaluated are counted in the optimized order
+    observed = []
+    monkeypatch.setattr(
+        metrics.rules_evaluated, "observe", lambda value, **_: observed.append(value)
+    )
+    engine.evaluate_all(request("admin", 0))
+    assert observed == [1]
+    assert engine.get_policy_stats("documents").rules[0].evaluated == guests.evaluated
+    assert engine.get_policy_stats("documents").rules[1].applied == staff.applied + 1
@@ -1,6 +1,6 @@
 import pytest
 from eunomia_core import enums, schemas
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 from eunomia.fetchers.registry import RegistryFetcher, RegistryFetcherConfig
@@ -11,6 +11,7 @@ from eunomia.fetchers.registry.db import db
 def fixture_db():
     """Create an in-memory SQLite database for registry testing."""
     test_engine = create_engine("sqlite:///:memory:")
+    event.listen(test_engine, "connect", db._enable_case_sensitive_like)
     db.Base.metadata.create_all(test_engine)
     TestingSessionLocal = sessionmaker(
         autocommit=False, autoflush=False, bind=test_engine
@@ -1,9 +1,16 @@
+import json
+from unittest.mock import patch
+
 import pytest
 from eunomia_core import enums, schemas
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import Session
 
+from eunomia.engine import PolicyEngine
+from eunomia.engine.evaluator import evaluate_condition
 from eunomia.fetchers.registry import RegistryFetcher, RegistryFetcherConfig
-from eunomia.fetchers.registry.db import crud
+from eunomia.fetchers.registry.db import crud, db
+from eunomia.utils.revision import revision_tracker
 
 
 class TestRegistryFetcher:
@@ -80,6 +87,99 @@ class TestRegistryFetcher:
         assert resource_result.type == enums.EntityType.resource
         assert principal_result.type == enums.EntityType.principal
 
+    def test_register_entities_success(
+        self, fixture_db: Session, fixture_registry: RegistryFetcher
+    ):
+        """Test registering multiple entities in a single transaction"""
+
+        entities = [
+            schemas.EntityCreate(
+                uri=f"test://resource/{i}",
+                type=enums.EntityType.resource,
+                attributes=[schemas.Attribute(key="index", value=i)],
+            )
+            for i in range(5)
+        ]
+
+        results = fixture_registry.register_entities(entities, fixture_db)
+
+        assert [r.uri for r in results] == [e.uri for e in entities]
+        assert [r.attributes_dict["index"] for r in results] == list(range(5))
+        assert crud.get_entities_count(fixture_db) == 5
+
+    def test_register_entities_duplicate_uri(
+        self,
+        fixture_db: Session,
+        sample_entity_create_resource: schemas.EntityCreate,
+        fixture_registry: RegistryFetcher,
+    ):
+        """Test that no entity is registered if any uri is invalid"""
+
+        new_entity = schemas.EntityCreate(
+            uri="test://resource/new",
+            type=enums.EntityType.resource,
+            attributes=[schemas.Attribute(key="name", value="New")],
+        )
+
+        with pytest.raises(ValueError, match="At least one entity must be provided"):
+            fixture_registry.register_entities([], fixture_db)
+
+        with pytest.raises(ValueError, match="Entity uris must be unique"):
+            fixture_registry.register_entities([new_entity, new_entity], fixture_db)
+
+        fixture_registry.register_entity(sample_entity_create_resource, fixture_db)
+        with pytest.raises(
+            ValueError,
+            match=r"Entities with uris \['test://resource/1'\] are already registered",
+        ):
+            fixture_registry.register_entities(
+                [new_entity, sample_entity_create_resource], fixture_db
+            )
+
+        assert crud.get_entity("test://resource/new", fixture_db) is None
+
+    def test_upsert_entities(
+        self, fixture_db: Session, fixture_registry: RegistryFetcher
+    ):
+        """Test that upserting entities only writes the changed ones"""
+
+        def entity(i: int, value: str) -> schemas.EntityCreate:
+            return schemas.EntityCreate(
+                uri=f"test://resource/{i}",
+                type=enums.EntityType.resource,
+                attributes=[schemas.Attribute(key="group", value=value)],
+            )
+
+        fixture_registry.upsert_entities([entity(0, "a"), entity(1, "a")], fixture_db)
+
+        with patch.object(
+            crud, "_build_attribute", wraps=crud._build_attribute
+        ) as build_attribute:
+            results = fixture_registry.upsert_entities(
+                [entity(0, "a"), entity(1, "b"), entity(2, "c")], fixture_db
+            )
+
+        # only the changed and the new entities are written
+        assert build_attribute.call_count == 2
+        assert [r.attributes_dict["group"] for r in results] == ["a", "b", "c"]
+        db_entity = crud.get_entity("test://resource/1", fixture_db)
+        assert schemas.EntityInDb.model_validate(db_entity).attributes_dict == {
+            "group": "b"
+        }
+        assert crud.get_entities_count(fixture_db) == 3
+
+        # an idempotent upsert does not invalidate the cached decisions
+        revision = revision_tracker.revision
+        fixture_registry.upsert_entities([entity(0, "a"), entity(1, "b")], fixture_db)
+        assert revision_tracker.revision == revision
+        fixture_registry.upsert_entities([entity(0, "b")], fixture_db)
+        assert revision_tracker.revision > revision
+
+        with pytest.raises(ValueError, match="Entity uris must be unique"):
+            fixture_registry.upsert_entities(
+                [entity(0, "a"), entity(0, "b")], fixture_db
+            )
+
     def test_update_entity_success(
         self,
         fixture_db: Session,
@@ -296,3 +396,494 @@ class TestRegistryFetcher:
         }
         assert created.attributes_dict["score"] == 42.5
         assert created.attributes_dict["active"] is True
+
+
+class TestRegistryFindEntities:
+    """Test the indexed attribute lookups of the RegistryFetcher"""
+
+    @pytest.fixture
+    def registry_with_documents(
+        self, fixture_db: Session, fixture_registry: RegistryFetcher
+    ) -> RegistryFetcher:
+        documents = [
+            ("doc:1", {"category": "finance", "level": 1, "title": "Budget"}),
+            ("doc:2", {"category": "finance", "level": 3, "title": "budget plan"}),
+            ("doc:3", {"category": "hr", "level": 5, "title": "Hiring 100%"}),
+            ("doc:4", {"category": "legal", "level": "high", "tags": ["a", "b"]}),
+        ]
+        for uri, attributes in documents:
+            fixture_registry.register_entity(
+                schemas.EntityCreate(
+                    uri=uri, type=enums.EntityType.resource, attributes=attributes
+                ),
+                fixture_db,
+            )
+        fixture_registry.register_entity(
+            schemas.EntityCreate(
+                uri="user:1",
+                type=enums.EntityType.principal,
+                attributes={"category": "finance"},
+            ),
+            fixture_db,
+        )
+        return fixture_registry
+
+    def _find(self, registry: RegistryFetcher, db_session: Session, *conditions):
+        return registry.find_entities(
+            [
+                schemas.Condition(path=path, operator=operator, value=value)
+                for path, operator, value in conditions
+            ],
+            db_session=db_session,
+            type=enums.EntityType.resource,
+        )
+
+    def test_equality_operators(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test equals and not equals over string and numeric attributes"""
+        op = enums.ConditionOperator
+        find = lambda *c: self._find(registry_with_documents, fixture_db, *c)
+
+        assert find(("attributes.category", op.EQUALS, "finance")) == [
+            "doc:1",
+            "doc:2",
+        ]
+        assert find(("attributes.level", op.EQUALS, 3)) == ["doc:2"]
+        assert find(("attributes.level", op.EQUALS, "high")) == ["doc:4"]
+        assert find(("attributes.category", op.NOT_EQUALS, "finance")) == [
+            "doc:3",
+            "doc:4",
+        ]
+        # values of a different type are never equal
+        assert find(("attributes.level", op.NOT_EQUALS, 1)) == [
+            "doc:2",
+            "doc:3",
+            "doc:4",
+        ]
+
+    def test_numeric_operators(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test numeric comparisons ignore non-numeric values"""
+        op = enums.ConditionOperator
+        find = lambda *c: self._find(registry_with_documents, fixture_db, *c)
+
+        # the condition value is compared against the attribute, as in policies
+        assert find(("attributes.level", op.GREATER, 3)) == ["doc:1"]
+        assert find(("attributes.level", op.GREATER_OR_EQUAL, 3)) == [
+            "doc:1",
+            "doc:2",
+        ]
+        assert find(("attributes.level", op.LESS, 1)) == ["doc:2", "doc:3"]
+        assert find(("attributes.level", op.LESS_OR_EQUAL, 5.0)) == ["doc:3"]
+        assert find(("attributes.level", op.GREATER, "high")) == []
+
+    def test_numeric_operators_match_engine(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test the direction and boundaries of numeric comparisons agree with the engine"""
+        op = enums.ConditionOperator
+        documents = {
+            uri: schemas.EntityInDb.model_validate(
+                crud.get_entity(uri, fixture_db)
+            ).attributes_dict
+            for uri in ["doc:1", "doc:2", "doc:3", "doc:4"]
+        }
+        for operator in [
+            op.GREATER,
+            op.GREATER_OR_EQUAL,
+            op.LESS,
+            op.LESS_OR_EQUAL,
+        ]:
+            # the values at the boundaries, between and beyond the stored levels
+            for value in [0, 1, 2.5, 3, 3.0, 5, 6]:
+                condition = schemas.Condition(
+                    path="attributes.level", operator=operator, value=value
+                )
+                expected = [
+                    uri
+                    for uri, attributes in documents.items()
+                    if evaluate_condition(
+                        condition, schemas.ResourceCheck(uri=uri, attributes=attributes)
+                    )
+                ]
+                assert (
+                    self._find(
+                        registry_with_documents,
+                        fixture_db,
+                        ("attributes.level", operator, value),
+                    )
+                    == expected
+                ), (operator, value)
+
+    def test_string_operators(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test string operators are case sensitive and escape wildcards"""
+        op = enums.ConditionOperator
+        find = lambda *c: self._find(registry_with_documents, fixture_db, *c)
+
+        assert find(("attributes.title", op.CONTAINS, "udget")) == ["doc:1", "doc:2"]
+        assert find(("attributes.title", op.STARTS_WITH, "Budget")) == ["doc:1"]
+        assert find(("attributes.title", op.ENDS_WITH, "plan")) == ["doc:2"]
+        assert find(("attributes.title", op.CONTAINS, "100%")) == ["doc:3"]
+        assert find(("attributes.title", op.CONTAINS, "_")) == []
+        assert find(("attributes.title", op.NOT_CONTAINS, "Budget")) == [
+            "doc:2",
+            "doc:3",
+        ]
+        assert find(("uri", op.STARTS_WITH, "doc:")) == [
+            "doc:1",
+            "doc:2",
+            "doc:3",
+            "doc:4",
+        ]
+
+    def test_list_operators(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test in and not in with mixed value types"""
+        op = enums.ConditionOperator
+        find = lambda *c: self._find(registry_with_documents, fixture_db, *c)
+
+        assert find(("attributes.category", op.IN, ["hr", "legal"])) == [
+            "doc:3",
+            "doc:4",
+        ]
+        assert find(("attributes.level", op.IN, [1, "high"])) == ["doc:1", "doc:4"]
+        assert find(("attributes.level", op.NOT_IN, [1, "high"])) == [
+            "doc:2",
+            "doc:3",
+        ]
+        assert find(("attributes.level", op.NOT_IN, ["high"])) == [
+            "doc:1",
+            "doc:2",
+            "doc:3",
+        ]
+
+    def test_multiple_conditions_and_type(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test conditions are combined with AND logic and filtered by type"""
+        op = enums.ConditionOperator
+        conditions = [
+            schemas.Condition(
+                path="attributes.category", operator=op.EQUALS, value="finance"
+            ),
+        ]
+
+        assert registry_with_documents.find_entities(conditions, fixture_db) == [
+            "doc:1",
+            "doc:2",
+            "user:1",
+        ]
+        assert self._find(
+            registry_with_documents,
+            fixture_db,
+            ("attributes.category", op.EQUALS, "finance"),
+            ("attributes.level", op.LESS, 1),
+        ) == ["doc:2"]
+
+    def test_pagination(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test offset and limit over the matching uris"""
+        conditions = [
+            schemas.Condition(
+                path="uri", operator=enums.ConditionOperator.STARTS_WITH, value="doc:"
+            )
+        ]
+
+        assert registry_with_documents.find_entities(
+            conditions, fixture_db, offset=1, limit=2
+        ) == ["doc:2", "doc:3"]
+
+    def test_updated_attributes_are_indexed(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test attribute updates are reflected in the lookups"""
+        registry_with_documents.update_entity(
+            schemas.EntityUpdate(uri="doc:1", attributes={"level": 10}),
+            override=False,
+            db_session=fixture_db,
+        )
+
+        assert self._find(
+            registry_with_documents,
+            fixture_db,
+            ("attributes.level", enums.ConditionOperator.LESS, 5),
+        ) == ["doc:1"]
+
+    def test_invalid_conditions(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test unsupported conditions raise errors"""
+        with pytest.raises(ValueError, match="At least one condition"):
+            registry_with_documents.find_entities([], fixture_db)
+
+        with pytest.raises(ValueError, match="is not supported"):
+            self._find(
+                registry_with_documents,
+                fixture_db,
+                ("attributes.a.b", enums.ConditionOperator.EQUALS, "x"),
+            )
+
+        with pytest.raises(ValueError, match="non-scalar value"):
+            self._find(
+                registry_with_documents,
+                fixture_db,
+                ("attributes.tags", enums.ConditionOperator.EQUALS, ["a", "b"]),
+            )
+
+    def test_negated_operators_match_engine(
+        self, fixture_db: Session, registry_with_documents: RegistryFetcher
+    ):
+        """Test negated operators on missing and non-scalar values agree with the engine"""
+        op = enums.ConditionOperator
+        documents = {
+            uri: schemas.EntityInDb.model_validate(
+                crud.get_entity(uri, fixture_db)
+            ).attributes_dict
+            for uri in ["doc:1", "doc:2", "doc:3", "doc:4"]
+        }
+        for condition in [
+            ("attributes.title", op.NOT_EQUALS, "Budget"),
+            ("attributes.title", op.NOT_CONTAINS, "budget"),
+            ("attributes.title", op.NOT_IN, ["Budget"]),
+            ("attributes.tags", op.NOT_CONTAINS, "a"),
+            ("attributes.level", op.NOT_EQUALS, 3),
+        ]:
+            path, operator, value = condition
+            expected = [
+                uri
+                for uri, attributes in documents.items()
+                if evaluate_condition(
+                    schemas.Condition(path=path, operator=operator, value=value),
+                    schemas.ResourceCheck(uri=uri, attributes=attributes),
+                )
+            ]
+            assert (
+                self._find(registry_with_documents, fixture_db, condition) == expected
+            )
+
+        # the engine matches lists with these operators, the lookups cannot
+        for operator, value in [(op.NOT_EQUALS, "a"), (op.NOT_IN, ["a"])]:
+            with pytest.raises(ValueError, match="non-scalar values"):
+                self._find(
+                    registry_with_documents,
+                    fixture_db,
+                    ("attributes.tags", operator, value),
+                )
+            with pytest.raises(ValueError, match="non-scalar values"):
+                crud.find_allowed_entities(
+                    schemas.PartialCheckResponse(
+                        allow_if=[
+                            schemas.ResidualRule(
+                                policy_name="p",
+                                rule_name="r",
+                                conditions=[
+                                    schemas.Condition(
+                                        path="attributes.tags",
+                                        operator=operator,
+                                        value=value,
+                                    )
+                                ],
+                            )
+                        ]
+                    ),
+                    db=fixture_db,
+                )
+
+    def test_upgrade_registry_without_typed_values(self, tmp_path, monkeypatch):
+        """Test that a registry created before the typed values is upgraded"""
+        monkeypatch.setattr(db, "engine", db.engine)
+        monkeypatch.setattr(db, "SessionLocal", db.SessionLocal)
+        url = f"sqlite:///{tmp_path / 'registry.sqlite'}"
+        legacy = create_engine(url)
+        with legacy.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE entities (uri VARCHAR PRIMARY KEY, "
+                    "type VARCHAR(9) NOT NULL, registered_at DATETIME)"
+                )
+            )
+            connection.execute(
+                text(
+                    "CREATE TABLE attributes (entity_uri VARCHAR, key VARCHAR, "
+                    "value JSON, updated_at DATETIME, registered_at DATETIME, "
+                    "PRIMARY KEY (entity_uri, key))"
+                )
+            )
+            connection.execute(
+                text("INSERT INTO entities VALUES ('doc:1', 'resource', NULL)")
+            )
+            for key, value in [("category", "finance"), ("level", 3)]:
+                connection.execute(
+                    text(
+                        "INSERT INTO attributes (entity_uri, key, value) "
+                        "VALUES ('doc:1', :key, :value)"
+                    ),
+                    {"key": key, "value": json.dumps(json.dumps(value))},
+                )
+        legacy.dispose()
+
+        registry = RegistryFetcher(RegistryFetcherConfig(sql_database_url=url))
+        with db.SessionLocal() as db_session:
+            assert self._find(
+                registry,
+                db_session,
+                ("attributes.category", enums.ConditionOperator.EQUALS, "finance"),
+                ("attributes.level", enums.ConditionOperator.LESS, 2),
+            ) == ["doc:1"]
+        indexes = {i["name"] for i in inspect(db.engine).get_indexes("attributes")}
+        assert {"ix_attributes_key_value_str", "ix_attributes_key_value_num"} <= indexes
+        db.engine.dispose()
+
+
+class TestRegistryFindAllowedEntities:
+    """Test the resolution of partial evaluations over the registry"""
+
+    @pytest.fixture
+    def documents(self) -> dict[str, dict]:
+        return {
+            "doc:1": {"category": "finance", "level": 1},
+            "doc:2": {"category": "finance", "level": 3, "secret": True},
+            "doc:3": {"category": "hr", "level": 5},
+            "doc:4": {"category": "legal", "level": 2},
+            "doc:5": {"category": "public"},
+        }
+
+    @pytest.fixture
+    def registry_with_documents(
+        self,
+        fixture_registry: RegistryFetcher,
+        fixture_db: Session,
+        documents: dict[str, dict],
+    ) -> RegistryFetcher:
+        for uri, attributes in documents.items():
+            fixture_registry.register_entity(
+                schemas.EntityCreate(
+                    uri=uri, type=enums.EntityType.resource, attributes=attributes
+                ),
+                fixture_db,
+            )
+        return fixture_registry
+
+    @pytest.fixture
+    def engine(self, monkeypatch) -> PolicyEngine:
+        monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+        engine = PolicyEngine()
+
+        def condition(path, operator, value):
+            return schemas.Condition(path=path, operator=operator, value=value)
+
+        op = enums.ConditionOperator
+        engine.add_policy(
+            schemas.Policy(
+                name="documents",
+                rules=[
+                    schemas.Rule(
+                        name="deny-secret",
+                        effect=enums.PolicyEffect.DENY,
+                        resource_conditions=[
+                            condition("attributes.secret", op.EQUALS, True)
+                        ],
+                        actions=["read"],
+                    ),
+                    schemas.Rule(
+                        name="allow-department",
+                        effect=enums.PolicyEffect.ALLOW,
+                        principal_conditions=[
+                            condition("attributes.department", op.EQUALS, "finance")
+                        ],
+                        resource_conditions=[
+                            condition("attributes.category", op.EQUALS, "finance")
+                        ],
+                        actions=["read"],
+                    ),
+                    schemas.Rule(
+                        name="allow-clearance",
+                        effect=enums.PolicyEffect.ALLOW,
+                        principal_conditions=[
+                            condition("attributes.clearance", op.EQUALS, "high")
+                        ],
+                        resource_conditions=[
+                            condition("attributes.level", op.GREATER_OR_EQUAL, 2)
+                        ],
+                        actions=["read"],
+                    ),
+                ],
+            )
+        )
+        engine.add_policy(
+            schemas.Policy(
+                name="public",
+                rules=[
+                    schemas.Rule(
+                        name="allow-public",
+                        effect=enums.PolicyEffect.ALLOW,
+                        resource_conditions=[
+                            condition("uri", op.EQUALS, "doc:5"),
+                        ],
+                        actions=["read"],
+                    ),
+                    schemas.Rule(
+                        name="deny-legal",
+                        effect=enums.PolicyEffect.DENY,
+                        principal_conditions=[
+                            condition("attributes.clearance", op.NOT_EQUALS, "high")
+                        ],
+                        resource_conditions=[
+                            condition("attributes.category", op.EQUALS, "legal")
+                        ],
+                        actions=["read"],
+                    ),
+                ],
+            )
+        )
+        return engine
+
+    @pytest.mark.parametrize(
+        "principal_attributes",
+        [
+            {"department": "finance"},
+            {"clearance": "high"},
+            {"department": "finance", "clearance": "high"},
+            {"department": "hr", "clearance": "low"},
+        ],
+    )
+    def test_consistent_with_evaluation(
+        self,
+        registry_with_documents: RegistryFetcher,
+        engine: PolicyEngine,
+        documents: dict[str, dict],
+        principal_attributes: dict,
+    ):
+        """Test the allowed entities are the ones allowed by a full evaluation"""
+        principal = schemas.PrincipalCheck(attributes=principal_attributes)
+        partial = engine.partial_evaluate(principal, "read")
+
+        allowed = registry_with_documents.find_allowed_entities(partial)
+
+        expected = [
+            uri
+            for uri, attributes in documents.items()
+            if engine.evaluate_all(
+                schemas.CheckRequest(
+                    principal=principal,
+                    resource=schemas.ResourceCheck(uri=uri, attributes=attributes),
+                    action="read",
+                )
+            ).allowed
+        ]
+        assert allowed == expected
+
+    def test_no_allow_rules(
+        self, registry_with_documents: RegistryFetcher, engine: PolicyEngine
+    ):
+        """Test nothing is allowed for an action without rules"""
+        partial = engine.partial_evaluate(
+            schemas.PrincipalCheck(attributes={"clearance": "high"}), "delete"
+        )
+        assert registry_with_documents.find_allowed_entities(partial) == []
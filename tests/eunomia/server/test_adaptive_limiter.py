@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from eunomia.utils.adaptive_limiter import AdaptiveLimiter
+from eunomia.utils.batch_processor import BatchProcessor
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_grows_and_backs_off():
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=1, max_limit=50)
+    processor = BatchProcessor(batch_size=50, limiter=limiter)
+    max_concurrent = 0
+
+    def make_processor(latency: float):
+        async def mock_processor(item):
+            nonlocal max_concurrent
+            max_concurrent = max(max_concurrent, limiter.in_flight)
+            await asyncio.sleep(latency)
+            return item
+
+        return mock_processor
+
+    await processor.run(list(range(200)), make_processor(0.002))
+    grown_limit = limiter.limit
+    assert grown_limit > 2
+    assert max_concurrent > 2
+
+    # fetchers slow down
+    await processor.run(list(range(100)), make_processor(0.02))
+    assert limiter.limit < grown_limit
+    assert processor.concurrency_limit == limiter.limit
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_stays_within_bounds():
+    limiter = AdaptiveLimiter(initial_limit=3, min_limit=2, max_limit=4)
+
+    async def work(latency: float):
+        async with limiter.slot():
+            await asyncio.sleep(latency)
+
+    await asyncio.gather(*[work(0.001) for _ in range(100)])
+    assert limiter.limit == 4
+
+    await asyncio.gather(*[work(0.001 * i) for i in range(100)])
+    assert limiter.limit >= 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_cancelled_waiter():
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holder
+
+    # the slot of the cancelled waiter is not leaked
+    assert limiter.in_flight == 0
+    await asyncio.wait_for(hold(), timeout=1)
@@ -61,3 +61,100 @@ async def test_batch_processor_concurrency_limit():
     await processor.run(items, mock_processor)
 
     assert max_concurrent <= 2
+
+
+@pytest.mark.asyncio
+async def test_batch_processor_global_concurrency_limit():
+    processor = BatchProcessor(batch_size=3, max_concurrency=4)
+    concurrent_count = 0
+    max_concurrent = 0
+
+    async def mock_processor(item):
+        nonlocal concurrent_count, max_concurrent
+        concurrent_count += 1
+        max_concurrent = max(max_concurrent, concurrent_count)
+        await asyncio.sleep(0.01)
+        concurrent_count -= 1
+        return item
+
+    await asyncio.gather(
+        *[processor.run(list(range(10)), mock_processor) for _ in range(3)]
+    )
+
+    assert max_concurrent == 4
+
+
+@pytest.mark.asyncio
+async def test_batch_processor_fairness():
+    processor = BatchProcessor(batch_size=4, max_concurrency=4)
+
+    async def mock_processor(item):
+        await asyncio.sleep(0.01)
+        return item
+
+    large = asyncio.create_task(processor.run(list(range(100)), mock_processor))
+    await asyncio.sleep(0.005)
+    # the small call is not queued behind all the items of the large one
+    await asyncio.wait_for(processor.run([1, 2], mock_processor), timeout=0.1)
+    assert not large.done()
+    await large
+
+
+@pytest.mark.asyncio
+async def test_batch_processor_raises_first_error():
+    processor = BatchProcessor(batch_size=2)
+    processed = []
+
+    async def mock_processor(item):
+        await asyncio.sleep(0.01)
+        if item in (2, 4):
+            raise ValueError(f"Invalid item {item}")
+        processed.append(item)
+        return item
+
+    with pytest.raises(ValueError, match="Invalid item 2"):
+        await processor.run([1, 2, 3, 4, 5, 6], mock_processor)
+    assert sorted(processed) == [1, 3, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_batch_processor_cancel_on_error():
+    processor = BatchProcessor(batch_size=2)
+    processed = []
+
+    async def mock_processor(item):
+        await asyncio.sleep(0.01)
+        if item == 2:
+            raise ValueError("Invalid item")
+        processed.append(item)
+        return item
+
+    with pytest.raises(ValueError):
+        await processor.run(list(range(1, 11)), mock_processor, cancel_on_error=True)
+    await asyncio.sleep(0.05)
+    assert processed == [1]
+
+
+@pytest.mark.asyncio
+async def test_batch_processor_stream():
+    processor = BatchProcessor(batch_size=2)
+    pulled = 0
+
+    async def items():
+        nonlocal pulled
+        for item in [3, 1, 2, 4]:
+            pulled += 1
+            yield item
+
+    async def mock_processor(item):
+        await asyncio.sleep(0.01 * item)
+        return item * 10
+
+    results = []
+    async for index, result in processor.stream(items(), mock_processor):
+        results.append((index, result))
+
+    assert sorted(results) == [(0, 30), (1, 10), (2, 20), (3, 40)]
+    # the first result is the shortest of the first two items
+    assert results[0] == (1, 10)
+    assert pulled == 4
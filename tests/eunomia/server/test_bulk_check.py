@@ -0,0 +1,164 @@
+from collections import Counter
+from unittest.mock import MagicMock
+
+import pytest
+from eunomia_core import enums, schemas
+
+from eunomia.server import EunomiaServer
+
+
+class CountingFetcher:
+    def __init__(self, attributes: dict[str, dict]):
+        self.config = MagicMock(entity_type=None)
+        self.attributes = attributes
+        self.fetched = Counter()
+
+    async def fetch_attributes(self, uri: str) -> dict:
+        self.fetched[uri] += 1
+        return self.attributes.get(uri, {})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+    monkeypatch.setattr("eunomia.config.settings.FETCHERS", {})
+    server = EunomiaServer()
+    server.engine.add_policy(
+        schemas.Policy(
+            name="documents",
+            rules=[
+                schemas.Rule(
+                    name="allow-admin-public",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.role",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="admin",
+                        )
+                    ],
+                    resource_conditions=[
+                        schemas.Condition(
+                            path="attributes.public",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value=True,
+                        )
+                    ],
+                    actions=["read"],
+                )
+            ],
+        )
+    )
+    return server
+
+
+@pytest.mark.asyncio
+async def test_bulk_check_resolves_each_entity_once(server: EunomiaServer):
+    fetcher = CountingFetcher(
+        {
+            "admin": {"role": "admin"},
+            "user": {"role": "user"},
+            "doc-0": {"public": True},
+            "doc-1": {"public": False},
+        }
+    )
+    server._fetchers = {"counting": fetcher}
+    requests = [
+        schemas.CheckRequest(
+            principal=schemas.PrincipalCheck(uri=principal),
+            resource=schemas.ResourceCheck(uri=f"doc-{i % 2}"),
+            action=action,
+        )
+        for principal in ["admin", "user"]
+        for action in ["read", "write"]
+        for i in range(10)
+    ]
+
+    results = await server.bulk_check(requests)
+
+    assert fetcher.fetched == {"admin": 1, "user": 1, "doc-0": 1, "doc-1": 1}
+    assert [r.allowed for r in results[:10]] == [i % 2 == 0 for i in range(10)]
+    assert not any(r.allowed for r in results[10:])
+    # the decisions are the same as the ones of single checks
+    assert results == [await server.check(request) for request in requests]
+
+
+@pytest.mark.asyncio
+async def test_bulk_check_raises_attribute_conflict(server: EunomiaServer):
+    server._fetchers = {"counting": CountingFetcher({"admin": {"role": "admin"}})}
+    requests = [
+        schemas.CheckRequest(
+            principal=schemas.PrincipalCheck(uri="admin", attributes={"role": "user"}),
+            resource=schemas.ResourceCheck(attributes={"public": True}),
+            action="read",
+        )
+    ]
+
+    with pytest.raises(ValueError, match="more than one value"):
+        await server.bulk_check(requests)
+
+
+@pytest.mark.asyncio
+async def test_check_resources(server: EunomiaServer):
+    fetcher = CountingFetcher({"admin": {"role": "admin"}})
+    server._fetchers = {"counting": fetcher}
+    request = schemas.ResourcesCheckRequest(
+        principal=schemas.PrincipalCheck(uri="admin"),
+        resources=[
+            schemas.ResourceCheck(attributes={"public": i % 2 == 0}) for i in range(4)
+        ],
+        action="read",
+    )
+
+    results = await server.check_resources(request)
+
+    assert [r.allowed for r in results] == [True, False, True, False]
+    assert fetcher.fetched == {"admin": 1}
+
+
+@pytest.mark.asyncio
+async def test_check_resources_limit(server: EunomiaServer, monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.BULK_CHECK_MAX_REQUESTS", 2)
+    request = schemas.ResourcesCheckRequest(
+        principal=schemas.PrincipalCheck(attributes={"role": "admin"}),
+        resources=[schemas.ResourceCheck(attributes={"public": True})] * 3,
+    )
+
+    with pytest.raises(ValueError, match="Too many resources"):
+        await server.check_resources(request)
+
+
+@pytest.mark.asyncio
+async def test_check_matrix(server: EunomiaServer):
+    fetcher = CountingFetcher(
+        {"admin": {"role": "admin"}, "user": {"role": "user"}}
+        | {f"doc-{i}": {"public": i % 3 == 0} for i in range(10)}
+    )
+    server._fetchers = {"counting": fetcher}
+    request = schemas.MatrixCheckRequest(
+        principals=[schemas.PrincipalCheck(uri=uri) for uri in ["admin", "user"]],
+        resources=[schemas.ResourceCheck(uri=f"doc-{i}") for i in range(10)],
+        actions=["read", "write"],
+    )
+
+    result = await server.check_matrix(request)
+
+    for p, principal in enumerate(["admin", "user"]):
+        for a, action in enumerate(["read", "write"]):
+            for r in range(10):
+                expected = principal == "admin" and action == "read" and r % 3 == 0
+                assert result.is_allowed(p, r, a) is expected
+    assert set(fetcher.fetched.values()) == {1}
+
+
+@pytest.mark.asyncio
+async def test_check_matrix_limit(server: EunomiaServer, monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.MATRIX_CHECK_MAX_SIZE", 7)
+    request = schemas.MatrixCheckRequest(
+        principals=[schemas.PrincipalCheck(attributes={"role": "admin"})] * 2,
+        resources=[schemas.ResourceCheck(attributes={"public": True})] * 2,
+        actions=["read", "write"],
+    )
+
+    with pytest.raises(ValueError, match="Too many decisions"):
+        await server.check_matrix(request)
@@ -0,0 +1,83 @@
+import pytest
+from eunomia_core import enums, schemas
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from eunomia.server import EunomiaServer
+from eunomia.server.router import server_router_factory
+
+CHECK = {
+    "principal": {"attributes": {"role": "admin"}},
+    "resource": {"attributes": {"public": False}},
+    "action": "read",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+    monkeypatch.setattr("eunomia.config.settings.FETCHERS", {})
+    server = EunomiaServer()
+    server.engine.add_policy(
+        schemas.Policy(
+            name="documents",
+            rules=[
+                schemas.Rule(
+                    name="allow-public",
+                    effect=enums.PolicyEffect.ALLOW,
+                    resource_conditions=[
+                        schemas.Condition(
+                            path="attributes.public",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value=True,
+                        )
+                    ],
+                    actions=["read"],
+                ),
+                schemas.Rule(
+                    name="allow-admin",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.role",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="admin",
+                        )
+                    ],
+                    actions=["read"],
+                ),
+            ],
+        )
+    )
+
+    app = FastAPI()
+    app.include_router(server_router_factory(server))
+    return TestClient(app)
+
+
+def test_check_without_explain(client: TestClient):
+    response = client.post("/check", json=CHECK)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "allowed": True,
+        "reason": "Rule allow-admin allowed the action in policy documents",
+    }
+
+
+def test_check_with_explain(client: TestClient):
+    response = client.post("/check", params={"explain": True}, json=CHECK)
+
+    assert response.status_code == 200
+    explained = schemas.ExplainedCheckResponse.model_validate(response.json())
+    assert explained.allowed
+    assert explained.reason == client.post("/check", json=CHECK).json()["reason"]
+
+    (policy,) = explained.policies
+    assert policy.matched_rule == "allow-admin"
+    public, admin = policy.rules
+    assert public.short_circuit == "resource_conditions[0]"
+    assert public.resource_conditions[0].attribute_value is False
+    assert admin.matched
+    assert admin.principal_conditions[0].attribute_value == "admin"
+    assert all(rule.duration_ns >= 0 for rule in policy.rules)
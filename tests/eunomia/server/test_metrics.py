@@ -0,0 +1,190 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from eunomia_core import enums, schemas
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from eunomia.server import EunomiaServer
+from eunomia.server.router import server_router_factory
+from eunomia.utils import metrics
+from eunomia.utils.batch_processor import BatchProcessor
+
+
+class FailingFetcher:
+    config = MagicMock(entity_type=None)
+
+    async def fetch_attributes(self, uri: str) -> dict:
+        if uri == "broken":
+            raise RuntimeError("Fetcher unavailable")
+        return {"role": "admin"}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+    monkeypatch.setattr("eunomia.config.settings.FETCHERS", {})
+    server = EunomiaServer()
+    server._fetchers = {"failing": FailingFetcher()}
+    server.engine.add_policy(
+        schemas.Policy(
+            name="admins",
+            rules=[
+                schemas.Rule(
+                    name="deny-guests",
+                    effect=enums.PolicyEffect.DENY,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.role",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="guest",
+                        )
+                    ],
+                    actions=["read"],
+                ),
+                schemas.Rule(
+                    name="allow-admins",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.role",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="admin",
+                        )
+                    ],
+                    actions=["read"],
+                ),
+            ],
+        )
+    )
+    return server
+
+
+def test_render_text_format():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("requests", "Requests", ("path",))
+    gauge = registry.gauge("size", "Size")
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+
+    counter.inc(path='/a"b')
+    counter.inc(2, path='/a"b')
+    gauge.set_function(lambda: 3)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests Requests",
+        "# TYPE requests counter",
+        'requests_total{path="/a\\"b"} 3',
+        "# HELP size Size",
+        "# TYPE size gauge",
+        "size 3",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 3",
+    ]
+
+
+def test_labels_must_match():
+    counter = metrics.MetricsRegistry().counter("requests", "Requests", ("path",))
+    with pytest.raises(ValueError, match="expects the labels"):
+        counter.inc(method="GET")
+
+
+@pytest.mark.asyncio
+async def test_check_records_evaluation(server: EunomiaServer):
+    evaluations = metrics.policy_evaluation_duration.get_count(mode="single")
+    rules = metrics.rules_evaluated.get_count()
+    allowed = metrics.checks.get(decision="allowed")
+
+    response = await server.check(
+        schemas.CheckRequest(
+            principal=schemas.PrincipalCheck(uri="admin"),
+            resource=schemas.ResourceCheck(uri="document"),
+            action="read",
+        )
+    )
+
+    assert response.allowed
+    assert (
+        metrics.policy_evaluation_duration.get_count(mode="single") == evaluations + 1
+    )
+    assert metrics.rules_evaluated.get_count() == rules + 1
+    assert metrics.checks.get(decision="allowed") == allowed + 1
+
+
+@pytest.mark.asyncio
+async def test_fetcher_errors_are_counted(server: EunomiaServer):
+    fetches = metrics.fetcher_duration.get_count(fetcher="failing")
+    errors = metrics.fetcher_errors.get(fetcher="failing")
+
+    with pytest.raises(RuntimeError):
+        await server.check(
+            schemas.CheckRequest(
+                principal=schemas.PrincipalCheck(uri="broken"),
+                resource=schemas.ResourceCheck(attributes={"public": True}),
+                action="read",
+            )
+        )
+
+    assert metrics.fetcher_duration.get_count(fetcher="failing") == fetches + 1
+    assert metrics.fetcher_errors.get(fetcher="failing") == errors + 1
+
+
+@pytest.mark.asyncio
+async def test_server_gauges(server: EunomiaServer):
+    assert metrics.policies.get() == 1
+    assert metrics.batch_concurrency_limit.get() == (
+        server._batch_processor.concurrency_limit
+    )
+
+    revision = metrics.revision.get()
+    server.engine.remove_policy("admins")
+    assert metrics.policies.get() == 0
+    assert metrics.revision.get() > revision
+
+
+@pytest.mark.asyncio
+async def test_batch_queue_depth():
+    processor = BatchProcessor(batch_size=2, max_concurrency=1)
+    release = asyncio.Event()
+
+    async def process(item: int) -> int:
+        await release.wait()
+        return item
+
+    task = asyncio.create_task(processor.run(list(range(5)), process))
+    await asyncio.sleep(0.01)
+    # one item is processed, the others wait for a slot or a worker
+    assert processor.queue_depth == 3
+
+    release.set()
+    assert await task == list(range(5))
+    assert processor.queue_depth == 0
+
+
+def test_middleware_records_check_endpoints():
+    server = MagicMock()
+    server.check = AsyncMock(return_value=schemas.CheckResponse(allowed=True))
+    app = FastAPI()
+    app.include_router(server_router_factory(server))
+    app.add_middleware(metrics.MetricsMiddleware)
+    client = TestClient(app)
+
+    requests = metrics.check_requests.get(endpoint="/check", status="200")
+    latencies = metrics.check_duration.get_count(endpoint="/check")
+
+    response = client.post(
+        "/check",
+        json={"principal": {"uri": "admin"}, "resource": {"uri": "document"}},
+    )
+
+    assert response.status_code == 200
+    assert metrics.check_requests.get(endpoint="/check", status="200") == requests + 1
+    assert metrics.check_duration.get_count(endpoint="/check") == latencies + 1
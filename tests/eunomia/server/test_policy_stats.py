@@ -0,0 +1,63 @@
+import pytest
+from eunomia_core import enums, schemas
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from eunomia.engine import PolicyEngine
+from eunomia.engine.router import engine_router_factory
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+    engine = PolicyEngine()
+    engine.add_policy(
+        schemas.Policy(
+            name="documents",
+            rules=[
+                schemas.Rule(
+                    name="allow-read",
+                    effect=enums.PolicyEffect.ALLOW,
+                    actions=["read"],
+                )
+            ],
+        )
+    )
+    engine.evaluate_all(
+        schemas.CheckRequest(
+            principal=schemas.PrincipalCheck(uri="user"),
+            resource=schemas.ResourceCheck(uri="document"),
+            action="read",
+        )
+    )
+
+    app = FastAPI()
+    app.include_router(engine_router_factory(engine))
+    return TestClient(app)
+
+
+def test_get_policy_stats(client: TestClient):
+    response = client.get("/policies/documents/stats")
+
+    assert response.status_code == 200
+    stats = schemas.PolicyStats.model_validate(response.json())
+    assert stats.name == "documents"
+    (rule,) = stats.rules
+    assert (rule.name, rule.evaluated, rule.matched, rule.applied) == (
+        "allow-read",
+        1,
+        1,
+        1,
+    )
+
+    assert client.get("/policies/missing/stats").status_code == 404
+
+
+def test_reset_policy_stats(client: TestClient):
+    response = client.delete("/policies/documents/stats")
+
+    assert response.status_code == 200
+    assert response.json() is True
+    (rule,) = client.get("/policies/documents/stats").json()["rules"]
+    assert rule["evaluated"] == 0
+    assert client.delete("/policies/missing/stats").json() is False
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+
+from eunomia.utils.revision import RevisionTracker
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_immediately_for_unknown_revision():
+    tracker = RevisionTracker()
+
+    assert await tracker.wait(None, timeout=10) == tracker.revision
+    assert await tracker.wait(tracker.revision - 1, timeout=10) == tracker.revision
+
+
+@pytest.mark.asyncio
+async def test_wait_woken_up_by_bump():
+    tracker = RevisionTracker()
+    current = tracker.revision
+
+    waiter = asyncio.create_task(tracker.wait(current, timeout=10))
+    await asyncio.sleep(0)
+    assert tracker.bump() == current + 1
+
+    assert await waiter == current + 1
+
+
+@pytest.mark.asyncio
+async def test_wait_woken_up_by_bump_from_thread():
+    tracker = RevisionTracker()
+    current = tracker.revision
+
+    waiter = asyncio.create_task(tracker.wait(current, timeout=10))
+    await asyncio.sleep(0)
+    thread = threading.Thread(target=tracker.bump)
+    thread.start()
+
+    assert await waiter == current + 1
+    thread.join()
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_returns_current_revision():
+    tracker = RevisionTracker()
+    current = tracker.revision
+
+    assert await tracker.wait(current, timeout=0.01) == current
+    assert tracker._waiters == []
@@ -0,0 +1,133 @@
+import gzip
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import ormsgpack
+import pytest
+import zstandard
+from eunomia_core import schemas
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from eunomia.server.router import server_router_factory
+from eunomia.utils.serialization import MSGPACK_MEDIA_TYPE
+
+
+def make_request(i: int) -> dict:
+    return {
+        "principal": {"uri": f"user-{i}", "attributes": {"role": "analyst"}},
+        "resource": {"uri": f"document-{i}", "attributes": {}},
+        "action": "read",
+    }
+
+
+@pytest.fixture
+def client():
+    async def check(request: schemas.CheckRequest) -> schemas.CheckResponse:
+        return schemas.CheckResponse(
+            allowed=request.principal.uri.endswith("0"), reason="test"
+        )
+
+    async def bulk_check(requests: list[schemas.CheckRequest]):
+        return [await check(request) for request in requests]
+
+    server = MagicMock()
+    server.check = AsyncMock(side_effect=check)
+    server.bulk_check = AsyncMock(side_effect=bulk_check)
+
+    app = FastAPI()
+    app.include_router(server_router_factory(server))
+    return TestClient(app)
+
+
+def test_json_check(client: TestClient):
+    response = client.post("/check", json=make_request(0))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"allowed": True, "reason": "test"}
+
+
+def test_msgpack_check(client: TestClient):
+    response = client.post(
+        "/check",
+        content=ormsgpack.packb(make_request(1)),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert ormsgpack.unpackb(response.content) == {"allowed": False, "reason": "test"}
+
+
+def test_invalid_msgpack_check(client: TestClient):
+    response = client.post(
+        "/check",
+        content=ormsgpack.packb({"action": "read"}),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE},
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_compressed_bulk_check(client: TestClient, encoding: str):
+    body = json.dumps([make_request(i) for i in range(100)]).encode()
+    if encoding == "gzip":
+        content = gzip.compress(body)
+    else:
+        content = zstandard.ZstdCompressor().compress(body)
+
+    response = client.post(
+        "/check/bulk",
+        content=content,
+        headers={
+            "Content-Type": "application/json",
+            "Content-Encoding": encoding,
+            "Accept-Encoding": encoding,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == encoding
+    results = response.json()
+    assert [r["allowed"] for r in results] == [i % 10 == 0 for i in range(100)]
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_compressed_body_too_large(client: TestClient, encoding: str, monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.DECOMPRESSED_BODY_MAX_SIZE", 1024**2)
+    # a few KB expanding to 20 MB
+    body = b" " * 20 * 1024**2
+    if encoding == "gzip":
+        content = gzip.compress(body)
+    else:
+        content = zstandard.ZstdCompressor().compress(body)
+    assert len(content) < 64 * 1024
+
+    response = client.post(
+        "/check",
+        content=content,
+        headers={"Content-Type": "application/json", "Content-Encoding": encoding},
+    )
+
+    assert response.status_code == 413
+
+
+def test_small_response_not_compressed(client: TestClient):
+    response = client.post(
+        "/check", json=make_request(0), headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_unsupported_content_encoding(client: TestClient):
+    response = client.post(
+        "/check",
+        content=json.dumps(make_request(0)).encode(),
+        headers={"Content-Type": "application/json", "Content-Encoding": "br"},
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from eunomia_core import schemas
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from eunomia.server import EunomiaServer
+from eunomia.server.router import server_router_factory
+from eunomia.utils.batch_processor import BatchProcessor
+
+
+def make_message(i: int) -> dict:
+    return {
+        "id": f"check-{i}",
+        "request": {
+            "principal": {"uri": f"user-{i}"},
+            "resource": {"uri": "document"},
+            "action": "read",
+        },
+    }
+
+
+@pytest.fixture
+def client():
+    async def check(request: schemas.CheckRequest) -> schemas.CheckResponse:
+        if request.principal.uri == "invalid":
+            raise ValueError("Invalid principal")
+        i = int(request.principal.uri.split("-")[1])
+        # earlier checks complete later
+        await asyncio.sleep(0.01 * (5 - i))
+        return schemas.CheckResponse(allowed=i % 2 == 0)
+
+    server = MagicMock()
+    server.check = check
+    server._batch_processor = BatchProcessor(batch_size=10)
+    server.stream_check = lambda message: EunomiaServer.stream_check(server, message)
+    server.stream_bulk_check = lambda lines: EunomiaServer.stream_bulk_check(
+        server, lines
+    )
+
+    app = FastAPI()
+    app.include_router(server_router_factory(server))
+    return TestClient(app)
+
+
+def test_checks_pipelined_out_of_order(client: TestClient):
+    with client.websocket_connect("/check/stream") as websocket:
+        for i in range(5):
+            websocket.send_json(make_message(i))
+        messages = [websocket.receive_json() for _ in range(5)]
+
+    assert [m["id"] for m in messages] == [f"check-{i}" for i in reversed(range(5))]
+    for message in messages:
+        i = int(message["id"].split("-")[1])
+        assert message["response"]["allowed"] is (i % 2 == 0)
+        assert message["error"] is None
+
+
+def test_check_error_returned(client: TestClient):
+    with client.websocket_connect("/check/stream") as websocket:
+        message = make_message(0)
+        message["request"]["principal"]["uri"] = "invalid"
+        websocket.send_json(message)
+        message = websocket.receive_json()
+
+    assert message == {"id": "check-0", "response": None, "error": "Invalid principal"}
+
+
+def test_invalid_message(client: TestClient):
+    with client.websocket_connect("/check/stream") as websocket:
+        websocket.send_json({"id": "check-0", "request": {"action": "read"}})
+        message = websocket.receive_json()
+        assert message["id"] == "check-0"
+        assert message["error"] is not None
+
+        websocket.send_text("not json")
+        with pytest.raises(WebSocketDisconnect):
+            websocket.receive_json()
+
+
+def test_stream_bulk_check(client: TestClient):
+    lines = [json.dumps(make_message(i)["request"]) for i in range(5)]
+    lines.insert(2, "")
+    lines.insert(4, '{"action": "read"}')
+
+    response = client.post(
+        "/check/bulk/stream",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    messages = {m["id"]: m for m in map(json.loads, response.text.splitlines())}
+    assert sorted(messages, key=int) == [str(i) for i in range(6)]
+    assert messages["3"]["error"] is not None
+    for position, i in [("0", 0), ("1", 1), ("2", 2), ("4", 3), ("5", 4)]:
+        assert messages[position]["response"]["allowed"] is (i % 2 == 0)
+
+
+@pytest.mark.asyncio
+async def test_stream_bulk_check_bounded():
+    running, max_running, read = 0, 0, 0
+
+    async def check(request: schemas.CheckRequest) -> schemas.CheckResponse:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return schemas.CheckResponse(allowed=True)
+
+    async def lines():
+        nonlocal read
+        for i in range(100):
+            read += 1
+            yield json.dumps(make_message(i)["request"]).encode()
+
+    server = MagicMock()
+    server.check = check
+    server._batch_processor = BatchProcessor(batch_size=4)
+    server.stream_check = lambda message: EunomiaServer.stream_check(server, message)
+
+    results = EunomiaServer.stream_bulk_check(server, lines())
+    consumed = 0
+    async for result in results:
+        consumed += 1
+        # lines are read ahead of the consumed responses by a bounded amount
+        assert read - consumed <= 3 * 4 + 2
+    assert consumed == 100
+    assert max_running <= 4
@@ -0,0 +1,112 @@
+from unittest.mock import MagicMock
+
+import pytest
+from eunomia_core import enums, schemas
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from eunomia.server import EunomiaServer
+from eunomia.server.router import server_router_factory
+from eunomia.utils import tracing
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class StaticFetcher:
+    config = MagicMock(entity_type=None)
+
+    async def fetch_attributes(self, uri: str) -> dict:
+        return {"role": "admin"} if uri == "admin" else {}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+    monkeypatch.setattr("eunomia.config.settings.FETCHERS", {})
+    server = EunomiaServer()
+    server._fetchers = {"static": StaticFetcher()}
+    server.engine.add_policy(
+        schemas.Policy(
+            name="admins",
+            rules=[
+                schemas.Rule(
+                    name="allow-admins",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.role",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="admin",
+                        )
+                    ],
+                    actions=["read"],
+                )
+            ],
+        )
+    )
+
+    app = FastAPI()
+    app.include_router(server_router_factory(server))
+    app.add_middleware(tracing.TracingMiddleware)
+    return TestClient(app)
+
+
+def test_check_spans_continue_incoming_trace(client: TestClient, span_exporter):
+    response = client.post(
+        "/check",
+        json={
+            "principal": {"uri": "admin"},
+            "resource": {"uri": "document"},
+            "action": "read",
+        },
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+    )
+    assert response.status_code == 200
+    assert response.json()["allowed"]
+
+    spans = {span.name: span for span in span_exporter.get_finished_spans()}
+    assert {"POST /check", "eunomia.check", "eunomia.evaluate"} <= spans.keys()
+    assert {span.context.trace_id for span in spans.values()} == {int(TRACE_ID, 16)}
+
+    request_span = spans["POST /check"]
+    assert request_span.parent.span_id == int(PARENT_ID, 16)
+    assert request_span.attributes["http.route"] == "/check"
+    assert request_span.attributes["http.response.status_code"] == 200
+    assert spans["eunomia.check"].parent.span_id == request_span.context.span_id
+    assert spans["eunomia.evaluate"].attributes["eunomia.allowed"] is True
+
+    # one span for each fetch of the principal and the resource
+    fetches = [
+        span
+        for span in span_exporter.get_finished_spans()
+        if span.name == "eunomia.fetch_attributes"
+    ]
+    assert len(fetches) == 2
+    assert all(span.attributes["eunomia.fetcher"] == "static" for span in fetches)
+    assert all(
+        span.parent.span_id == spans["eunomia.check"].context.span_id
+        for span in fetches
+    )
+
+
+def test_sql_statements_spans(span_exporter):
+    engine = create_engine("sqlite:///:memory:")
+    tracing.instrument_engine(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            connection.execute(text("SELECT * FROM missing"))
+
+    spans = span_exporter.get_finished_spans()
+    assert [span.name for span in spans] == ["sqlite SELECT", "sqlite SELECT"]
+    assert spans[0].attributes["db.statement"] == "SELECT 1"
+    assert not spans[0].events
+    assert spans[1].events[0].name == "exception"
+
+
+def test_unsupported_exporter():
+    with pytest.raises(ValueError, match="Unsupported tracing exporter"):
+        tracing.configure_tracing("unknown")
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from eunomia_sdk.async_client import AsyncEunomiaClient
+from eunomia_sdk.client import EunomiaClient
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+class FilterableRetriever(BaseRetriever):
+    """In-memory retriever accepting a predicate as metadata filter."""
+
+    documents: list[Document]
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        filter=None,
+    ) -> list[Document]:
+        return [
+            doc.model_copy(deep=True)
+            for doc in self.documents
+            if query in doc.page_content and (filter is None or filter(doc))
+        ]
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+        filter=None,
+    ) -> list[Document]:
+        return self._get_relevant_documents(
+            query, run_manager=run_manager.get_sync(), filter=filter
+        )
+
+
+@pytest.fixture
+def documents():
+    """Create documents with metadata mirroring the resource attributes."""
+    return [
+        Document(
+            page_content="doc public",
+            metadata={"eunomia_uri": "doc-1", "visibility": "public", "level": 1},
+        ),
+        Document(
+            page_content="doc private",
+            metadata={"eunomia_uri": "doc-2", "visibility": "private", "level": 3},
+        ),
+        Document(
+            page_content="doc archived",
+            metadata={"eunomia_uri": "doc-3", "visibility": "archived", "level": 5},
+        ),
+    ]
+
+
+@pytest.fixture
+def filterable_retriever(documents):
+    """Create a retriever supporting metadata filters."""
+    return FilterableRetriever(documents=documents)
+
+
+@pytest.fixture
+def mock_eunomia_client():
+    """Create mock Eunomia client."""
+    return Mock(spec=EunomiaClient)
+
+
+@pytest.fixture
+def mock_async_eunomia_client():
+    """Create mock asynchronous Eunomia client."""
+    return AsyncMock(spec=AsyncEunomiaClient)
+
+
+@pytest.fixture
+def patch_clients(mock_eunomia_client, mock_async_eunomia_client):
+    """Patch the Eunomia clients created by the given module."""
+
+    @contextmanager
+    def patch_clients(module: str):
+        sync_patch = patch(f"{module}.EunomiaClient", return_value=mock_eunomia_client)
+        async_patch = patch(
+            f"{module}.AsyncEunomiaClient", return_value=mock_async_eunomia_client
+        )
+        with sync_patch, async_patch:
+            yield
+
+    return patch_clients
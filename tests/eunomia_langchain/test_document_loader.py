@@ -0,0 +1,167 @@
+import pytest
+from eunomia_core import schemas
+from eunomia_langchain.document_loader import EunomiaLoader
+from langchain_core.document_loaders.base import BaseLoader
+from langchain_core.documents import Document
+
+
+class ListLoader(BaseLoader):
+    """Loader yielding a fixed number of documents."""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    def lazy_load(self):
+        for i in range(self.count):
+            yield Document(page_content=f"doc {i}", metadata={"index": i})
+
+
+def register_entities(entities):
+    return [
+        schemas.EntityInDb(
+            uri=f"uri-{entity.attributes[0].value}",
+            type=entity.type,
+            attributes=[
+                {
+                    **a.model_dump(),
+                    "updated_at": "2025-01-01T00:00:00",
+                    "registered_at": "2025-01-01T00:00:00",
+                }
+                for a in entity.attributes
+            ],
+            registered_at="2025-01-01T00:00:00",
+        )
+        for entity in entities
+    ]
+
+
+@pytest.fixture
+def loader(mock_eunomia_client, mock_async_eunomia_client, patch_clients):
+    mock_eunomia_client.register_entities.side_effect = register_entities
+    mock_async_eunomia_client.register_entities.side_effect = register_entities
+    with patch_clients("eunomia_langchain.document_loader"):
+        return EunomiaLoader(ListLoader(7), batch_size=3, max_concurrency=2)
+
+
+def assert_registered(docs, mock_eunomia_client):
+    assert [doc.metadata["eunomia_uri"] for doc in docs] == [
+        f"uri-{i}" for i in range(7)
+    ]
+    assert all(doc.metadata["group"] == "financials" for doc in docs)
+    batches = [c.args[0] for c in mock_eunomia_client.register_entities.call_args_list]
+    assert sorted(len(batch) for batch in batches) == [1, 3, 3]
+    mock_eunomia_client.register_entity.assert_not_called()
+
+
+class TestEunomiaLoader:
+    """Test the batched registration of the loaded documents."""
+
+    def test_load(self, loader, mock_eunomia_client):
+        docs = loader.load(additional_metadata={"group": "financials"})
+        assert_registered(docs, mock_eunomia_client)
+
+    def test_lazy_load(self, loader, mock_eunomia_client):
+        docs = list(loader.lazy_load(additional_metadata={"group": "financials"}))
+        assert_registered(docs, mock_eunomia_client)
+
+    @pytest.mark.asyncio
+    async def test_aload(self, loader, mock_async_eunomia_client):
+        docs = await loader.aload(additional_metadata={"group": "financials"})
+        assert_registered(docs, mock_async_eunomia_client)
+
+    @pytest.mark.asyncio
+    async def test_alazy_load(self, loader, mock_async_eunomia_client):
+        docs = [
+            doc
+            async for doc in loader.alazy_load(
+                additional_metadata={"group": "financials"}
+            )
+        ]
+        assert_registered(docs, mock_async_eunomia_client)
+
+    def test_registration_error(self, loader, mock_eunomia_client):
+        mock_eunomia_client.register_entities.side_effect = RuntimeError("failed")
+
+        with pytest.raises(RuntimeError, match="failed"):
+            list(loader.lazy_load())
+
+
+class TestEunomiaLoaderIdempotent:
+    """Test the idempotent registration of the loaded documents."""
+
+    @pytest.fixture
+    def make_loader(self, patch_clients):
+        def make_loader(documents, **kwargs):
+            class Loader(BaseLoader):
+                def lazy_load(self):
+                    for doc in documents:
+                        yield doc.model_copy(deep=True)
+
+            with patch_clients("eunomia_langchain.document_loader"):
+                return EunomiaLoader(Loader(), idempotent=True, **kwargs)
+
+        return make_loader
+
+    def test_stable_uris(self, make_loader, mock_eunomia_client):
+        documents = [
+            Document(page_content="a", metadata={"source": "x.txt"}),
+            Document(page_content="b", metadata={"source": "x.txt"}),
+        ]
+
+        first = make_loader(documents).load()
+        second = make_loader(documents).load()
+
+        uris = [doc.metadata["eunomia_uri"] for doc in first]
+        assert len(set(uris)) == 2
+        assert [doc.metadata["eunomia_uri"] for doc in second] == uris
+        # without a manifest, the server is in charge of skipping unchanged entities
+        assert mock_eunomia_client.upsert_entities.call_count == 2
+        mock_eunomia_client.register_entities.assert_not_called()
+        entities = mock_eunomia_client.upsert_entities.call_args.args[0]
+        assert [e.uri for e in entities] == uris
+        assert entities[0].attributes == [
+            schemas.Attribute(key="source", value="x.txt")
+        ]
+
+    def test_manifest_skips_unchanged(self, make_loader, mock_eunomia_client, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        documents = [
+            Document(page_content="a", metadata={"source": "x.txt", "group": "hr"}),
+            Document(page_content="b", metadata={"source": "y.txt", "group": "hr"}),
+        ]
+
+        make_loader(documents, manifest_path=manifest_path).load()
+        assert manifest_path.exists()
+        assert mock_eunomia_client.upsert_entities.call_count == 1
+
+        # nothing changed: no request is sent
+        docs = list(make_loader(documents, manifest_path=manifest_path).lazy_load())
+        assert all("eunomia_uri" in doc.metadata for doc in docs)
+        assert mock_eunomia_client.upsert_entities.call_count == 1
+
+        # only the changed document is upserted
+        documents[1].metadata["group"] = "it"
+        make_loader(documents, manifest_path=manifest_path).load()
+        assert mock_eunomia_client.upsert_entities.call_count == 2
+        entities = mock_eunomia_client.upsert_entities.call_args.args[0]
+        assert [e.uri for e in entities] == [docs[1].metadata["eunomia_uri"]]
+        assert schemas.Attribute(key="group", value="it") in entities[0].attributes
+
+    @pytest.mark.asyncio
+    async def test_aload_manifest(
+        self, make_loader, mock_async_eunomia_client, tmp_path
+    ):
+        manifest_path = tmp_path / "manifest.json"
+        documents = [Document(page_content="a", metadata={"source": "x.txt"})]
+
+        await make_loader(documents, manifest_path=manifest_path).aload()
+        await make_loader(documents, manifest_path=manifest_path).aload()
+
+        assert mock_async_eunomia_client.upsert_entities.await_count == 1
+
+    def test_manifest_requires_idempotent(self, patch_clients, tmp_path):
+        with (
+            patch_clients("eunomia_langchain.document_loader"),
+            pytest.raises(ValueError, match="only be used with idempotent"),
+        ):
+            EunomiaLoader(ListLoader(1), manifest_path=tmp_path / "manifest.json")
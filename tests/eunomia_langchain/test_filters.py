@@ -0,0 +1,260 @@
+import pytest
+from eunomia_core import enums, schemas
+from eunomia_langchain.filters import (
+    CallableFilterTranslator,
+    DictFilterTranslator,
+    residual_to_filter,
+)
+from langchain_core.documents import Document
+
+from eunomia.engine.evaluator import evaluate_residual
+
+
+def condition(path, operator, value):
+    return schemas.Condition(path=path, operator=operator, value=value)
+
+
+def residual(name, conditions=None, unless=None):
+    return schemas.ResidualRule(
+        policy_name="p",
+        rule_name=name,
+        conditions=conditions or [],
+        unless=unless or [],
+    )
+
+
+PUBLIC = condition("attributes.visibility", enums.ConditionOperator.EQUALS, "public")
+HIGH_LEVEL = condition("attributes.level", enums.ConditionOperator.LESS, 2)
+OWNED = condition("uri", enums.ConditionOperator.IN, ["doc-1", "doc-3"])
+NOT_DRAFT = condition("attributes.title", enums.ConditionOperator.NOT_CONTAINS, "draft")
+
+
+def test_residual_to_filter_dict():
+    partial = schemas.PartialCheckResponse(
+        allow_if=[residual("a", [PUBLIC]), residual("b", [HIGH_LEVEL, OWNED])],
+        deny_if=[residual("c", [HIGH_LEVEL], unless=[[PUBLIC]])],
+    )
+    assert residual_to_filter(partial).accept(DictFilterTranslator()) == {
+        "$and": [
+            {
+                "$or": [
+                    {"visibility": {"$eq": "public"}},
+                    {
+                        "$and": [
+                            {"level": {"$gt": 2}},
+                            {"eunomia_uri": {"$in": ["doc-1", "doc-3"]}},
+                        ]
+                    },
+                ]
+            },
+            {"$or": [{"level": {"$lte": 2}}, {"visibility": {"$eq": "public"}}]},
+        ]
+    }
+
+
+def test_residual_to_filter_unconditional():
+    # everything is allowed
+    partial = schemas.PartialCheckResponse(allow_if=[residual("a")])
+    assert residual_to_filter(partial) is None
+
+    # only the denying rules remain
+    partial = schemas.PartialCheckResponse(
+        allow_if=[residual("a"), residual("b", [PUBLIC])],
+        deny_if=[residual("c", [PUBLIC])],
+    )
+    assert residual_to_filter(partial).accept(DictFilterTranslator()) == {
+        "visibility": {"$ne": "public"}
+    }
+
+
+def test_residual_to_filter_invalid():
+    with pytest.raises(ValueError, match="No document can be allowed"):
+        residual_to_filter(schemas.PartialCheckResponse())
+
+    with pytest.raises(ValueError, match="cannot be used as a filter"):
+        residual_to_filter(
+            schemas.PartialCheckResponse(
+                allow_if=[
+                    residual(
+                        "a",
+                        [
+                            condition(
+                                "attributes.name",
+                                enums.ConditionOperator.STARTS_WITH,
+                                "doc",
+                            )
+                        ],
+                    )
+                ]
+            )
+        )
+
+    with pytest.raises(ValueError, match="cannot be used as a filter"):
+        residual_to_filter(
+            schemas.PartialCheckResponse(
+                allow_if=[
+                    residual(
+                        "a",
+                        [
+                            condition(
+                                "attributes.owner.name",
+                                enums.ConditionOperator.EQUALS,
+                                "x",
+                            )
+                        ],
+                    )
+                ]
+            )
+        )
+
+    # the translator rejects the operators it does not support
+    partial = schemas.PartialCheckResponse(allow_if=[residual("a", [NOT_DRAFT])])
+    with pytest.raises(ValueError):
+        residual_to_filter(partial).accept(DictFilterTranslator())
+
+
+@pytest.mark.parametrize(
+    "partial",
+    [
+        schemas.PartialCheckResponse(allow_if=[residual("a", [PUBLIC])]),
+        schemas.PartialCheckResponse(
+            allow_if=[residual("a", [PUBLIC]), residual("b", [HIGH_LEVEL, OWNED])],
+            deny_if=[residual("c", [OWNED], unless=[[PUBLIC], [HIGH_LEVEL]])],
+        ),
+        schemas.PartialCheckResponse(
+            allow_if=[residual("a")],
+            deny_if=[residual("b", [PUBLIC, NOT_DRAFT]), residual("c", [HIGH_LEVEL])],
+        ),
+        schemas.PartialCheckResponse(
+            allow_if=[residual("a", [NOT_DRAFT])],
+            deny_if=[residual("b", unless=[[PUBLIC, OWNED]])],
+        ),
+    ],
+)
+def test_residual_to_filter_consistency(partial):
+    predicate = residual_to_filter(partial).accept(CallableFilterTranslator())
+
+    for uri in ["doc-1", "doc-2", "doc-3"]:
+        for visibility in ["public", "private"]:
+            for level in [1, 2, 3]:
+                for title in ["draft report", "report", 3, None]:
+                    attributes = {"visibility": visibility, "level": level}
+                    if title is not None:
+                        attributes["title"] = title
+                    doc = Document(
+                        page_content="", metadata={"eunomia_uri": uri, **attributes}
+                    )
+                    resource = schemas.ResourceCheck(uri=uri, attributes=attributes)
+                    assert predicate(doc) is evaluate_residual(partial, resource)
+
+
+def test_residual_to_filter_not_contains_missing_key():
+    partial = schemas.PartialCheckResponse(
+        allow_if=[
+            residual(
+                "a",
+                [
+                    condition(
+                        "attributes.tags",
+                        enums.ConditionOperator.NOT_CONTAINS,
+                        "secret",
+                    )
+                ],
+            )
+        ]
+    )
+    predicate = residual_to_filter(partial).accept(CallableFilterTranslator())
+
+    for metadata, allowed in [({"tags": "public"}, True), ({}, False)]:
+        doc = Document(page_content="", metadata=metadata)
+        resource = schemas.ResourceCheck(uri="doc", attributes=metadata or {"a": 1})
+        assert predicate(doc) is allowed
+        assert evaluate_residual(partial, resource) is allowed
+
+    with pytest.raises(ValueError, match="non-string value"):
+        residual_to_filter(
+            schemas.PartialCheckResponse(
+                allow_if=[
+                    residual(
+                        "a",
+                        [
+                            condition(
+                                "attributes.tags",
+                                enums.ConditionOperator.NOT_CONTAINS,
+                                1,
+                            )
+                        ],
+                    )
+                ]
+            )
+        )
+
+
+NOT_SECRET = condition(
+    "attributes.classification", enums.ConditionOperator.NOT_EQUALS, "secret"
+)
+NOT_ARCHIVED = condition(
+    "attributes.status", enums.ConditionOperator.NOT_IN, ["archived", "deleted"]
+)
+
+
+def test_residual_to_filter_negated_operators_missing_key():
+    partial = schemas.PartialCheckResponse(
+        allow_if=[residual("a", [NOT_SECRET])],
+        deny_if=[residual("b", [HIGH_LEVEL], unless=[[NOT_ARCHIVED]])],
+    )
+    assert residual_to_filter(partial).accept(DictFilterTranslator()) == {
+        "$and": [
+            {
+                "$and": [
+                    {"classification": {"$exists": True}},
+                    {"classification": {"$ne": "secret"}},
+                ]
+            },
+            {
+                "$or": [
+                    {"level": {"$lte": 2}},
+                    {
+                        "$and": [
+                            {"status": {"$exists": True}},
+                            {"status": {"$nin": ["archived", "deleted"]}},
+                        ]
+                    },
+                ]
+            },
+        ]
+    }
+
+    predicate = residual_to_filter(partial).accept(CallableFilterTranslator())
+    for classification in ["public", "secret", None]:
+        for status in ["draft", "archived", None]:
+            for level in [1, 3]:
+                attributes = {"level": level}
+                if classification is not None:
+                    attributes["classification"] = classification
+                if status is not None:
+                    attributes["status"] = status
+                doc = Document(page_content="", metadata=attributes)
+                resource = schemas.ResourceCheck(uri="doc", attributes=attributes)
+                assert predicate(doc) is evaluate_residual(partial, resource)
+
+    # a denying rule with the negated operators does not apply to missing keys
+    partial = schemas.PartialCheckResponse(
+        allow_if=[residual("a")], deny_if=[residual("b", [NOT_SECRET])]
+    )
+    assert residual_to_filter(partial).accept(DictFilterTranslator()) == {
+        "$or": [
+            {"classification": {"$exists": False}},
+            {"classification": {"$eq": "secret"}},
+        ]
+    }
+    predicate = residual_to_filter(partial).accept(CallableFilterTranslator())
+    for metadata, allowed in [
+        ({"classification": "public"}, False),
+        ({"classification": "secret"}, True),
+        ({}, True),
+    ]:
+        doc = Document(page_content="", metadata=metadata)
+        resource = schemas.ResourceCheck(uri="doc", attributes=metadata or {"a": 1})
+        assert predicate(doc) is allowed
+        assert evaluate_residual(partial, resource) is allowed
@@ -0,0 +1,165 @@
+import pytest
+from eunomia_core import enums, schemas
+from eunomia_langchain.filters import CallableFilterTranslator
+from eunomia_langchain.retriever import EunomiaRetriever
+from langchain_core.retrievers import BaseRetriever
+
+
+def residual(name, conditions=None):
+    return schemas.ResidualRule(
+        policy_name="p", rule_name=name, conditions=conditions or []
+    )
+
+
+def equals(path, value):
+    return schemas.Condition(
+        path=path, operator=enums.ConditionOperator.EQUALS, value=value
+    )
+
+
+def allow_uris(*uris):
+    def check_resources(resources, **kwargs):
+        return [
+            schemas.CheckResponse(allowed=resource.uri in uris)
+            for resource in resources
+        ]
+
+    return check_resources
+
+
+@pytest.fixture
+def checking_retriever(filterable_retriever, patch_clients):
+    with patch_clients("eunomia_langchain.retriever"):
+        return EunomiaRetriever(
+            retriever=filterable_retriever,
+            principal=schemas.PrincipalCheck(uri="user-1"),
+            bulk_size=2,
+        )
+
+
+@pytest.fixture
+def pushdown_retriever(filterable_retriever, patch_clients):
+    with patch_clients("eunomia_langchain.retriever"):
+        return EunomiaRetriever(
+            retriever=filterable_retriever,
+            principal=schemas.PrincipalCheck(uri="user-1"),
+            filter_translator=CallableFilterTranslator(),
+        )
+
+
+class TestEunomiaRetrieverChecks:
+    """Test the checks of the retrieved documents."""
+
+    def test_checks(self, checking_retriever, mock_eunomia_client, documents):
+        mock_eunomia_client.check_resources.side_effect = allow_uris("doc-1", "doc-3")
+
+        docs = checking_retriever.invoke("doc")
+
+        assert [doc.metadata["eunomia_uri"] for doc in docs] == ["doc-1", "doc-3"]
+        mock_eunomia_client.check_resources.assert_called_once()
+        call = mock_eunomia_client.check_resources.call_args
+        assert call.kwargs["principal_uri"] == "user-1"
+        resource = next(r for r in call.args[0] if r.uri == "doc-2")
+        assert resource.attributes == {"visibility": "private", "level": 3}
+        # the metadata of the documents is not mutated
+        assert all("eunomia_uri" in doc.metadata for doc in documents)
+
+    def test_no_documents(self, checking_retriever, mock_eunomia_client):
+        assert checking_retriever.invoke("missing") == []
+        mock_eunomia_client.check_resources.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_checks_async(
+        self, checking_retriever, mock_eunomia_client, mock_async_eunomia_client
+    ):
+        mock_async_eunomia_client.check_resources.side_effect = allow_uris(
+            "doc-2", "doc-3"
+        )
+
+        docs = await checking_retriever.ainvoke("doc")
+
+        assert [doc.metadata["eunomia_uri"] for doc in docs] == ["doc-2", "doc-3"]
+        mock_async_eunomia_client.check_resources.assert_awaited_once()
+        mock_eunomia_client.check_resources.assert_not_called()
+
+
+class TestEunomiaRetrieverPushdown:
+    """Test the policies pushdown as metadata filter."""
+
+    def test_filter_pushed_down(self, pushdown_retriever, mock_eunomia_client):
+        mock_eunomia_client.partial_check.return_value = schemas.PartialCheckResponse(
+            allow_if=[residual("a", [equals("attributes.visibility", "public")])]
+        )
+
+        docs = pushdown_retriever.invoke("doc")
+
+        assert [doc.metadata["eunomia_uri"] for doc in docs] == ["doc-1"]
+        mock_eunomia_client.partial_check.assert_called_once_with(
+            principal_uri="user-1", principal_attributes={}
+        )
+        mock_eunomia_client.check.assert_not_called()
+
+    def test_everything_allowed(self, pushdown_retriever, mock_eunomia_client):
+        mock_eunomia_client.partial_check.return_value = schemas.PartialCheckResponse(
+            allow_if=[residual("a")]
+        )
+
+        docs = pushdown_retriever.invoke("doc")
+
+        assert len(docs) == 3
+        mock_eunomia_client.check.assert_not_called()
+
+    def test_nothing_allowed(self, pushdown_retriever, mock_eunomia_client):
+        mock_eunomia_client.partial_check.return_value = schemas.PartialCheckResponse()
+
+        assert pushdown_retriever.invoke("doc") == []
+        mock_eunomia_client.check.assert_not_called()
+
+    def test_fallback_to_checks(self, pushdown_retriever, mock_eunomia_client):
+        mock_eunomia_client.partial_check.return_value = schemas.PartialCheckResponse(
+            allow_if=[
+                residual(
+                    "a",
+                    [
+                        schemas.Condition(
+                            path="attributes.visibility",
+                            operator=enums.ConditionOperator.STARTS_WITH,
+                            value="pub",
+                        )
+                    ],
+                )
+            ]
+        )
+        mock_eunomia_client.check_resources.side_effect = allow_uris("doc-2")
+
+        docs = pushdown_retriever.invoke("doc")
+
+        assert [doc.page_content for doc in docs] == ["doc private"]
+        mock_eunomia_client.check_resources.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_filter_pushed_down_async(
+        self, pushdown_retriever, mock_async_eunomia_client
+    ):
+        mock_async_eunomia_client.partial_check.return_value = (
+            schemas.PartialCheckResponse(
+                allow_if=[residual("a", [equals("uri", "doc-3")])]
+            )
+        )
+
+        docs = await pushdown_retriever.ainvoke("doc")
+
+        assert [doc.metadata["eunomia_uri"] for doc in docs] == ["doc-3"]
+        mock_async_eunomia_client.check_resources.assert_not_called()
+
+    def test_retriever_without_filter(self):
+        class Retriever(BaseRetriever):
+            def _get_relevant_documents(self, query, *, run_manager):
+                return []
+
+        with pytest.raises(ValueError, match="does not accept a filter"):
+            EunomiaRetriever(
+                retriever=Retriever(),
+                principal=schemas.PrincipalCheck(uri="user-1"),
+                filter_translator=CallableFilterTranslator(),
+            )
@@ -4,6 +4,7 @@ import pytest
 from eunomia_core.schemas import CheckResponse
 from eunomia_mcp.bridge import EunomiaMode
 from eunomia_mcp.middleware import EunomiaMcpMiddleware
+from eunomia_sdk import EunomiaClient
 from fastmcp.exceptions import ToolError
 from fastmcp.prompts.prompt import Prompt
 from fastmcp.resources.resource import Resource
@@ -20,10 +21,10 @@ class TestEunomiaMcpMiddleware:
     def mock_eunomia_client(self):
         """Mock Eunomia client."""
         client = Mock()
-        client.check = Mock(
+        client.check = AsyncMock(
             return_value=CheckResponse(allowed=True, reason="Authorized")
         )
-        client.bulk_check = Mock(
+        client.check_resources = AsyncMock(
             return_value=[CheckResponse(allowed=True, reason="Authorized")]
         )
         return client
@@ -163,6 +164,36 @@ class TestEunomiaMcpMiddleware:
 
         middleware._eunomia._client.check.assert_called_once()
 
+    @patch("eunomia_mcp.middleware.get_http_headers")
+    @pytest.mark.asyncio
+    async def test_authorize_execution_sync_client(
+        self, mock_get_headers, mock_context, mock_tool
+    ):
+        """Test authorization with a synchronous Eunomia client."""
+        mock_get_headers.return_value = {"x-agent-id": "test-agent"}
+        client = Mock(spec=EunomiaClient)
+        client.check.return_value = CheckResponse(allowed=True, reason="Authorized")
+        middleware = EunomiaMcpMiddleware(
+            mode=EunomiaMode.CLIENT, eunomia_client=client
+        )
+
+        await middleware._authorize_execution(mock_context, mock_tool)
+
+        client.check.assert_called_once()
+
+    @patch("eunomia_mcp.middleware.get_http_headers")
+    @pytest.mark.asyncio
+    async def test_authorize_execution_span(
+        self, mock_get_headers, middleware, mock_context, mock_tool, span_exporter
+    ):
+        """Test the recording of the authorization latency as a span."""
+        mock_get_headers.return_value = {"x-agent-id": "test-agent"}
+
+        await middleware._authorize_execution(mock_context, mock_tool)
+
+        spans = span_exporter.get_finished_spans()
+        assert [span.name for span in spans] == ["eunomia_mcp.authorize_execution"]
+
     @patch("eunomia_mcp.middleware.get_http_headers")
     @pytest.mark.asyncio
     async def test_authorize_execution_failure(
@@ -207,7 +238,7 @@ class TestEunomiaMcpMiddleware:
 
         components = [tool1, tool2]
 
-        middleware._eunomia._client.bulk_check.return_value = [
+        middleware._eunomia._client.check_resources.return_value = [
             CheckResponse(allowed=True, reason="Authorized"),
             CheckResponse(allowed=True, reason="Authorized"),
         ]
@@ -216,7 +247,11 @@ class TestEunomiaMcpMiddleware:
 
         assert len(result) == 2
         assert result == components
-        middleware._eunomia._client.bulk_check.assert_called_once()
+        middleware._eunomia._client.check_resources.assert_called_once()
+        call = middleware._eunomia._client.check_resources.call_args
+        assert [r.uri for r in call.args[0]] == ["mcp:tools:tool1", "mcp:tools:tool2"]
+        assert call.kwargs["principal_uri"] == "agent:test-agent"
+        assert call.kwargs["action"] == "list"
 
     @patch("eunomia_mcp.middleware.get_http_headers")
     @pytest.mark.asyncio
@@ -238,7 +273,7 @@ class TestEunomiaMcpMiddleware:
 
         components = [tool1, tool2]
 
-        middleware._eunomia._client.bulk_check.return_value = [
+        middleware._eunomia._client.check_resources.return_value = [
             CheckResponse(allowed=True, reason="Authorized"),
             CheckResponse(allowed=False, reason="Access denied"),
         ]
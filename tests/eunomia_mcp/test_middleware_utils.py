@@ -327,7 +327,7 @@ class TestGetExternalCallerDirectory:
 class TestCreateEunomiaMiddleware:
     """Test suite for create_eunomia_middleware function."""
 
-    @patch("eunomia_mcp.utils.EunomiaClient")
+    @patch("eunomia_mcp.utils.AsyncEunomiaClient")
     def test_create_middleware_remote_mode(self, mock_client_class):
         """Test creating middleware in remote (CLIENT) mode."""
         mock_client_instance = Mock()
@@ -397,7 +397,7 @@ class TestCreateEunomiaMiddleware:
         assert isinstance(result, EunomiaMcpMiddleware)
         mock_load_policy.assert_called_once_with("mcp_policies.json")
 
-    @patch("eunomia_mcp.utils.EunomiaClient")
+    @patch("eunomia_mcp.utils.AsyncEunomiaClient")
     def test_create_middleware_remote_default_endpoint(self, mock_client_class):
         """Test creating middleware with remote mode and default endpoint."""
         mock_client_instance = Mock()
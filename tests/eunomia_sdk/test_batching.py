@@ -0,0 +1,187 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from eunomia_core import schemas
+from eunomia_sdk.batching import AsyncCheckBatcher, CheckBatcher
+
+
+def make_request(i: int) -> schemas.CheckRequest:
+    return schemas.CheckRequest(
+        principal=schemas.PrincipalCheck(uri=f"user-{i}"),
+        resource=schemas.ResourceCheck(uri="doc"),
+    )
+
+
+def answer_or_fail(
+    requests: list[schemas.CheckRequest],
+) -> list[schemas.CheckResponse]:
+    # like the server, a single unresolvable request rejects the whole bulk check
+    if any(r.principal.uri == "user-3" for r in requests):
+        raise httpx.HTTPStatusError(
+            "user-3 not found",
+            request=httpx.Request("POST", "http://test/check/bulk"),
+            response=httpx.Response(400),
+        )
+    return answer(requests)
+
+
+def answer(requests: list[schemas.CheckRequest]) -> list[schemas.CheckResponse]:
+    return [
+        schemas.CheckResponse(allowed=int(r.principal.uri.split("-")[1]) % 2 == 0)
+        for r in requests
+    ]
+
+
+class TestCheckBatcher:
+    """Test the coalescing of checks issued by concurrent threads."""
+
+    def test_results_fanned_out(self):
+        batches = []
+        lock = threading.Lock()
+
+        def bulk_check(requests):
+            with lock:
+                batches.append(len(requests))
+            return answer(requests)
+
+        batcher = CheckBatcher(bulk_check, max_size=10, max_delay=0.05)
+        with ThreadPoolExecutor(max_workers=25) as executor:
+            results = list(executor.map(batcher.submit, map(make_request, range(25))))
+
+        assert [r.allowed for r in results] == [i % 2 == 0 for i in range(25)]
+        assert sum(batches) == 25
+        assert max(batches) <= 10
+        assert len(batches) < 25
+
+    def test_error_propagated(self):
+        calls = []
+
+        def bulk_check(requests):
+            calls.append(len(requests))
+            raise RuntimeError("server unavailable")
+
+        batcher = CheckBatcher(bulk_check, max_size=10, max_delay=0.05)
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            futures = [
+                executor.submit(batcher.submit, make_request(i)) for i in range(10)
+            ]
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="server unavailable"):
+                future.result()
+        # the whole batch fails without retrying its requests
+        assert len(calls) < 10
+
+    def test_failed_item_isolated(self):
+        calls = []
+
+        def bulk_check(requests):
+            calls.append(len(requests))
+            return answer_or_fail(requests)
+
+        batcher = CheckBatcher(bulk_check, max_size=16, max_delay=0.05)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = [
+                executor.submit(batcher.submit, make_request(i)) for i in range(16)
+            ]
+
+        for i, future in enumerate(futures):
+            if i == 3:
+                with pytest.raises(httpx.HTTPStatusError, match="user-3 not found"):
+                    future.result()
+            else:
+                assert future.result().allowed is (i % 2 == 0)
+        # the rejected batches are split in halves
+        if calls[0] == 16:
+            assert calls == [16, 8, 4, 2, 1, 1, 2, 4, 8]
+
+    def test_close(self):
+        batcher = CheckBatcher(answer, max_size=10, max_delay=10)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(batcher.submit, make_request(2))
+            while batcher._queue.empty():
+                pass
+            # the pending requests are sent without waiting for the delay
+            batcher.close()
+            assert future.result(timeout=1).allowed
+
+        assert not batcher._worker.is_alive()
+        with pytest.raises(RuntimeError, match="closed"):
+            batcher.submit(make_request(0))
+
+
+class TestAsyncCheckBatcher:
+    """Test the coalescing of checks issued by concurrent tasks."""
+
+    @pytest.mark.asyncio
+    async def test_results_fanned_out(self):
+        batches = []
+
+        async def bulk_check(requests):
+            batches.append(len(requests))
+            return answer(requests)
+
+        batcher = AsyncCheckBatcher(bulk_check, max_size=10, max_delay=0.01)
+        results = await asyncio.gather(
+            *[batcher.submit(make_request(i)) for i in range(25)]
+        )
+
+        assert [r.allowed for r in results] == [i % 2 == 0 for i in range(25)]
+        # two full batches sent immediately, the rest after the delay
+        assert batches == [10, 10, 5]
+
+    @pytest.mark.asyncio
+    async def test_single_check_waits_for_delay(self):
+        async def bulk_check(requests):
+            return answer(requests)
+
+        batcher = AsyncCheckBatcher(bulk_check, max_size=10, max_delay=0.01)
+        result = await asyncio.wait_for(batcher.submit(make_request(2)), timeout=1)
+
+        assert result.allowed
+
+    @pytest.mark.asyncio
+    async def test_error_propagated(self):
+        async def bulk_check(requests):
+            raise RuntimeError("server unavailable")
+
+        batcher = AsyncCheckBatcher(bulk_check, max_size=2, max_delay=0.01)
+        results = await asyncio.gather(
+            *[batcher.submit(make_request(i)) for i in range(3)],
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_failed_item_isolated(self):
+        async def bulk_check(requests):
+            return answer_or_fail(requests)
+
+        batcher = AsyncCheckBatcher(bulk_check, max_size=10, max_delay=0.01)
+        results = await asyncio.gather(
+            *[batcher.submit(make_request(i)) for i in range(10)],
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[3], httpx.HTTPStatusError)
+        assert [r.allowed for i, r in enumerate(results) if i != 3] == [
+            i % 2 == 0 for i in range(10) if i != 3
+        ]
+
+    @pytest.mark.asyncio
+    async def test_aclose(self):
+        async def bulk_check(requests):
+            return answer(requests)
+
+        batcher = AsyncCheckBatcher(bulk_check, max_size=10, max_delay=10)
+        task = asyncio.create_task(batcher.submit(make_request(2)))
+        await asyncio.sleep(0)
+        # the pending requests are sent without waiting for the delay
+        await batcher.aclose()
+
+        assert task.done()
+        assert task.result().allowed
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+
+import httpx
+from eunomia_core import schemas
+from eunomia_sdk import EunomiaClient
+from eunomia_sdk.cache import DecisionCache
+
+
+def make_request(uri: str, attributes: dict | None = None) -> schemas.CheckRequest:
+    return schemas.CheckRequest(
+        principal=schemas.PrincipalCheck(uri=uri, attributes=attributes or {}),
+        resource=schemas.ResourceCheck(uri="doc"),
+    )
+
+
+class TestDecisionCache:
+    """Test the caching of check decisions."""
+
+    def test_key_is_canonical(self):
+        first = make_request("user", {"role": "admin", "team": "a"})
+        second = make_request("user", {"team": "a", "role": "admin"})
+
+        assert DecisionCache.key(first) == DecisionCache.key(second)
+        assert DecisionCache.key(first) != DecisionCache.key(make_request("other"))
+
+    def test_ttl_expiry(self):
+        cache = DecisionCache(ttl=0.01, max_size=10)
+        cache.set("key", schemas.CheckResponse(allowed=True), cache.generation)
+        assert cache.get("key").allowed is True
+
+        time.sleep(0.02)
+        assert cache.get("key") is None
+
+    def test_lru_eviction(self):
+        cache = DecisionCache(ttl=60, max_size=2)
+        for key in ["a", "b"]:
+            cache.set(key, schemas.CheckResponse(allowed=True), cache.generation)
+        cache.get("a")
+        cache.set("c", schemas.CheckResponse(allowed=True), cache.generation)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_stale_generation_not_stored(self):
+        cache = DecisionCache(ttl=60, max_size=10)
+        generation = cache.generation
+        cache.clear()
+        cache.set("key", schemas.CheckResponse(allowed=True), generation)
+
+        assert cache.get("key") is None
+
+
+class TestClientCache:
+    """Test the decision cache of the client, invalidated by the server revision."""
+
+    def test_repeated_checks_served_locally(self):
+        state = {"revision": 1, "checks": 0}
+        lock = threading.Lock()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/check/revision":
+                if request.url.params.get("after") == str(state["revision"]):
+                    time.sleep(0.01)
+                return httpx.Response(200, json=state["revision"])
+
+            with lock:
+                state["checks"] += 1
+            body = json.loads(request.content)
+            return httpx.Response(
+                200, json={"allowed": body["principal"]["uri"] == "admin"}
+            )
+
+        client = EunomiaClient(cache_ttl=60)
+        client.client = httpx.Client(
+            base_url="http://test", transport=httpx.MockTransport(handler)
+        )
+
+        # the first check starts the watcher, wait for it to sync the initial revision
+        client.check(principal_uri="warmup", resource_uri="doc")
+        time.sleep(0.05)
+        state["checks"] = 0
+
+        for _ in range(5):
+            assert client.check(principal_uri="admin", resource_uri="doc").allowed
+        assert not client.check(principal_uri="user", resource_uri="doc").allowed
+        assert state["checks"] == 2
+
+        state["revision"] = 2
+        deadline = time.monotonic() + 1
+        while len(client._cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert client.check(principal_uri="admin", resource_uri="doc").allowed
+        assert state["checks"] == 3
+
+    def test_close_stops_watcher(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/check/revision":
+                time.sleep(0.01)
+                return httpx.Response(200, json=1)
+            return httpx.Response(200, json={"allowed": True})
+
+        with EunomiaClient(cache_ttl=60) as client:
+            client.client = httpx.Client(
+                base_url="http://test", transport=httpx.MockTransport(handler)
+            )
+            assert client.check(principal_uri="admin", resource_uri="doc").allowed
+
+        client._watcher.join(timeout=1)
+        assert not client._watcher.is_alive()
+
+    def test_watcher_error_disables_cache(self, caplog):
+        checks = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/check/revision":
+                return httpx.Response(200, content=b"not a revision")
+            checks.append(request)
+            return httpx.Response(200, json={"allowed": True})
+
+        client = EunomiaClient(cache_ttl=60)
+        client.client = httpx.Client(
+            base_url="http://test", transport=httpx.MockTransport(handler)
+        )
+        client.check(principal_uri="admin", resource_uri="doc")
+        client._watcher.join(timeout=1)
+
+        assert client._cache is None
+        assert "Revision watcher stopped" in caplog.text
+        # the decisions are not cached anymore
+        client.check(principal_uri="admin", resource_uri="doc")
+        client.check(principal_uri="admin", resource_uri="doc")
+        assert len(checks) == 3
@@ -0,0 +1,293 @@
+import gzip
+import json
+
+import httpx
+import ormsgpack
+import pytest
+from eunomia_core import schemas
+from eunomia_sdk import AsyncEunomiaClient, EunomiaClient
+from eunomia_sdk.serialization import MSGPACK_MEDIA_TYPE
+
+
+def make_request(i: int) -> schemas.CheckRequest:
+    return schemas.CheckRequest(
+        principal=schemas.PrincipalCheck(uri=f"user-{i}"),
+        resource=schemas.ResourceCheck(uri="doc"),
+    )
+
+
+def make_handler(chunks: list[int], limit: int | None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/check/bulk/limit":
+            if limit is None:
+                return httpx.Response(404, json={"detail": "Not Found"})
+            return httpx.Response(200, json=limit)
+
+        body = json.loads(request.content)
+        chunks.append(len(body))
+        return httpx.Response(
+            200,
+            json=[
+                {"allowed": int(r["principal"]["uri"].split("-")[1]) % 2 == 0}
+                for r in body
+            ],
+        )
+
+    return handler
+
+
+class TestBulkCheckChunking:
+    """Test the splitting of bulk checks into chunks within the server limit."""
+
+    def test_chunks_with_discovered_limit(self):
+        chunks = []
+        client = EunomiaClient()
+        client.client = httpx.Client(
+            base_url="http://test",
+            transport=httpx.MockTransport(make_handler(chunks, 10)),
+        )
+
+        results = client.bulk_check([make_request(i) for i in range(25)])
+
+        assert [r.allowed for r in results] == [i % 2 == 0 for i in range(25)]
+        assert sorted(chunks) == [5, 10, 10]
+
+    def test_single_request_within_limit(self):
+        chunks = []
+        client = EunomiaClient(bulk_max_size=10)
+        client.client = httpx.Client(
+            base_url="http://test",
+            transport=httpx.MockTransport(make_handler(chunks, 1)),
+        )
+
+        results = client.bulk_check([make_request(i) for i in range(10)])
+
+        assert len(results) == 10
+        assert chunks == [10]
+
+    def test_default_limit_without_endpoint(self):
+        chunks = []
+        client = EunomiaClient()
+        client.client = httpx.Client(
+            base_url="http://test",
+            transport=httpx.MockTransport(make_handler(chunks, None)),
+        )
+
+        results = client.bulk_check([make_request(i) for i in range(150)])
+
+        assert len(results) == 150
+        assert sorted(chunks) == [50, 100]
+
+    @pytest.mark.asyncio
+    async def test_async_chunks_with_discovered_limit(self):
+        chunks = []
+        client = AsyncEunomiaClient(bulk_max_concurrency=2)
+        client.client = httpx.AsyncClient(
+            base_url="http://test",
+            transport=httpx.MockTransport(make_handler(chunks, 10)),
+        )
+
+        results = await client.bulk_check([make_request(i) for i in range(25)])
+
+        assert [r.allowed for r in results] == [i % 2 == 0 for i in range(25)]
+        assert sorted(chunks) == [5, 10, 10]
+        await client.aclose()
+
+
+class TestCheckResources:
+    """Test the checks of many resources for a single principal."""
+
+    @staticmethod
+    def handler(chunks: list[int]):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/check/bulk/limit":
+                return httpx.Response(200, json=10)
+
+            body = json.loads(request.content)
+            assert body["principal"]["uri"] == "admin"
+            assert body["action"] == "read"
+            chunks.append(len(body["resources"]))
+            return httpx.Response(
+                200,
+                json=[
+                    {"allowed": int(r["uri"].split("-")[1]) % 2 == 0}
+                    for r in body["resources"]
+                ],
+            )
+
+        return handler
+
+    def test_chunks_with_principal_once(self):
+        chunks = []
+        client = EunomiaClient(bulk_max_concurrency=2)
+        client.client = httpx.Client(
+            base_url="http://test", transport=httpx.MockTransport(self.handler(chunks))
+        )
+
+        results = client.check_resources(
+            [schemas.ResourceCheck(uri=f"doc-{i}") for i in range(25)],
+            principal_uri="admin",
+            action="read",
+        )
+
+        assert [r.allowed for r in results] == [i % 2 == 0 for i in range(25)]
+        assert sorted(chunks) == [5, 10, 10]
+        assert client.check_resources([], principal_uri="admin") == []
+
+    @pytest.mark.asyncio
+    async def test_async_chunks_with_principal_once(self):
+        chunks = []
+        client = AsyncEunomiaClient()
+        client.client = httpx.AsyncClient(
+            base_url="http://test", transport=httpx.MockTransport(self.handler(chunks))
+        )
+
+        results = await client.check_resources(
+            [schemas.ResourceCheck(uri=f"doc-{i}") for i in range(25)],
+            principal_uri="admin",
+            action="read",
+        )
+
+        assert [r.allowed for r in results] == [i % 2 == 0 for i in range(25)]
+        assert sorted(chunks) == [5, 10, 10]
+        await client.aclose()
+
+
+def test_check_matrix():
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        assert len(body["principals"]) == 2
+        assert body["actions"] == ["access"]
+        # resources 0 and 9 allowed for the first principal only
+        return httpx.Response(200, json={"allowed": [["AQI="], ["AAA="]]})
+
+    client = EunomiaClient()
+    client.client = httpx.Client(
+        base_url="http://test", transport=httpx.MockTransport(handler)
+    )
+
+    result = client.check_matrix(
+        [schemas.PrincipalCheck(uri="admin"), schemas.PrincipalCheck(uri="user")],
+        [schemas.ResourceCheck(uri=f"doc-{i}") for i in range(10)],
+    )
+
+    assert [r for r in range(10) if result.is_allowed(0, r)] == [0, 9]
+    assert not any(result.is_allowed(1, r) for r in range(10))
+
+
+class TestSerialization:
+    """Test the MessagePack serialization and the compression of checks."""
+
+    @staticmethod
+    def handler(request: httpx.Request) -> httpx.Response:
+        content = request.content
+        if request.headers.get("content-encoding") == "gzip":
+            content = gzip.decompress(content)
+        if request.headers["content-type"] == MSGPACK_MEDIA_TYPE:
+            body = ormsgpack.unpackb(content)
+        else:
+            body = json.loads(content)
+
+        requests = body if isinstance(body, list) else [body]
+        results = [{"allowed": r["principal"]["uri"] == "user-0"} for r in requests]
+        data = results if isinstance(body, list) else results[0]
+        if request.headers.get("accept") == MSGPACK_MEDIA_TYPE:
+            return httpx.Response(
+                200,
+                content=ormsgpack.packb(data),
+                headers={"Content-Type": MSGPACK_MEDIA_TYPE},
+            )
+        return httpx.Response(200, json=data)
+
+    def test_msgpack_compressed_bulk_check(self):
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request.headers)
+            return self.handler(request)
+
+        client = EunomiaClient(bulk_max_size=100, msgpack=True, compression=True)
+        client.client = httpx.Client(
+            base_url="http://test", transport=httpx.MockTransport(handler)
+        )
+
+        assert client.check(principal_uri="user-0", resource_uri="doc").allowed
+        results = client.bulk_check([make_request(i) for i in range(100)])
+
+        assert [r.allowed for r in results] == [i == 0 for i in range(100)]
+        assert "content-encoding" not in sent[0]
+        assert sent[1]["content-encoding"] == "gzip"
+        assert all(h["content-type"] == MSGPACK_MEDIA_TYPE for h in sent)
+
+    @pytest.mark.asyncio
+    async def test_async_msgpack_check(self):
+        client = AsyncEunomiaClient(msgpack=True)
+        client.client = httpx.AsyncClient(
+            base_url="http://test", transport=httpx.MockTransport(self.handler)
+        )
+
+        result = await client.check(principal_uri="user-0", resource_uri="doc")
+
+        assert result.allowed is True
+        await client.aclose()
+
+
+class TestStreamBulkCheck:
+    """Test the sending of streaming bulk checks in chunks."""
+
+    @staticmethod
+    def handler(chunks: list[int]):
+        def handler(request: httpx.Request) -> httpx.Response:
+            lines = [json.loads(line) for line in request.content.splitlines()]
+            chunks.append(len(lines))
+            # responses are returned in reverse order
+            results = [
+                {
+                    "id": str(i),
+                    "response": {
+                        "allowed": int(r["principal"]["uri"].split("-")[1]) % 2 == 0
+                    },
+                }
+                for i, r in reversed(list(enumerate(lines)))
+            ]
+            return httpx.Response(
+                200,
+                content="".join(json.dumps(r) + "\n" for r in results),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+
+        return handler
+
+    def test_chunks_with_positions(self):
+        chunks = []
+        client = EunomiaClient()
+        client.client = httpx.Client(
+            base_url="http://test", transport=httpx.MockTransport(self.handler(chunks))
+        )
+
+        results = client.stream_bulk_check(
+            (make_request(i) for i in range(25)), chunk_size=10
+        )
+
+        allowed = {int(r.id): r.response.allowed for r in results}
+        assert allowed == {i: i % 2 == 0 for i in range(25)}
+        assert chunks == [10, 10, 5]
+
+    @pytest.mark.asyncio
+    async def test_async_chunks_with_positions(self):
+        chunks = []
+        client = AsyncEunomiaClient()
+        client.client = httpx.AsyncClient(
+            base_url="http://test", transport=httpx.MockTransport(self.handler(chunks))
+        )
+
+        allowed = {
+            int(r.id): r.response.allowed
+            async for r in client.stream_bulk_check(
+                [make_request(i) for i in range(25)], chunk_size=10
+            )
+        }
+
+        assert allowed == {i: i % 2 == 0 for i in range(25)}
+        assert chunks == [10, 10, 5]
+        await client.aclose()
@@ -0,0 +1,51 @@
+import httpx
+import pytest
+from eunomia_sdk import AsyncEunomiaClient, EunomiaClient
+
+
+def make_handler(traceparents: list[str | None]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        traceparents.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"allowed": True})
+
+    return handler
+
+
+def test_check_propagates_trace_context(span_exporter):
+    traceparents = []
+    client = EunomiaClient()
+    client.client = httpx.Client(
+        base_url="http://test",
+        transport=httpx.MockTransport(make_handler(traceparents)),
+        event_hooks=client.client.event_hooks,
+    )
+
+    assert client.check(principal_uri="user", resource_uri="doc").allowed
+
+    (span,) = span_exporter.get_finished_spans()
+    assert span.name == "eunomia.check"
+    (traceparent,) = traceparents
+    assert traceparent.startswith(
+        f"00-{span.context.trace_id:032x}-{span.context.span_id:016x}-"
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_check_propagates_trace_context(span_exporter):
+    traceparents = []
+    client = AsyncEunomiaClient()
+    client.client = httpx.AsyncClient(
+        base_url="http://test",
+        transport=httpx.MockTransport(make_handler(traceparents)),
+        event_hooks=client.client.event_hooks,
+    )
+
+    result = await client.check(principal_uri="user", resource_uri="doc")
+    assert result.allowed
+
+    (span,) = span_exporter.get_finished_spans()
+    assert span.name == "eunomia.check"
+    (traceparent,) = traceparents
+    assert traceparent.startswith(
+        f"00-{span.context.trace_id:032x}-{span.context.span_id:016x}-"
+    )
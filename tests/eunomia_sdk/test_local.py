@@ -0,0 +1,235 @@
+import itertools
+import json
+import time
+
+import httpx
+import pytest
+from eunomia_core import enums, schemas
+from eunomia_sdk import EunomiaClient
+from eunomia_sdk.local import LocalEvaluator
+
+from eunomia.engine import PolicyEngine
+
+OPERATORS_VALUES = [
+    (enums.ConditionOperator.EQUALS, "admin"),
+    (enums.ConditionOperator.NOT_EQUALS, "admin"),
+    (enums.ConditionOperator.CONTAINS, "adm"),
+    (enums.ConditionOperator.NOT_CONTAINS, "adm"),
+    (enums.ConditionOperator.STARTS_WITH, "ad"),
+    (enums.ConditionOperator.ENDS_WITH, "min"),
+    (enums.ConditionOperator.GREATER, 3),
+    (enums.ConditionOperator.GREATER_OR_EQUAL, 3),
+    (enums.ConditionOperator.LESS, 3),
+    (enums.ConditionOperator.LESS_OR_EQUAL, 3.0),
+    (enums.ConditionOperator.IN, ["admin", 3]),
+    (enums.ConditionOperator.NOT_IN, ["admin", 3]),
+    (enums.ConditionOperator.EQUALS, None),
+    (enums.ConditionOperator.IN, "admin"),
+]
+TARGETS = ["admin", "user", 2, 3, 5.5, True, None, ["admin"]]
+
+
+def make_policies() -> list[schemas.Policy]:
+    return [
+        schemas.Policy(
+            name="operators",
+            default_effect=enums.PolicyEffect.ALLOW,
+            rules=[
+                schemas.Rule(
+                    name=f"rule-{i}",
+                    effect=enums.PolicyEffect.DENY
+                    if i % 3 == 0
+                    else enums.PolicyEffect.ALLOW,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.value", operator=operator, value=value
+                        )
+                    ],
+                    actions=[f"action-{i}"],
+                )
+                for i, (operator, value) in enumerate(OPERATORS_VALUES)
+            ],
+        ),
+        schemas.Policy(
+            name="paths",
+            rules=[
+                schemas.Rule(
+                    name="nested",
+                    effect=enums.PolicyEffect.ALLOW,
+                    principal_conditions=[
+                        schemas.Condition(
+                            path="attributes.profile.teams.0",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="eng",
+                        )
+                    ],
+                    resource_conditions=[
+                        schemas.Condition(
+                            path="type",
+                            operator=enums.ConditionOperator.EQUALS,
+                            value="resource",
+                        )
+                    ],
+                    actions=["read"],
+                )
+            ],
+        ),
+    ]
+
+
+def make_requests() -> list[schemas.CheckRequest]:
+    actions = [f"action-{i}" for i in range(len(OPERATORS_VALUES))] + ["read"]
+    principals = [{"value": target} for target in TARGETS] + [
+        {"profile": {"teams": ["eng"]}},
+        {"profile": {"teams": []}},
+        {"other": "admin"},
+    ]
+    return [
+        schemas.CheckRequest(
+            principal=schemas.PrincipalCheck(attributes=attributes),
+            resource=schemas.ResourceCheck(attributes={"kind": "doc"}),
+            action=action,
+        )
+        for action, attributes in itertools.product(actions, principals)
+    ]
+
+
+@pytest.fixture
+def policy_engine(monkeypatch):
+    monkeypatch.setattr("eunomia.config.settings.ENGINE_SQL_DATABASE", False)
+    engine = PolicyEngine()
+    for policy in make_policies():
+        engine.add_policy(policy)
+    return engine
+
+
+class TestLocalEvaluator:
+    """Test the in-process evaluation of the server policies."""
+
+    def test_consistent_with_policy_engine(self, policy_engine: PolicyEngine):
+        evaluator = LocalEvaluator()
+        evaluator.load(make_policies(), evaluator.generation)
+
+        for request in make_requests():
+            assert evaluator.evaluate(request) == policy_engine.evaluate_all(request)
+
+    def test_no_policies(self):
+        evaluator = LocalEvaluator()
+        evaluator.load([], evaluator.generation)
+
+        result = evaluator.evaluate(make_requests()[0])
+        assert result.allowed is False
+        assert "no policies" in result.reason
+
+    def test_stale_policies_not_loaded(self):
+        evaluator = LocalEvaluator()
+        generation = evaluator.generation
+        evaluator.clear()
+        evaluator.load(make_policies(), generation)
+
+        assert evaluator.synced is False
+        assert evaluator.evaluate(make_requests()[0]) is None
+
+    def test_supports_only_inline_attributes(self):
+        assert LocalEvaluator.supports(make_requests()[0])
+        assert not LocalEvaluator.supports(
+            schemas.CheckRequest(
+                principal=schemas.PrincipalCheck(uri="user"),
+                resource=schemas.ResourceCheck(attributes={"type": "doc"}),
+            )
+        )
+
+
+def test_client_local_evaluation(policy_engine: PolicyEngine):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/admin/policies":
+            return httpx.Response(
+                200, json=[p.model_dump(mode="json") for p in make_policies()]
+            )
+        if request.url.path == "/check/revision":
+            if "after" in request.url.params:
+                time.sleep(0.01)
+            return httpx.Response(200, json=1)
+
+        body = json.loads(request.content)
+        return httpx.Response(200, json={"allowed": body["principal"]["uri"] == "me"})
+
+    client = EunomiaClient(local_evaluation=True)
+    client.client = httpx.Client(
+        base_url="http://test", transport=httpx.MockTransport(handler)
+    )
+    # wait for the watcher to sync the initial revision
+    client.check(
+        principal_attributes={"value": "admin"},
+        resource_attributes={"kind": "doc"},
+        action="action-0",
+    )
+    time.sleep(0.05)
+    calls.clear()
+
+    for request in make_requests():
+        result = client.check(
+            principal_attributes=request.principal.attributes,
+            resource_attributes=request.resource.attributes,
+            action=request.action,
+        )
+        assert result == policy_engine.evaluate_all(request)
+    assert client.check(principal_uri="me", resource_uri="doc").allowed
+    assert calls.count("/admin/policies") <= 1
+    assert calls.count("/check") == 1
+
+
+def test_client_local_evaluation_sync_rejected():
+    calls, revision = [], 1
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/admin/policies":
+            if revision == 1:
+                return httpx.Response(401, json={"detail": "Invalid API key"})
+            return httpx.Response(
+                200, json=[p.model_dump(mode="json") for p in make_policies()]
+            )
+        if request.url.path == "/check/revision":
+            if "after" in request.url.params:
+                time.sleep(0.01)
+            return httpx.Response(200, json=revision)
+        return httpx.Response(200, json={"allowed": True})
+
+    client = EunomiaClient(local_evaluation=True)
+    client.client = httpx.Client(
+        base_url="http://test", transport=httpx.MockTransport(handler)
+    )
+    request = make_requests()[0]
+
+    def check() -> schemas.CheckResponse:
+        return client.check(
+            principal_attributes=request.principal.attributes,
+            resource_attributes=request.resource.attributes,
+            action=request.action,
+        )
+
+    # wait for the watcher to sync the initial revision
+    check()
+    time.sleep(0.05)
+    calls.clear()
+
+    # the checks are sent to the server, the download is tried at most once
+    assert check().allowed is True
+    assert check().allowed is True
+    assert calls.count("/admin/policies") <= 1
+    assert calls.count("/check") == 2
+
+    # the download is retried on the next revision
+    revision = 2
+    time.sleep(0.05)
+    calls.clear()
+    evaluator = LocalEvaluator()
+    evaluator.load(make_policies(), evaluator.generation)
+    assert check() == evaluator.evaluate(request)
+    assert calls.count("/admin/policies") == 1
+    assert calls.count("/check") == 0
+    client.close()
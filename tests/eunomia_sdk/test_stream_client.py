@@ -0,0 +1,78 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+import uvicorn
+from eunomia_core import schemas
+from eunomia_sdk import AsyncEunomiaStreamClient
+from fastapi import FastAPI
+
+from eunomia.server import EunomiaServer
+from eunomia.server.router import server_router_factory
+
+
+@pytest_asyncio.fixture
+async def endpoint():
+    async def check(request: schemas.CheckRequest) -> schemas.CheckResponse:
+        if request.principal.uri == "invalid":
+            raise ValueError("Invalid principal")
+        i = int(request.principal.uri.split("-")[1])
+        await asyncio.sleep(0.001 * (i % 5))
+        return schemas.CheckResponse(allowed=i % 2 == 0)
+
+    server = MagicMock()
+    server.check = check
+    server.stream_check = lambda message: EunomiaServer.stream_check(server, message)
+
+    app = FastAPI()
+    app.include_router(server_router_factory(server))
+    uvicorn_server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=0, log_level="error")
+    )
+    task = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        await asyncio.sleep(0.01)
+    port = uvicorn_server.servers[0].sockets[0].getsockname()[1]
+
+    yield f"http://127.0.0.1:{port}"
+
+    uvicorn_server.should_exit = True
+    await task
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checks_multiplexed(endpoint: str):
+    async with AsyncEunomiaStreamClient(endpoint=endpoint) as client:
+        results = await asyncio.gather(
+            *(
+                client.check(principal_uri=f"user-{i}", resource_uri="document")
+                for i in range(50)
+            )
+        )
+        connection = client._connection
+
+        assert [r.allowed for r in results] == [i % 2 == 0 for i in range(50)]
+        assert connection is not None
+        assert not client._pending
+
+
+@pytest.mark.asyncio
+async def test_check_error_raised(endpoint: str):
+    async with AsyncEunomiaStreamClient(endpoint=endpoint) as client:
+        with pytest.raises(RuntimeError, match="Invalid principal"):
+            await client.check(principal_uri="invalid", resource_uri="document")
+
+        result = await client.check(principal_uri="user-0", resource_uri="document")
+        assert result.allowed is True
+
+
+@pytest.mark.asyncio
+async def test_reconnect_after_close(endpoint: str):
+    client = AsyncEunomiaStreamClient(endpoint=endpoint)
+    await client.check(principal_uri="user-0", resource_uri="document")
+    await client.aclose()
+
+    result = await client.check(principal_uri="user-2", resource_uri="document")
+    assert result.allowed is True
+    await client.aclose()